@@ -33,6 +33,8 @@ import numpy as np
 
 # Project modules.
 from xray_mac.mac.models.chantler2005 import Chantler2005
+from xray_mac.mac.models.mass_absorption_coefficient import Material
+from xray_mac.mac.models.xray_lines import get_xray_lines
 
 # Globals and constants variables.
 
@@ -42,20 +44,16 @@ def run_water():
     length_mm = 10.0
     length_cm = length_mm*1.0e-1
 
-    cu_ka_eV = 8046.0
-    cu_la_eV = 930.0
-
     chantler2005 = Chantler2005()
 
-    for energy_eV in [cu_ka_eV, cu_la_eV]:
-        total_mac_cm2_g = 0.0
-        for atomic_number, weight_fraction in [(1, 0.111894), (8, 0.888106)]:
-            atomic_number = 1
-            mac_cm2_g = chantler2005.compute_mac_cm2_g(energy_eV, atomic_number)
-            total_mac_cm2_g += mac_cm2_g*weight_fraction
+    water = Material({1: 0.111894, 8: 0.888106}, density_g_cm3=density_g_cm3, name="water")
+
+    energies_eV = get_xray_lines().line_energy_eV(29, ["Ka1", "La1"])
+    total_macs_cm2_g = water.compute_mac_cm2_g(energies_eV, chantler2005)
+    absorptions = np.exp(-water.compute_linear_absorption_coefficient_1_cm(energies_eV, chantler2005)*length_cm)
 
-        absorption = np.exp(-total_mac_cm2_g*density_g_cm3*length_cm)
-        print(energy_eV, total_mac_cm2_g,absorption)
+    for energy_eV, total_mac_cm2_g, absorption in zip(energies_eV, total_macs_cm2_g, absorptions):
+        print(energy_eV, total_mac_cm2_g, absorption)
 
 
 if __name__ == '__main__':
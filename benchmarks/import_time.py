@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: benchmarks.import_time
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Cold import time of the public modules of xray_mac.
+
+Each module is imported in a new interpreter with ``python -X importtime`` and its cumulative import time is the
+minimum of the repetitions, after one warm-up import to compile the byte code. The heavy optional dependencies loaded
+by the import are reported, they should be imported on first use only.
+
+Usage::
+
+    python benchmarks/import_time.py --repeat 5 --json import_time.json --budget-ms 50
+"""
+
+###############################################################################
+# Copyright 2021 Hendrix Demers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###############################################################################
+
+# Standard library modules.
+import argparse
+import json
+import os
+import os.path
+import pkgutil
+import subprocess
+import sys
+
+# Third party modules.
+
+# Local modules.
+
+# Project modules.
+
+# Globals and constants variables.
+PROJECT_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+HEAVY_MODULES = ["scipy", "h5py", "matplotlib"]
+
+BASE_MODULES = ["numpy"]
+
+
+def get_public_modules():
+    """
+    Public modules of xray_mac.mac.models, found without importing them.
+    """
+    models_path = os.path.join(PROJECT_PATH, "xray_mac", "mac", "models")
+    return ["xray_mac.mac.models.%s" % module.name for module in pkgutil.iter_modules([models_path])
+            if not module.name.startswith("_")]
+
+
+def run_import(module_name):
+    """
+    Import a module in a new interpreter.
+
+    :return: cumulative import time of each module in microseconds and the heavy modules loaded
+    """
+    code = "import sys, %s; print(','.join(name for name in %r if name in sys.modules))" % (module_name, HEAVY_MODULES)
+
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.pathsep.join([PROJECT_PATH] + [environment.get("PYTHONPATH", "")]).rstrip(os.pathsep)
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=PROJECT_PATH, env=environment,
+                            capture_output=True, text=True, check=True)
+
+    cumulative_times_us = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        _self_time, cumulative_time, name = line[len("import time:"):].split("|")
+        try:
+            cumulative_times_us[name.strip()] = int(cumulative_time)
+        except ValueError:
+            continue
+
+    heavy_modules = [name for name in result.stdout.strip().split(",") if name]
+
+    return cumulative_times_us, heavy_modules
+
+
+def measure_import_time(module_name, repeat=5):
+    """
+    Minimum cumulative import time of a module in ms, the part of it not spent in :py:data:`BASE_MODULES`, and the heavy
+    modules loaded.
+    """
+    run_import(module_name)
+
+    times_ms = []
+    own_times_ms = []
+    heavy_modules = []
+    for _index in range(repeat):
+        cumulative_times_us, heavy_modules = run_import(module_name)
+
+        time_ms = cumulative_times_us.get(module_name, 0) * 1.0e-3
+        base_time_ms = sum(cumulative_times_us.get(name, 0) for name in BASE_MODULES) * 1.0e-3
+        times_ms.append(time_ms)
+        own_times_ms.append(time_ms - base_time_ms)
+
+    return min(times_ms), min(own_times_ms), heavy_modules
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Cold import time of the public modules of xray_mac.")
+    parser.add_argument("modules", nargs="*", help="modules to measure, all the public modules if none")
+    parser.add_argument("--repeat", type=int, default=5, help="number of imports of each module")
+    parser.add_argument("--json", help="file where the results are written")
+    parser.add_argument("--budget-ms", type=float,
+                        help="maximum import time in ms without the time of numpy, the exit code is 1 if exceeded")
+    options = parser.parse_args(arguments)
+
+    module_names = options.modules or get_public_modules()
+
+    results = {}
+    print("%-50s %10s %10s  %s" % ("module", "total ms", "own ms", "heavy modules"))
+    for module_name in module_names:
+        time_ms, own_time_ms, heavy_modules = measure_import_time(module_name, options.repeat)
+        results[module_name] = {"time_ms": time_ms, "own_time_ms": own_time_ms, "heavy_modules": heavy_modules}
+        print("%-50s %10.1f %10.1f  %s" % (module_name, time_ms, own_time_ms, ", ".join(heavy_modules)))
+
+    if options.json:
+        with open(options.json, 'w') as output_file:
+            json.dump(results, output_file, indent=2, sort_keys=True)
+
+    if options.budget_ms is not None:
+        over_budget = [module_name for module_name, result in results.items()
+                       if result["own_time_ms"] > options.budget_ms or result["heavy_modules"]]
+        if over_budget:
+            print("Over the import budget: %s" % ", ".join(over_budget))
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,356 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: benchmarks.mac_benchmarks
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Performance benchmarks of the MAC models and data loaders.
+
+Each case is created by a setup function returning the function to time and the number of points it computes. The
+model cases use the engines of :py:mod:`xray_mac.mac.models.registry`, created and warmed up before timing: scalar
+latency, throughput of random arrays of energies and all-Z sweeps. The data loader cases call the readers without
+their process caches. The time of a case is the best of the repetitions, its peak memory is measured with
+:py:mod:`tracemalloc` in a separate call.
+
+The results are written as JSON and can be compared against a saved baseline, the exit code is 1 if a case is slower
+than the baseline by more than the tolerance.
+
+Usage::
+
+    python benchmarks/mac_benchmarks.py --json results.json
+    python benchmarks/mac_benchmarks.py --baseline baseline.json --tolerance 0.25 --filter Chantler2005
+"""
+
+###############################################################################
+# Copyright 2021 Hendrix Demers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###############################################################################
+
+# Standard library modules.
+import argparse
+import datetime
+import json
+import logging
+import os.path
+import platform
+import sys
+import time
+import tracemalloc
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")))
+
+from xray_mac.mac import get_current_module_path  # noqa: E402
+from xray_mac.mac.models import registry  # noqa: E402
+
+# Globals and constants variables.
+SIZES = [10**3, 10**5, 10**6]
+
+MINIMUM_ATOMIC_NUMBER = 1
+MAXIMUM_ATOMIC_NUMBER = 92
+
+MINIMUM_ENERGY_eV = 100.0
+MAXIMUM_ENERGY_eV = 20000.0
+
+SEED = 20210101
+
+MODEL_OPTIONS = {registry.MODEL_CHANTLER2005: {},
+                 registry.MODEL_HENKE1993: {},
+                 registry.MODEL_HENKE_WINXRAY: {},
+                 registry.MODEL_HEINRICH1987: {"warning_mode": "none"},
+                 registry.MODEL_HEINRICH_DTSA: {},
+                 registry.MODEL_CASINO: {},
+                 registry.MODEL_PENELOPE2018: {}}
+
+DATA_PATH = get_current_module_path(__file__, "../data")
+
+
+class SkipBenchmark(Exception):
+    pass
+
+
+def get_energies_eV(number_points):  # noqa
+    random = np.random.default_rng(SEED)
+    return np.exp(random.uniform(np.log(MINIMUM_ENERGY_eV), np.log(MAXIMUM_ENERGY_eV), number_points))
+
+
+def get_engine(model_name):
+    try:
+        engine = registry.get_engine(model_name, **MODEL_OPTIONS[model_name])
+        engine.compute_mac_cm2_g(8046.0, 29)
+    except (OSError, KeyError) as status:
+        raise SkipBenchmark("%s not available: %s" % (model_name, status))
+
+    return engine
+
+
+def create_scalar_case(model_name):
+    def setup():
+        engine = get_engine(model_name)
+        return lambda: engine.compute_mac_cm2_g(8046.0, 29), 1
+
+    return setup
+
+
+def create_array_case(model_name, number_points):
+    def setup():
+        engine = get_engine(model_name)
+        energies_eV = get_energies_eV(number_points)  # noqa
+        return lambda: engine.compute_mac_cm2_g(energies_eV, 29), number_points
+
+    return setup
+
+
+def create_sweep_case(model_name, number_energies=1000):
+    def setup():
+        atomic_numbers = np.arange(MINIMUM_ATOMIC_NUMBER, MAXIMUM_ATOMIC_NUMBER + 1)
+        number_points = number_energies * len(atomic_numbers)
+
+        engine = get_engine(model_name)
+        energies_eV = np.geomspace(MINIMUM_ENERGY_eV, MAXIMUM_ENERGY_eV, number_energies)  # noqa
+        return lambda: engine.compute_mac_cm2_g(energies_eV[:, np.newaxis], atomic_numbers), number_points
+
+    return setup
+
+
+def create_load_case(load):
+    def setup():
+        try:
+            load()
+        except (OSError, ImportError) as status:
+            raise SkipBenchmark(str(status))
+        return load, 1
+
+    return setup
+
+
+def load_henke_tarball():
+    from xray_mac.mac.models.henke import HenkeArchive
+    HenkeArchive(os.path.join(DATA_PATH, "henke1993", "data", "sf.tar.gz"))
+
+
+def load_winxray_text():
+    from xray_mac.mac.models.henke_winxray import MacHenkeWinxray
+    mac = MacHenkeWinxray(os.path.join(DATA_PATH, "henke1993", "winxray"))
+    for atomic_number in range(MINIMUM_ATOMIC_NUMBER, MAXIMUM_ATOMIC_NUMBER + 1):
+        mac.read_text_data(atomic_number)
+
+
+def load_winxray_binary():
+    from xray_mac.mac.models.henke_winxray import MacHenkeWinxray
+    mac = MacHenkeWinxray(os.path.join(DATA_PATH, "henke1993", "winxray"))
+    for atomic_number in range(MINIMUM_ATOMIC_NUMBER, MAXIMUM_ATOMIC_NUMBER + 1):
+        energies_eV, macs_cm2_g = mac.read_binary_data(atomic_number)  # noqa
+        np.sum(energies_eV)
+        np.sum(macs_cm2_g)
+
+
+def load_chantler_csv():
+    from xray_mac.mac.models.chantler2005 import read_columns, FFastMacTable
+    FFastMacTable(read_columns(os.path.join(DATA_PATH, "chantler2005", "FFastMAC.csv")))
+
+
+def load_chantler_hdf5():
+    import h5py
+    with h5py.File(os.path.join(DATA_PATH, "chantler2005", "chantler2005.hdf5"), "r") as hdf5_file:
+        for group in hdf5_file["elements"].values():
+            for dataset in group.values():
+                dataset[()]
+
+
+def load_penelope_zip():
+    from xray_mac.mac.models.penelope import read_photo_electric_data
+    read_photo_electric_data(os.path.join(DATA_PATH, "penelope2018", "pendbase.zip"))
+
+
+def load_casino_prn():
+    from xray_mac.mac.models.casino import read_coefficient_file
+    read_coefficient_file(os.path.join(DATA_PATH, "casino", "KCOEFF.PRN"))
+    read_coefficient_file(os.path.join(DATA_PATH, "casino", "LCOEFF.PRN"))
+
+
+def load_xray_lines():
+    from xray_mac.mac.models.xray_lines import XrayLines, read_xray_lines
+    XrayLines(read_xray_lines(os.path.join(DATA_PATH, "dtsa", "XrayDataLine.csv")))
+
+
+def load_edge_energies():
+    from xray_mac.mac.models.ionization_energies import EdgeTable, read_ffast_edge_energies, \
+        read_dtsa_edge_energies
+    EdgeTable(read_ffast_edge_energies(os.path.join(DATA_PATH, "chantler2005", "FFastEdgeDB.csv")))
+    EdgeTable(read_dtsa_edge_energies(os.path.join(DATA_PATH, "dtsa", "XrayDataEdge.csv")))
+
+
+def get_cases(sizes=SIZES):
+    """
+    Setup function of each case, by name.
+    """
+    cases = {}
+    for model_name in MODEL_OPTIONS:
+        cases["%s.scalar" % model_name] = create_scalar_case(model_name)
+        for number_points in sizes:
+            cases["%s.array_%i" % (model_name, number_points)] = create_array_case(model_name, number_points)
+        cases["%s.sweep_all_z" % model_name] = create_sweep_case(model_name)
+
+    loads = {"henke_tarball": load_henke_tarball,
+             "winxray_text": load_winxray_text,
+             "winxray_binary": load_winxray_binary,
+             "chantler_csv": load_chantler_csv,
+             "chantler_hdf5": load_chantler_hdf5,
+             "penelope_zip": load_penelope_zip,
+             "casino_prn": load_casino_prn,
+             "xray_lines": load_xray_lines,
+             "edge_energies": load_edge_energies}
+    for name, load in loads.items():
+        cases["load.%s" % name] = create_load_case(load)
+
+    return cases
+
+
+def measure_time_s(function, repeat=5, minimum_time_s=0.2):
+    """
+    Best time of one call in seconds, each repetition calls the function enough times to last the minimum time.
+    """
+    number = 1
+    while True:
+        start_time_s = time.perf_counter()
+        for _index in range(number):
+            function()
+        time_s = time.perf_counter() - start_time_s
+        if time_s >= minimum_time_s or number >= 10**6:
+            break
+        number *= 10 if time_s < minimum_time_s / 10.0 else 2
+
+    times_s = [time_s / number]
+    for _index in range(repeat - 1):
+        start_time_s = time.perf_counter()
+        for _index in range(number):
+            function()
+        times_s.append((time.perf_counter() - start_time_s) / number)
+
+    return min(times_s)
+
+
+def measure_peak_memory_bytes(function):
+    tracemalloc.start()
+    try:
+        function()
+        _current, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak_bytes
+
+
+def run_benchmarks(cases, repeat=5, minimum_time_s=0.2):
+    """
+    Run the cases.
+
+    :return: result of each case, a dictionary with ``skipped`` for the cases that cannot run here
+    """
+    results = {}
+    for name, setup in cases.items():
+        try:
+            function, number_points = setup()
+        except SkipBenchmark as status:
+            results[name] = {"skipped": str(status)}
+            print("%-40s skipped: %s" % (name, status))
+            continue
+
+        time_s = measure_time_s(function, repeat, minimum_time_s)
+        peak_memory_bytes = measure_peak_memory_bytes(function)
+
+        results[name] = {"time_s": time_s,
+                         "points": number_points,
+                         "points_per_s": number_points / time_s if time_s > 0.0 else None,
+                         "peak_memory_bytes": peak_memory_bytes}
+        print("%-40s %12.3f ms %14.0f points/s %10.1f MiB" %
+              (name, time_s * 1.0e3, number_points / time_s, peak_memory_bytes / 2.0**20))
+
+    return results
+
+
+def get_metadata():
+    return {"date": datetime.datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor()}
+
+
+def compare_results(results, baseline_results, tolerance=0.25):
+    """
+    Cases slower than the baseline by more than the tolerance.
+
+    :return: list of (name, time in s, baseline time in s)
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        baseline_result = baseline_results.get(name, {})
+        if "time_s" not in result or "time_s" not in baseline_result:
+            continue
+
+        ratio = result["time_s"] / baseline_result["time_s"]
+        print("%-40s %8.2fx" % (name, ratio))
+        if ratio > 1.0 + tolerance:
+            regressions.append((name, result["time_s"], baseline_result["time_s"]))
+
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Performance benchmarks of the MAC models and data loaders.")
+    parser.add_argument("--filter", action="append", help="run the cases whose name contains this text")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="number of points of the array cases")
+    parser.add_argument("--repeat", type=int, default=5, help="number of repetitions of each case")
+    parser.add_argument("--minimum-time", type=float, default=0.2, help="minimum time in s of each repetition")
+    parser.add_argument("--json", help="file where the results are written")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="relative slowdown over the baseline reported as a regression")
+    options = parser.parse_args(arguments)
+
+    logging.disable(logging.WARNING)
+
+    cases = get_cases(options.sizes)
+    if options.filter:
+        cases = {name: setup for name, setup in cases.items() if any(text in name for text in options.filter)}
+
+    results = run_benchmarks(cases, options.repeat, options.minimum_time)
+
+    if options.json:
+        with open(options.json, 'w') as output_file:
+            json.dump({"metadata": get_metadata(), "results": results}, output_file, indent=2, sort_keys=True)
+
+    if options.baseline:
+        with open(options.baseline) as input_file:
+            baseline_results = json.load(input_file)["results"]
+
+        regressions = compare_results(results, baseline_results, options.tolerance)
+        for name, time_s, baseline_time_s in regressions:
+            print("Regression %s: %.3f ms instead of %.3f ms" % (name, time_s * 1.0e3, baseline_time_s * 1.0e3))
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
@@ -26,14 +26,16 @@ Tests for the :py:mod:`xray_mac.mac.models.casino` module.
 
 # Standard library modules.
 import unittest
+import warnings
 
 # Third party modules.
+import numpy as np
 
 # Local modules.
 
 # Project modules.
 from xray_mac.mac.models.casino import mac_zaluzec_cm2_g, macs_total, macs_henke_ebisu, efficiency, macs_heinrich, \
-    special_equations
+    special_equations, get_henke_ebisu_coefficients, get_heinrich_tables, MacCasino, transitions, A
 
 # Globals and constants variables.
 
@@ -303,6 +305,47 @@ class TestCasino(unittest.TestCase):
         mac_cm2_g = macs_henke_ebisu(energy_keV, atomic_number)
         self.assertAlmostEqual(mac_ref_cm2_g, mac_cm2_g)
 
+    def test_macs_henke_ebisu_array(self):
+        """
+        Tests for method `macs_henke_ebisu` with arrays.
+        """
+        energies_keV = np.array([0.1, 0.183, 0.5, 1.0, 1.012, 1.5, 5.0])  # noqa
+        atomic_numbers = np.array([1, 2, 6, 13, 29, 79, 94, 96])
+
+        macs_cm2_g = macs_henke_ebisu(energies_keV[:, np.newaxis], atomic_numbers[np.newaxis, :])
+        self.assertEqual((7, 8), macs_cm2_g.shape)
+
+        for index_energy, energy_keV in enumerate(energies_keV):
+            for index_z, atomic_number in enumerate(atomic_numbers):
+                mac_cm2_g = macs_henke_ebisu(energy_keV, atomic_number)
+                self.assertAlmostEqual(mac_cm2_g, macs_cm2_g[index_energy, index_z])
+
+        self.assertRaises(ValueError, macs_henke_ebisu, np.array([1.0, 0.0]), 6)
+
+    def test_get_henke_ebisu_coefficients(self):
+        """
+        Tests for method `get_henke_ebisu_coefficients`.
+        """
+        coefficients = get_henke_ebisu_coefficients()
+
+        self.assertEqual((95, 14), coefficients.shape)
+        self.assertIs(coefficients, get_henke_ebisu_coefficients())
+        self.assertEqual(0.0, coefficients[2, 0])
+        self.assertEqual(31590.0, coefficients[3, 0])
+        self.assertEqual(2509.0, coefficients[3, 3])
+
+    def test_get_heinrich_tables(self):
+        """
+        Tests for method `get_heinrich_tables`.
+        """
+        transitions_keV, atomic_masses_g_mol = get_heinrich_tables()  # noqa
+
+        self.assertEqual((len(transitions), 10), transitions_keV.shape)
+        self.assertIs(transitions_keV, get_heinrich_tables()[0])
+        self.assertFalse(transitions_keV.flags.writeable)
+        self.assertEqual(transitions[28][0], transitions_keV[28, 0])
+        self.assertEqual(A[79], atomic_masses_g_mol[79])
+
     def test_macs_total(self):
         """
         Tests for method `MACS_TOTAL`.
@@ -323,6 +366,34 @@ class TestCasino(unittest.TestCase):
         self.assertRaises(ValueError, macs_total, 0.0, 1)
         self.assertRaises(ValueError, macs_total, 0.0, 2)
 
+    def test_mac_casino(self):
+        mac = MacCasino()
+
+        self.assertAlmostEqual(macs_total(0.5, 6), mac.compute_mac_cm2_g(500.0, 6))
+        self.assertAlmostEqual(macs_total(8.04, 29), mac.compute_mac_cm2_g(8040.0, 29))
+
+        macs_cm2_g = mac.compute_mac_cm2_g(np.array([[500.0], [8040.0]]), [6, 29])
+        self.assertEqual((2, 2), macs_cm2_g.shape)
+        self.assertAlmostEqual(macs_total(8.04, 6), macs_cm2_g[1, 0])
+
+    def test_macs_total_array(self):
+        for atomic_number in [1, 6, 13, 29, 79, 92]:
+            edges_keV = np.array(transitions[atomic_number - 1])  # noqa
+            energies_keV = np.concatenate([[0.1, 0.5, 1.01, 1.2, 8.04, 85.0], edges_keV[edges_keV > 0.0]])  # noqa
+
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                macs_cm2_g = macs_total(energies_keV, atomic_number)
+                macs_ref_cm2_g = [macs_total(float(energy_keV), atomic_number) for energy_keV in energies_keV]
+
+            np.testing.assert_allclose(macs_ref_cm2_g, macs_cm2_g, rtol=1.0e-13)
+
+        macs_cm2_g = macs_total(np.array([[0.5], [8.04]]), [6, 29, 79])
+        self.assertEqual((2, 3), macs_cm2_g.shape)
+        self.assertEqual(macs_total(8.04, 79), macs_cm2_g[1, 2])
+
+        self.assertRaises(ValueError, macs_total, np.array([1.0, 0.0]), 6)
+
     def test_macs_heinrich(self):
         """
         Tests for method `macs_heinrich`.
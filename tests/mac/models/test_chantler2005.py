@@ -26,8 +26,11 @@ Tests for the :py:mod:`xray_mac.mac.models.chantler2005` module.
 
 # Standard library modules.
 import unittest
+import tempfile
+import os.path
 
 # Third party modules.
+import numpy as np
 
 # Local modules.
 
@@ -160,6 +163,56 @@ class TestChantler2005(unittest.TestCase):
         self.assertAlmostEqual(432.9451*1.0e3, energies_eV[-1])
         self.assertAlmostEqual(0.15459, mac_cm2_g[-1])
 
+    def test_mac_table_shared(self):
+        mac1 = Chantler2005()
+        mac1.read_mac_data()
+
+        mac2 = Chantler2005()
+        mac2.read_mac_data()
+
+        self.assertIs(mac1.experimental_data, mac2.experimental_data)
+        self.assertIs(mac1.experimental_data[6], mac2.experimental_data[6])
+        self.assertEqual(list(range(1, 92+1)), list(mac1.experimental_data.keys()))
+
+        energies_eV = mac1.experimental_data[6][ENERGIES_eV]  # noqa
+        mac_cm2_g = mac1.experimental_data[6][MAC_cm2_g]
+        self.assertEqual(len(energies_eV), len(mac_cm2_g))
+        self.assertFalse(energies_eV.flags.writeable)
+
+    def test_read_mac_data_reset(self):
+        file_path = get_current_module_path(__file__, "../../../data/chantler2005/FFastMAC_nistMonte2.csv")
+
+        mac = Chantler2005()
+        mac.read_mac_data()
+        mac_default_cm2_g = mac.compute_mac_cm2_g(1000.0, 92)
+
+        mac.read_mac_data()
+        self.assertIn(92, mac.mac_data)
+
+        mac.read_mac_data(file_path, ENERGY_UNIT_eV)
+        self.assertEqual({}, mac.mac_data)
+        mac_cm2_g = mac.compute_mac_cm2_g(1000.0, 92)
+        self.assertNotAlmostEqual(mac_default_cm2_g, mac_cm2_g)
+
+        data = mac.experimental_data[92]
+        self.assertAlmostEqual(np.interp(1000.0, data[ENERGIES_eV], data[MAC_cm2_g]), mac_cm2_g)
+
+    def test_read_data_missing_absorber(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "FFastMAC_custom.csv")
+            with open(file_path, 'w') as output_file:
+                output_file.write("0.01,1.0E+06,0.01,8.0E+05\n1.0,1.0E+02,1.0,8.0E+01\n")
+
+            mac = Chantler2005()
+            mac.read_mac_data(file_path)
+            mac_table = mac.experimental_data
+
+            self.assertAlmostEqual(1.0e2, mac.compute_mac_cm2_g(1000.0, 1))
+            self.assertIsNone(mac.read_data(92))
+            self.assertEqual(0.0, mac.compute_mac_cm2_g(1000.0, 92))
+            self.assertIs(mac_table, mac.experimental_data)
+            self.assertIn(1, mac.mac_data)
+
     def test_compute_mac_cm2_g(self):
         chantler2005 = Chantler2005()
 
@@ -179,3 +232,28 @@ class TestChantler2005(unittest.TestCase):
         energy_eV = 1000.0  # noqa
         mac_cm2_g = chantler2005.compute_mac_cm2_g(energy_eV, atomic_number)
         self.assertAlmostEqual(6.924559683551284, mac_cm2_g)
+
+    def test_compute_mac_cm2_g_array(self):
+        chantler2005 = Chantler2005()
+
+        energies_eV = np.array([13.7, 14.0, 14.8, 1000.0])  # noqa
+        macs_cm2_g = chantler2005.compute_mac_cm2_g(energies_eV, 1)
+
+        self.assertEqual((4,), macs_cm2_g.shape)
+        for energy_eV, mac_cm2_g in zip(energies_eV, macs_cm2_g):
+            self.assertAlmostEqual(chantler2005.compute_mac_cm2_g(energy_eV, 1), mac_cm2_g)
+
+        atomic_numbers = np.array([1, 6, 29, 92])
+        macs_cm2_g = chantler2005.compute_mac_cm2_g(8046.0, atomic_numbers)
+        for atomic_number, mac_cm2_g in zip(atomic_numbers, macs_cm2_g):
+            self.assertAlmostEqual(chantler2005.compute_mac_cm2_g(8046.0, atomic_number), mac_cm2_g)
+
+    def test_compute_mac_cm2_g_clamping(self):
+        chantler2005 = Chantler2005()
+
+        macs_cm2_g = chantler2005.compute_mac_cm2_g([1.0, 1.0, 1.0e7, 1.0e7], [1, 92, 1, 92])
+
+        self.assertAlmostEqual(2907600.0, macs_cm2_g[0])
+        self.assertAlmostEqual(43925.0, macs_cm2_g[1])
+        self.assertAlmostEqual(0.0000000088048, macs_cm2_g[2])
+        self.assertAlmostEqual(0.15459, macs_cm2_g[3])
@@ -28,10 +28,16 @@ Tests for the :py:mod:`xray_mac.mac.models.element_properties` module.
 # Standard library modules.
 
 # Third party modules.
+import numpy as np
+import pytest
 
 # Local modules.
 
 # Project modules.
+from xray_mac.mac.models.element_properties import get_element_table, AtomicNumberError, SymbolError, \
+    get_mean_ionization_energy_eV, get_mass_density_g_cm3, get_atomic_mass_g_mol, get_symbol, get_name, \
+    get_atomic_number_by_symbol, get_atomic_number_by_name, get_atomic_number, g_atomic_mass_g_mol, \
+    g_mass_density_g_cm3
 
 # Globals and constants variables.
 
@@ -43,3 +49,64 @@ def test_is_discovered():
     """
     # assert False
     assert True
+
+
+def test_element_table():
+    table = get_element_table()
+
+    assert table is get_element_table()
+    assert len(table.atomic_numbers) == 106
+    assert table.symbol(79) == "Au"
+    assert table.name(6) == "Carbon"
+    assert table.atomic_number("Au") == 79
+
+    assert table.atomic_mass_g_mol(79) == 196.9665
+    assert table.mass_density_g_cm3(6) == 2.62
+    assert table.plasmon_energy_eV(79) == 15.0
+    assert table.mean_ionization_energy_eV(6) == get_mean_ionization_energy_eV(6)
+    assert not table.atomic_masses_g_mol.flags.writeable
+
+    np.testing.assert_array_equal([1.0079, 12.011, 196.9665], table.atomic_mass_g_mol(np.array([1, 6, 79])))
+    np.testing.assert_array_equal([[0.0899], [19.3]], table.mass_density_g_cm3([[1], [79]]))
+
+
+def test_element_table_errors():
+    table = get_element_table()
+
+    for atomic_number in [0, 107]:
+        with pytest.raises(AtomicNumberError):
+            table.atomic_mass_g_mol(atomic_number)
+        with pytest.raises(AtomicNumberError):
+            table.symbol(atomic_number)
+
+    with pytest.raises(AtomicNumberError):
+        table.mass_density_g_cm3(106)
+    with pytest.raises(AtomicNumberError):
+        table.mass_density_g_cm3(np.array([79, 106]))
+    with pytest.raises(IndexError):
+        get_mass_density_g_cm3(106)
+    with pytest.raises(SymbolError):
+        table.atomic_number("Xx")
+    with pytest.raises(SymbolError):
+        table.atomic_number("au")
+    with pytest.raises(SymbolError):
+        table.atomic_number("Gold")
+
+
+def test_functions():
+    assert get_atomic_mass_g_mol(29) == g_atomic_mass_g_mol[28]
+    assert get_mass_density_g_cm3(29) == g_mass_density_g_cm3[28]
+    assert get_symbol(29) == "Cu"
+    assert get_name(29) == "Copper"
+    assert get_atomic_number_by_symbol("cu") == 29
+    assert get_atomic_number_by_name("copper") == 29
+    assert get_atomic_number(symbol="Cu") == 29
+
+
+def test_aluminum_name():
+    assert get_name(13) == "Aluminum"
+    assert get_element_table().name(13) == "Aluminium"
+    assert get_atomic_number_by_name("aluminum") == 13
+    assert get_atomic_number_by_name("Aluminium") == 13
+    assert get_atomic_number(name="Aluminum") == 13
+    assert get_atomic_number(name="aluminium") == 13
@@ -26,6 +26,7 @@ Tests for the :py:mod:`xray_mac.mac.models.heinrich1987` module.
 
 # Standard library modules.
 import unittest
+import warnings
 
 # Third party modules.
 
@@ -34,7 +35,8 @@ import unittest
 # Project modules.
 import numpy as np
 
-from xray_mac.mac.models.heinrich1987 import MacHeinrich1987
+from xray_mac.mac.models.heinrich1987 import MacHeinrich1987, summarize_validity, WARNING_MODE_NONE, \
+    WARNING_MODE_SUMMARY, VALIDITY_NEAR_EDGE, VALIDITY_VERY_LOW_ENERGY, VALIDITY_BELOW_M5
 from xray_mac.mac.models.ionization_energies import IonizationEnergiesDtsa
 
 
@@ -156,6 +158,101 @@ class TestMacHeinrich1987(unittest.TestCase):
 
         np.testing.assert_allclose(macs_ref_cm2_g, macs_cm2_g)
 
+    def test_mac_array(self):
+        energies_eV = np.geomspace(10.0, 1.0e5, 200)
+        atomic_numbers = np.array([5, 6, 29, 47, 60, 61, 69, 79, 92])
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+
+            macs_cm2_g = self.heinrich1987.compute_mac_cm2_g(energies_eV[:, np.newaxis], atomic_numbers)
+            self.assertEqual((200, 9), macs_cm2_g.shape)
+
+            for index_z, atomic_number in enumerate(atomic_numbers):
+                macs_ref_cm2_g = [self.heinrich1987.compute_mac_cm2_g(energy_eV, int(atomic_number))
+                                  for energy_eV in energies_eV]
+                np.testing.assert_allclose(macs_ref_cm2_g, macs_cm2_g[:, index_z], rtol=1.0e-10)
+
+            macs_cm2_g = self.heinrich1987.compute_mac_cm2_g(np.array([-50.0, 0.0, 1.0]), 79)
+            np.testing.assert_allclose([1.0E6, 1.0E6, 1.0E6], macs_cm2_g)
+
+    def test_get_regions(self):
+        energies_eV = np.array([-50.0, 1.0, 87.4, 759.77, 2206.6, 2292.0, 2743.9, 3148.7, 3425.8, 11919.0, 13734.0,
+                                14353.0, 80723.0])
+        regions = self.heinrich1987.get_regions(79, energies_eV)
+
+        for energy_eV, region in zip(energies_eV, regions):
+            self.assertEqual(self.heinrich1987.get_region(79, energy_eV), region)
+
+        regions = self.heinrich1987.get_regions(6, np.array([1.0, 300.0]))
+        np.testing.assert_array_equal([2, 1], regions)
+
+    def test_get_regions_edges(self):
+        heinrich1987 = MacHeinrich1987(warning_mode=WARNING_MODE_NONE)
+        tables = heinrich1987.coefficient_tables
+
+        for atomic_number in [3, 6, 13, 20, 29, 47, 79, 92]:
+            edges_eV = tables.edges_eV[atomic_number]  # noqa
+            energies_eV = np.concatenate([edges_eV, edges_eV + 1.0, edges_eV - 1.0, [1.0, 100.0, 1.0e5]])  # noqa
+
+            regions = heinrich1987.get_regions(atomic_number, energies_eV)
+            regions_ref = [heinrich1987.get_region(atomic_number, energy_eV) for energy_eV in energies_eV]
+            np.testing.assert_array_equal(regions_ref, regions)
+
+    def test_coefficient_tables(self):
+        tables = self.heinrich1987.coefficient_tables
+        self.assertIs(tables, self.heinrich1987.coefficient_tables)
+
+        self.assertAlmostEqual(self.heinrich1987.compute_C_region9(79), tables.C[79, 9])
+        self.assertAlmostEqual(self.heinrich1987.compute_n_region5(29), tables.n[29, 5])
+        self.assertAlmostEqual(self.heinrich1987.compute_a_region1(5), tables.a[5, 1])
+        self.assertAlmostEqual(self.heinrich1987.compute_b_region6_9(79), tables.b_eV[79, 6])
+        self.assertTrue(np.isnan(tables.b_eV[79, 11]))
+
+        self.heinrich1987.ionization_energies = IonizationEnergiesDtsa()
+        self.assertIsNot(tables, self.heinrich1987.coefficient_tables)
+
+    def test_mac_with_validity(self):
+        energies_eV = np.array([-50.0, 100.0, 1500.0, 2210.0, 8000.0])
+
+        with warnings.catch_warnings(record=True) as records:
+            warnings.simplefilter("always", UserWarning)
+            macs_cm2_g, flags = self.heinrich1987.compute_macs_cm2_g_with_validity(energies_eV, 79)
+            self.assertEqual(0, len(records))
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            np.testing.assert_allclose(self.heinrich1987.compute_mac_cm2_g(energies_eV, 79), macs_cm2_g)
+
+        self.assertEqual(0, flags[0])
+        self.assertEqual(VALIDITY_VERY_LOW_ENERGY | VALIDITY_BELOW_M5, flags[1])
+        self.assertEqual(VALIDITY_BELOW_M5, flags[2])
+        self.assertEqual(VALIDITY_NEAR_EDGE, flags[3])
+        self.assertEqual(0, flags[4])
+
+        summary = summarize_validity(flags)
+        self.assertEqual(5, summary["points"])
+        self.assertEqual(2, summary["valid"])
+        self.assertEqual(1, summary["near edge"])
+        self.assertEqual(2, summary["below M5"])
+
+    def test_warning_mode(self):
+        energies_eV = np.geomspace(100.0, 1.0e4, 50)
+
+        heinrich1987 = MacHeinrich1987(warning_mode=WARNING_MODE_SUMMARY)
+        with warnings.catch_warnings(record=True) as records:
+            warnings.simplefilter("always", UserWarning)
+            heinrich1987.compute_mac_cm2_g(energies_eV, 79)
+            self.assertEqual(1, len(records))
+            self.assertIn("of 50 points", str(records[0].message))
+
+        heinrich1987 = MacHeinrich1987(warning_mode=WARNING_MODE_NONE)
+        with warnings.catch_warnings(record=True) as records:
+            warnings.simplefilter("always", UserWarning)
+            heinrich1987.compute_mac_cm2_g(energies_eV, 79)
+            heinrich1987.compute_mac_cm2_g(100.0, 79)
+            self.assertEqual(0, len(records))
+
     def test_absorber_zinc(self):
         """
         Test energy region 5, Z > 29.
@@ -28,6 +28,7 @@ Tests for the :py:mod:`xray_mac.mac.models.heinrich_dtsa` module.
 import unittest
 
 # Third party modules.
+import numpy as np
 
 # Local modules.
 
@@ -55,3 +56,28 @@ class TestMacHeinrichDTSA(unittest.TestCase):
         value = self.macModel.compute_mac_cm2_g(1041.0, 79)
 
         self.assertAlmostEqual(4698.6, value, 1)
+
+    def test_compute_mac_cm2_g_array(self):
+        energies_eV = np.geomspace(1.0, 1.0e5, 500)
+        atomic_numbers = np.array([1, 3, 5, 6, 29, 50, 57, 60, 61, 79, 92, 96])
+
+        macs_cm2_g = self.macModel.compute_mac_cm2_g(energies_eV[:, np.newaxis], atomic_numbers)
+        self.assertEqual((500, 12), macs_cm2_g.shape)
+
+        for index_z, atomic_number in enumerate(atomic_numbers):
+            macs_ref_cm2_g = [self.macModel.compute_mac_cm2_g(energy_eV, int(atomic_number))
+                              for energy_eV in energies_eV]
+            np.testing.assert_allclose(macs_ref_cm2_g, macs_cm2_g[:, index_z], rtol=1.0e-10)
+
+        self.assertAlmostEqual(4698.6, self.macModel.compute_mac_cm2_g(np.array([1041.0]), 79)[0], 1)
+
+        with self.assertRaises(KeyError):
+            self.macModel.compute_mac_cm2_g(np.array([5.0, 1000.0]), 93)
+
+    def test_edge_energies_eV(self):
+        edge_energies_eV = self.macModel.edge_energies_eV
+        self.assertIs(edge_energies_eV, self.macModel.edge_energies_eV)
+
+        self.assertEqual((93, 10), edge_energies_eV.shape)
+        self.assertTrue(np.isnan(edge_energies_eV[0, 0]))
+        self.assertEqual(self.macModel.ionization_energies.ionization_energy_eV(79, 'M5'), edge_energies_eV[79, 8])
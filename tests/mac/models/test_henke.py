@@ -34,7 +34,7 @@ import pytest
 # Local modules.
 
 # Project modules.
-from xray_mac.mac.models.henke import MacHenke
+from xray_mac.mac.models.henke import MacHenke, get_henke_archive
 from xray_mac.mac.models.henke import wavelength_electron_nm, wavelength_electron_relativistic_nm, wavelength_photon_nm
 from xray_mac.mac import get_current_module_path
 
@@ -79,6 +79,19 @@ class TestMacHenke(unittest.TestCase):
 
         self.assertAlmostEqual(9.77, macs_cm2_g[-1], 2)
 
+    def test_archive(self):
+        archive = self.macData.get_archive()
+        self.assertIs(archive, get_henke_archive(os.path.join(self.macData.data_path, "sf.tar.gz")))
+
+        self.assertIn('ni', self.macData.get_elements())
+
+        energies_eV, f2s = archive.read_data('ni')  # noqa
+        self.assertIs(energies_eV, archive.read_data('ni')[0])
+        self.assertAlmostEqual(1.37727, f2s[0])
+
+        energies_eV, macs_cm2_g = self.macData.read_data(28)  # noqa
+        self.assertAlmostEqual(self.macData.compute_mac_cm2_g(28, energies_eV[-1], f2s[-1]), macs_cm2_g[-1])
+
     def test_wavelength(self):
         wavelengths_electron_non_relativistic_williams1996_nm = {
             100.0E3: 0.00386,
@@ -29,6 +29,7 @@ import os.path
 import unittest
 
 # Third party modules.
+import numpy as np
 import pytest
 
 # Local modules.
@@ -91,3 +92,34 @@ class TestMacHenke1993(unittest.TestCase):
         self.assertAlmostEqual(6.1090, mac2_cm2_g*1.0E-4, 2)
 
         self.assertAlmostEqual(7.58129, mac3_cm2_g*1.0E-4, 2)
+
+    def test_compute_mac_cm2_g_array(self):
+        energies_eV = np.geomspace(5.0, 40000.0, 200)
+        atomic_numbers = np.array([6, 14, 29, 79])
+
+        macs_cm2_g = self.mac.compute_mac_cm2_g(energies_eV[:, np.newaxis], atomic_numbers)
+        self.assertEqual((200, 4), macs_cm2_g.shape)
+
+        for index_z, atomic_number in enumerate(atomic_numbers):
+            macs_ref_cm2_g = [self.mac.compute_mac_cm2_g(energy_eV, int(atomic_number)) for energy_eV in energies_eV]
+            np.testing.assert_allclose(macs_ref_cm2_g, macs_cm2_g[:, index_z])
+
+        self.assertIsInstance(self.mac.compute_mac_cm2_g(1486.7, 28), float)
+
+    def test_bounds_per_element(self):
+        mac_au_cm2_g = self.mac.compute_mac_cm2_g(1.0, 79)
+        mac_cu_cm2_g = self.mac.compute_mac_cm2_g(1.0, 29)
+
+        self.assertEqual(self.mac.mac_data[79].minimum_y, mac_au_cm2_g)
+        self.assertEqual(self.mac.mac_data[29].minimum_y, mac_cu_cm2_g)
+        self.assertNotEqual(mac_au_cm2_g, mac_cu_cm2_g)
+
+        self.assertEqual(self.mac.mac_data[29].maximum_y, self.mac.compute_mac_cm2_g(1.0e5, 29))
+
+    def test_winxray(self):
+        data_path = get_current_module_path(__file__, "../../../data/henke1993/winxray")
+        mac = MacHenke1993(data_path, model='HenkeWinxray')
+
+        energies_eV = np.array([10.2, 1486.7])
+        np.testing.assert_allclose(self.mac.compute_mac_cm2_g(energies_eV, 28), mac.compute_mac_cm2_g(energies_eV, 28),
+                                   rtol=1.0e-3)
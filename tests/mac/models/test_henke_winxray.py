@@ -29,6 +29,7 @@ import unittest
 import os.path
 
 # Third party modules.
+import numpy as np
 import pytest
 
 # Local modules.
@@ -96,3 +97,14 @@ class TestMacHenkeWinxray(unittest.TestCase):
         self.assertAlmostEqual(30000.0, enegies_eV[-1], 1)
 
         self.assertAlmostEqual(9.77398, mac_cm2_g[-1], 1)
+
+        self.assertFalse(enegies_eV.flags.writeable)
+        self.assertIsInstance(enegies_eV.base, np.memmap)
+
+    def test_read_data(self):
+        energies_text_eV, macs_text_cm2_g = self.macData.read_data(28)  # noqa
+        energies_binary_eV, macs_binary_cm2_g = self.macData.read_data(28, binary=True)  # noqa
+
+        self.assertIsInstance(energies_text_eV, list)
+        np.testing.assert_allclose(energies_text_eV, energies_binary_eV, rtol=1.0e-5)
+        np.testing.assert_allclose(macs_text_cm2_g, macs_binary_cm2_g, rtol=1.0e-5)
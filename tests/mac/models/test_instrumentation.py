@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: tests.mac.models.test_instrumentation
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the :py:mod:`xray_mac.mac.models.instrumentation` module.
+"""
+
+###############################################################################
+# Copyright 2021 Hendrix Demers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###############################################################################
+
+# Standard library modules.
+import time
+
+# Third party modules.
+import numpy as np
+import pytest
+
+# Local modules.
+
+# Project modules.
+from xray_mac.mac.models import instrumentation
+from xray_mac.mac.models.instrumentation import instrumented, increment, record_cache, record_evaluation, timer, \
+    snapshot, reset, is_enabled
+from xray_mac.mac.models.chantler2005 import Chantler2005
+from xray_mac.mac.models.heinrich1987 import MacHeinrich1987, WARNING_MODE_NONE
+from xray_mac.mac.models.registry import compute_mac, MODEL_HEINRICH_DTSA
+
+# Globals and constants variables.
+
+
+@pytest.fixture(autouse=True)
+def disabled_instrumentation():
+    instrumentation.disable()
+    reset()
+    yield
+    instrumentation.disable()
+    reset()
+
+
+def test_is_discovered():
+    """
+    Test used to validate the file is included in the tests
+    by the test framework.
+    """
+    # assert False
+    assert True
+
+
+def test_disabled():
+    assert not is_enabled()
+
+    increment("test")
+    record_cache("test", True)
+    record_evaluation("model.test", 10)
+    with timer("test"):
+        pass
+
+    statistics = snapshot()
+    assert statistics == {"enabled": False, "counters": {}, "times_s": {}}
+
+
+def test_instrumented():
+    with instrumented() as statistics:
+        assert is_enabled()
+        increment("test")
+        increment("test", 2)
+        record_cache("test", True)
+        record_cache("test", False)
+        record_cache("test", False)
+        record_evaluation("model.test", 10)
+        record_evaluation("model.test", 5)
+        with timer("test"):
+            time.sleep(0.01)
+
+    assert not is_enabled()
+    assert statistics["enabled"]
+    assert statistics["counters"] == {"test": 3, "cache.test.hit": 1, "cache.test.miss": 2,
+                                      "model.test.evaluations": 2, "model.test.points": 15}
+    assert statistics["times_s"]["test"] >= 0.005
+
+    increment("test")
+    assert snapshot()["counters"]["test"] == 3
+
+
+def test_instrumented_reset():
+    with instrumented():
+        increment("test")
+
+    with instrumented(reset_statistics=False) as statistics:
+        increment("test")
+    assert statistics["counters"]["test"] == 2
+
+    with instrumented() as statistics:
+        increment("test")
+    assert statistics["counters"]["test"] == 1
+
+    reset()
+    assert snapshot()["counters"] == {}
+
+
+def test_instrumented_nested():
+    instrumentation.enable()
+    with instrumented():
+        pass
+    assert is_enabled()
+
+
+def test_timer_exception():
+    with pytest.raises(ValueError):
+        with instrumented() as statistics:
+            with timer("test"):
+                raise ValueError
+
+    assert "test" in statistics["times_s"]
+    assert not is_enabled()
+
+
+def test_chantler2005():
+    mac_model = Chantler2005()
+    energies_eV = np.linspace(1.0e3, 10.0e3, 100)
+
+    with instrumented() as statistics:
+        mac_model.compute_mac_cm2_g(energies_eV, 29)
+        mac_model.compute_mac_cm2_g(energies_eV, [[29], [79]])
+
+    counters = statistics["counters"]
+    assert counters["model.Chantler2005.evaluations"] == 2
+    assert counters["model.Chantler2005.points"] == 300
+    assert counters["cache.chantler2005.interpolation.miss"] == 2
+    assert counters["cache.chantler2005.interpolation.hit"] == 1
+    assert counters["interpolation.evaluations"] == 3
+    assert counters["interpolation.points"] == 300
+    assert statistics["times_s"]["interpolation"] > 0.0
+
+
+def test_heinrich1987():
+    mac_model = MacHeinrich1987(warning_mode=WARNING_MODE_NONE)
+
+    with instrumented() as statistics:
+        mac_model.compute_mac_cm2_g(1000.0, 29)
+        mac_model.compute_mac_cm2_g(np.linspace(1.0e3, 10.0e3, 10), 29)
+
+    counters = statistics["counters"]
+    assert counters["model.Heinrich1987.evaluations"] == 2
+    assert counters["model.Heinrich1987.points"] == 11
+    assert counters["heinrich1987.get_region"] == 1
+    assert counters["heinrich1987.get_regions.points"] == 10
+
+
+def test_compute_mac():
+    with instrumented() as statistics:
+        compute_mac(MODEL_HEINRICH_DTSA, [1.0e3, 2.0e3], 29)
+
+    assert statistics["counters"]["model.HeinrichDTSA.points"] == 2
+    assert "model.HeinrichDTSA" in statistics["times_s"]
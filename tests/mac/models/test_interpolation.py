@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: tests.mac.models.test_interpolation
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the :py:mod:`xray_mac.mac.models.interpolation` module.
+"""
+
+###############################################################################
+# Copyright 2021 Hendrix Demers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###############################################################################
+
+
+# Standard library modules.
+
+# Third party modules.
+import numpy as np
+import pytest
+
+# Local modules.
+
+# Project modules.
+from xray_mac.mac.models.interpolation import Interpolation1D, LINEAR, NEAREST, ZERO, SLINEAR, QUADRATIC, CUBIC, \
+    LOG_LOG
+
+# Globals and constants variables.
+
+
+def test_is_discovered():
+    """
+    Test used to validate the file is included in the tests
+    by the test framework.
+    """
+    # assert False
+    assert True
+
+
+@pytest.mark.parametrize("kind", [LINEAR, NEAREST, ZERO, SLINEAR, QUADRATIC, CUBIC])
+def test_same_as_interp1d(kind):
+    interpolate = pytest.importorskip("scipy.interpolate")
+
+    rng = np.random.default_rng(12345)
+    x = np.sort(rng.uniform(1.0, 100.0, 30))
+    y = rng.uniform(1.0, 10.0, (30, 2))
+    x_new = np.concatenate([rng.uniform(x[0], x[-1], 500), x])
+
+    values = Interpolation1D(x, y, kind=kind)(x_new)
+    assert values.shape == (len(x_new), 2)
+    np.testing.assert_allclose(interpolate.interp1d(x, y, kind=kind, axis=0)(x_new), values, rtol=1.0e-10)
+
+
+def test_unsorted():
+    x = np.array([4.0, 1.0, 2.0])
+    y = np.array([16.0, 1.0, 4.0])
+
+    interpolation = Interpolation1D(x, y)
+    np.testing.assert_allclose([10.0, 2.5, 4.0], interpolation(np.array([3.0, 1.5, 2.0])))
+    assert interpolation(np.array([[3.0], [1.5]])).shape == (2, 1)
+
+
+def test_edge():
+    x = np.array([1.0, 10.0, 10.0, 100.0])
+    y = np.array([100.0, 10.0, 1000.0, 10.0])
+
+    for kind in [LINEAR, LOG_LOG]:
+        interpolation = Interpolation1D(x, y, kind=kind)
+        assert interpolation(10.0 * (1.0 - 1.0e-12)) == pytest.approx(10.0)
+        assert interpolation(10.0) == pytest.approx(1000.0)
+        assert interpolation(np.array([1.0, 100.0])).tolist() == [100.0, 10.0]
+
+    interpolation = Interpolation1D(x, y, kind=LOG_LOG)
+    assert interpolation(np.sqrt(10.0)) == pytest.approx(np.sqrt(1000.0))
+    assert interpolation(np.sqrt(1000.0)) == pytest.approx(100.0)
+
+    with pytest.raises(ValueError):
+        Interpolation1D(x, y, kind=CUBIC)
+
+
+def test_step_tolerance():
+    x = np.array([1.0, 10.0, 10.0001, 100.0])
+    y = np.array([1.0, 10.0, 100.0, 1000.0])
+
+    assert Interpolation1D(x, y, kind=LOG_LOG)(10.00005) == pytest.approx(np.sqrt(1000.0), rel=1.0e-3)
+    assert Interpolation1D(x, y, kind=LOG_LOG, step_tolerance=1.0e-4)(10.00005) == pytest.approx(100.0, rel=1.0e-3)
+
+
+def test_log_log_zero():
+    x = np.array([10.0, 100.0, 1000.0])
+    y = np.array([1.0e2, 1.0e1, 0.0])
+
+    values = Interpolation1D(x, y, kind=LOG_LOG)(np.array([np.sqrt(1000.0), 550.0]))
+    np.testing.assert_allclose([np.sqrt(1000.0), 5.0], values)
+
+
+def test_log_log_edge():
+    """
+    Grid with a repeated abscissa at an edge and a zero value, as in the PENELOPE files.
+    """
+    x = np.array([10.0, 100.0, 100.0, 1000.0])
+    y = np.array([1.0e4, 1.0e2, 1.0e3, 0.0])
+
+    interpolation = Interpolation1D(x, y, kind=LOG_LOG, clamp=True)
+    values = interpolation(np.array([1.0, 10.0, np.sqrt(1000.0), 99.999, 100.0, 550.0, 2000.0]))
+    np.testing.assert_allclose([1.0e4, 1.0e4, 1.0e3, 1.0e2, 1.0e3, 500.0, 0.0], values, rtol=1.0e-4)
+
+    interpolation = Interpolation1D(x, np.stack([y, 2.0 * y], axis=-1), kind=LOG_LOG, clamp=True)
+    values = interpolation(np.array([[10.0, 100.0]]))
+    assert values.shape == (1, 2, 2)
+    np.testing.assert_allclose([[1.0e4, 2.0e4], [1.0e3, 2.0e3]], values[0])
+
+
+def test_bounds():
+    x = np.array([1.0, 2.0, 3.0])
+    y = np.array([1.0, 4.0, 9.0])
+
+    with pytest.raises(ValueError):
+        Interpolation1D(x, y)(np.array([0.5, 2.0]))
+    with pytest.raises(ValueError):
+        Interpolation1D(x, y, kind="spline")
+
+    interpolation = Interpolation1D(x, y, clamp=True)
+    np.testing.assert_array_equal([1.0, 2.5, 9.0], interpolation(np.array([0.5, 1.5, 4.0])))
+    assert not interpolation.coefficients.flags.writeable
@@ -25,15 +25,19 @@ Tests for the :py:mod:`xray_mac.mac.models.ionization_energies` module.
 ###############################################################################
 
 # Standard library modules.
+import threading
+import time
 import unittest
 
 # Third party modules.
+import numpy as np
 
 # Local modules.
 
 # Project modules.
 from xray_mac.mac import get_current_module_path
-from xray_mac.mac.models.ionization_energies import IonizationEnergies, SUBSHELLS, IonizationEnergiesDtsa
+from xray_mac.mac.models.ionization_energies import IonizationEnergies, SUBSHELLS, IonizationEnergiesDtsa, \
+    get_edge_table, read_ffast_edge_energies, preload
 
 # Globals and constants variables.
 
@@ -176,3 +180,88 @@ class TestIonizationEnergies(unittest.TestCase):
 
         self.assertAlmostEqual(18503.0, ionization_energies.ionization_energy_eV(95, "L3"))
         self.assertAlmostEqual(18503.0, ionization_energies.ionization_energy_eV(95, "LIII"))
+
+    def test_edge_table(self):
+        ionization_energies = IonizationEnergies()
+        edge_table = ionization_energies.get_edge_table()
+
+        self.assertIs(edge_table, IonizationEnergies().get_edge_table())
+        self.assertIsNot(edge_table, IonizationEnergiesDtsa().get_edge_table())
+        self.assertEqual((93, len(SUBSHELLS)), edge_table.energies_eV.shape)
+        self.assertFalse(edge_table.energies_eV.flags.writeable)
+        self.assertAlmostEqual(17166.3, edge_table.energies_eV[92, SUBSHELLS.index("L3")])
+        self.assertTrue(92 in edge_table)
+        self.assertFalse(0 in edge_table)
+        self.assertFalse(93 in edge_table)
+
+        self.assertEqual(24, edge_table.number_edges[92])
+        self.assertEqual(1, edge_table.number_edges[1])
+        self.assertTrue(np.all(np.diff(edge_table.sorted_energies_eV[92]) > 0.0))
+
+    def test_ionization_energy_eV_array(self):
+        ionization_energies = IonizationEnergies()
+        energies_eV = ionization_energies.ionization_energy_eV(np.array([[1], [92]]), "LIII")
+        np.testing.assert_allclose([[0.0], [17166.3]], energies_eV)
+        self.assertRaises(KeyError, ionization_energies.ionization_energy_eV, np.array([1, 93]), "K")
+
+        ionization_energies = IonizationEnergiesDtsa()
+        energies_eV = ionization_energies.ionization_energy_eV(np.array([1, 3, 95, 96]), "K")
+        np.testing.assert_allclose([0.0, 54.75, 125020.0, 0.0], energies_eV)
+
+    def test_region_index(self):
+        ionization_energies = IonizationEnergiesDtsa()
+        edge_k_eV = ionization_energies.ionization_energy_eV(29, "K")  # noqa
+        number_edges = ionization_energies.get_edge_table().number_edges[29]
+
+        self.assertEqual(number_edges, ionization_energies.region_index(29, edge_k_eV))
+        self.assertEqual(number_edges - 1, ionization_energies.region_index(29, edge_k_eV - 1.0))
+        self.assertEqual(0, ionization_energies.region_index(29, 1.0))
+        self.assertEqual(0, ionization_energies.region_index(1, 1.0e4))
+
+        indices = ionization_energies.region_index(np.array([29, 79]), np.array([[1.0], [1.0e6]]))
+        np.testing.assert_array_equal([[0, 0], [number_edges, ionization_energies.get_edge_table().number_edges[79]]],
+                                      indices)
+
+    def test_next_edges(self):
+        ionization_energies = IonizationEnergiesDtsa()
+        edge_k_eV = ionization_energies.ionization_energy_eV(29, "K")  # noqa
+        edge_l1_eV = ionization_energies.ionization_energy_eV(29, "L1")  # noqa
+
+        self.assertEqual(edge_k_eV, ionization_energies.next_edge_above_eV(29, 5000.0))
+        self.assertEqual(edge_l1_eV, ionization_energies.next_edge_below_eV(29, 5000.0))
+        self.assertEqual(edge_k_eV, ionization_energies.next_edge_below_eV(29, edge_k_eV))
+        self.assertEqual(np.inf, ionization_energies.next_edge_above_eV(29, 1.0e5))
+        self.assertEqual(0.0, ionization_energies.next_edge_below_eV(29, 1.0))
+
+        edges_eV = ionization_energies.next_edge_above_eV(np.array([29, 1]), 5000.0)  # noqa
+        np.testing.assert_array_equal([edge_k_eV, np.inf], edges_eV)
+
+        self.assertRaises(KeyError, IonizationEnergies().next_edge_above_eV, 93, 5000.0)
+
+    def test_get_edge_table_threads(self):
+        file_path = get_current_module_path(__file__, "../../../data/chantler2005/FFastEdgeDB.csv")
+        calls = []
+
+        def read_counted_edge_energies(path):
+            calls.append(path)
+            time.sleep(0.01)
+            return read_ffast_edge_energies(path)
+
+        edge_tables = []
+        threads = [threading.Thread(target=lambda: edge_tables.append(get_edge_table(file_path,
+                                                                                     read_counted_edge_energies)))
+                   for _index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual(8, len(edge_tables))
+        self.assertTrue(all(edge_table is edge_tables[0] for edge_table in edge_tables))
+
+    def test_preload(self):
+        ffast_edge_table, dtsa_edge_table = preload()
+
+        self.assertIs(ffast_edge_table, IonizationEnergies().get_edge_table())
+        self.assertIs(dtsa_edge_table, IonizationEnergiesDtsa().get_edge_table())
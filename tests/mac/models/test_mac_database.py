@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: tests.mac.models.test_mac_database
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the :py:mod:`xray_mac.mac.models.mac_database` module.
+"""
+
+###############################################################################
+# Copyright 2021 Hendrix Demers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###############################################################################
+
+# Standard library modules.
+
+# Third party modules.
+import numpy as np
+import pytest
+
+# Local modules.
+
+# Project modules.
+from xray_mac.mac.models.mac_database import build_mac_database, MacDatabase, get_mac_database, \
+    get_default_readers, read_database_data, get_default_data_path, MODEL_CHANTLER2005, MODEL_HENKE1993, \
+    MODEL_HENKE_WINXRAY, get_source_stamp
+from xray_mac.mac.models.chantler2005 import Chantler2005
+from xray_mac.mac.models.henke1993 import MacHenke1993
+
+# Globals and constants variables.
+
+
+def test_is_discovered():
+    """
+    Test used to validate the file is included in the tests
+    by the test framework.
+    """
+    # assert False
+    assert True
+
+
+def test_build_mac_database(tmp_path):
+    file_path = tmp_path / "mac_database.bin"
+
+    readers = {"Model": lambda atomic_number: ([10.0, 100.0, 1000.0 * atomic_number], [3.0, 2.0, 1.0 / atomic_number]),
+               "Empty": lambda atomic_number: ([], [])}
+    number_entries = build_mac_database(file_path, readers, atomic_numbers=[6, 29])
+    assert number_entries == 2
+
+    database = MacDatabase(file_path)
+    assert len(database) == 2
+    assert database.models() == ["Model"]
+    assert database.atomic_numbers("Model") == [6, 29]
+    assert ("Model", 29) in database
+    assert ("Empty", 29) not in database
+
+    energies_eV, macs_cm2_g = database.read_data("Model", 29)  # noqa
+    np.testing.assert_array_equal([10.0, 100.0, 29000.0], energies_eV)
+    np.testing.assert_array_equal([3.0, 2.0, 1.0 / 29], macs_cm2_g)
+    assert not energies_eV.flags.writeable
+
+    with pytest.raises(KeyError):
+        database.read_data("Model", 79)
+
+    assert get_mac_database(file_path) is get_mac_database(file_path)
+
+
+def test_build_mac_database_models(tmp_path):
+    file_path = tmp_path / "mac_database.bin"
+
+    build_mac_database(file_path, atomic_numbers=[28, 29])
+
+    database = MacDatabase(file_path)
+    assert database.models() == sorted([MODEL_CHANTLER2005, MODEL_HENKE1993, MODEL_HENKE_WINXRAY])
+
+    readers = get_default_readers()
+    for model in database.models():
+        energies_ref_eV, macs_ref_cm2_g = readers[model](28)  # noqa
+        energies_eV, macs_cm2_g = database.read_data(model, 28)  # noqa
+        np.testing.assert_array_equal(np.asarray(energies_ref_eV, dtype=float), energies_eV)
+        np.testing.assert_array_equal(np.asarray(macs_ref_cm2_g, dtype=float), macs_cm2_g)
+
+
+def test_bad_file(tmp_path):
+    file_path = tmp_path / "bad.bin"
+    file_path.write_bytes(b"\0" * 64)
+
+    with pytest.raises(ValueError):
+        MacDatabase(file_path)
+
+
+def test_read_database_data(tmp_path):
+    file_path = tmp_path / "mac_database.bin"
+    assert read_database_data("Model", 29, file_path) is None
+
+    build_mac_database(file_path, {"Model": lambda atomic_number: ([10.0, 100.0], [2.0, 1.0])}, atomic_numbers=[29])
+
+    energies_eV, macs_cm2_g = read_database_data("Model", 29, file_path)  # noqa
+    np.testing.assert_array_equal([10.0, 100.0], energies_eV)
+    np.testing.assert_array_equal([2.0, 1.0], macs_cm2_g)
+    assert read_database_data("Model", 79, file_path) is None
+    assert read_database_data("Other", 29, file_path) is None
+
+
+def test_source_stamp(tmp_path):
+    source_path = tmp_path / "source"
+    source_path.mkdir()
+    (source_path / "a.dat").write_bytes(b"1234")
+    (source_path / "b.dat").write_bytes(b"12")
+
+    assert get_source_stamp(source_path)[0] == 6
+    assert get_source_stamp(source_path / "a.dat")[0] == 4
+
+    file_path = tmp_path / "mac_database.bin"
+    readers = {"Model": lambda atomic_number: ([10.0, 100.0], [2.0, 1.0]),
+               "Other": lambda atomic_number: ([10.0, 100.0], [2.0, 1.0])}
+    build_mac_database(file_path, readers, atomic_numbers=[29], source_paths={"Model": source_path})
+
+    assert read_database_data("Model", 29, file_path, source_path) is not None
+    assert read_database_data("Other", 29, file_path) is not None
+    assert MacDatabase(file_path).is_source_current("Model", source_path)
+    assert not MacDatabase(file_path).is_source_current("Other", source_path)
+
+    (source_path / "b.dat").write_bytes(b"123")
+    database = MacDatabase(file_path)
+    assert not database.is_source_current("Model", source_path)
+    assert not database.is_source_current("Model", tmp_path / "missing")
+
+
+def test_stale_database(tmp_path):
+    source_path = tmp_path / "source.csv"
+    source_path.write_bytes(b"1234")
+
+    file_path = tmp_path / "mac_database.bin"
+    build_mac_database(file_path, {"Model": lambda atomic_number: ([10.0, 100.0], [2.0, 1.0])}, atomic_numbers=[29],
+                       source_paths={"Model": source_path})
+    source_path.write_bytes(b"12345")
+
+    assert read_database_data("Model", 29, file_path, source_path) is None
+    assert read_database_data("Model", 29, file_path) is not None
+
+
+def test_chantler2005_database(tmp_path):
+    file_path = tmp_path / "mac_database.bin"
+    build_mac_database(file_path, {MODEL_CHANTLER2005: lambda atomic_number: ([100.0, 1000.0], [4.0e4, 2.0e4])},
+                       atomic_numbers=[29],
+                       source_paths={MODEL_CHANTLER2005: get_default_data_path(MODEL_CHANTLER2005)})
+
+    mac = Chantler2005(database_file_path=file_path)
+    assert mac.compute_mac_cm2_g(550.0, 29) == pytest.approx(3.0e4)
+    assert len(mac.experimental_data) == 0
+
+    mac_ref = Chantler2005(database_file_path=tmp_path / "missing.bin")
+    mac_cm2_g = mac.compute_mac_cm2_g(1000.0, 79)
+    assert len(mac.experimental_data) == 92
+    assert mac_cm2_g == pytest.approx(mac_ref.compute_mac_cm2_g(1000.0, 79))
+
+
+def test_henke1993_database(tmp_path):
+    file_path = tmp_path / "mac_database.bin"
+    build_mac_database(file_path, atomic_numbers=[28, 29])
+
+    energies_eV = np.array([10.2, 280.0, 1486.7, 8047.8])
+    for model, database_model in [('Henke', MODEL_HENKE1993), ('HenkeWinxray', MODEL_HENKE_WINXRAY)]:
+        data_path = get_default_data_path(database_model)
+
+        mac = MacHenke1993(data_path, model=model, database_file_path=file_path)
+        assert mac.database_model == database_model
+        assert np.shares_memory(mac.read_data(29)[0], np.asarray(get_mac_database(file_path)._buffer))
+        assert not np.shares_memory(mac.read_data(79)[0], np.asarray(get_mac_database(file_path)._buffer))
+
+        mac_ref = MacHenke1993(data_path, model=model, database_file_path=tmp_path / "missing.bin")
+        for atomic_number in [29, 79]:
+            np.testing.assert_array_equal(mac_ref.compute_mac_cm2_g(energies_eV, atomic_number),
+                                          mac.compute_mac_cm2_g(energies_eV, atomic_number))
+
+    mac = MacHenke1993(str(tmp_path), database_file_path=file_path)
+    assert mac.database_model is None
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: tests.mac.models.test_mass_absorption_coefficient
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the :py:mod:`xray_mac.mac.models.mass_absorption_coefficient` module.
+"""
+
+###############################################################################
+# Copyright 2021 Hendrix Demers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###############################################################################
+
+
+# Standard library modules.
+
+# Third party modules.
+import numpy as np
+import pytest
+
+# Local modules.
+
+# Project modules.
+from xray_mac.mac.models.mass_absorption_coefficient import Material, parse_formula, atom_to_weight_fractions
+from xray_mac.mac.models.chantler2005 import Chantler2005
+from xray_mac.mac.models.heinrich_dtsa import MacHeinrichDTSA
+from xray_mac.mac.models.casino import MacCasino
+
+# Globals and constants variables.
+
+
+def test_is_discovered():
+    """
+    Test used to validate the file is included in the tests
+    by the test framework.
+    """
+    # assert False
+    assert True
+
+
+def test_parse_formula():
+    assert parse_formula("H2O") == {1: 2.0, 8: 1.0}
+    assert parse_formula("Ca5(PO4)3OH") == {20: 5.0, 15: 3.0, 8: 13.0, 1: 1.0}
+    assert parse_formula("Fe0.95O") == {26: 0.95, 8: 1.0}
+
+    for formula in ["", "2H2O", "H2O)", "(H2O", "h2o", "Xx2"]:
+        with pytest.raises(ValueError):
+            parse_formula(formula)
+
+
+def test_atom_to_weight_fractions():
+    weight_fractions = atom_to_weight_fractions({"H": 2, "O": 1})
+
+    assert weight_fractions[1] == pytest.approx(0.111894, abs=1.0e-6)
+    assert weight_fractions[8] == pytest.approx(0.888106, abs=1.0e-6)
+
+
+def test_material():
+    material = Material({"O": 0.888106, 1: 0.111894}, density_g_cm3=1.0, name="water")
+    np.testing.assert_array_equal([1, 8], material.atomic_numbers)
+    np.testing.assert_array_equal([0.111894, 0.888106], material.weight_fractions)
+
+    material_formula = Material.from_formula("H2O", density_g_cm3=1.0)
+    assert material_formula.name == "H2O"
+    np.testing.assert_allclose(material.weight_fractions, material_formula.weight_fractions, atol=1.0e-6)
+
+    with pytest.raises(ValueError):
+        Material({})
+
+    with pytest.raises(ValueError):
+        Material({1: -0.1})
+
+    with pytest.raises(ValueError):
+        Material.from_formula("H2O").compute_linear_absorption_coefficient_1_cm(1000.0, Chantler2005())
+
+
+@pytest.mark.parametrize("mac_model", [Chantler2005(), MacHeinrichDTSA(), MacCasino()])
+def test_compute_mac_cm2_g(mac_model):
+    material = Material({1: 0.111894, 8: 0.888106}, density_g_cm3=1.0)
+    energies_eV = np.array([930.0, 8046.0])  # noqa
+
+    macs_cm2_g = material.compute_mac_cm2_g(energies_eV, mac_model)
+    assert macs_cm2_g.shape == (2,)
+
+    for energy_eV, mac_cm2_g in zip(energies_eV, macs_cm2_g):
+        mac_ref_cm2_g = 0.111894 * mac_model.compute_mac_cm2_g(energy_eV, 1) + \
+                        0.888106 * mac_model.compute_mac_cm2_g(energy_eV, 8)
+        assert mac_cm2_g == pytest.approx(mac_ref_cm2_g)
+        assert material.compute_mac_cm2_g(energy_eV, mac_model) == pytest.approx(mac_ref_cm2_g)
+
+    assert material.compute_mac_cm2_g(energies_eV, mac_model)[1] == macs_cm2_g[1]
+    np.testing.assert_allclose(macs_cm2_g,
+                               material.compute_linear_absorption_coefficient_1_cm(energies_eV, mac_model))
+
+    macs_cm2_g = material.compute_mac_cm2_g(np.array([[930.0], [8046.0]]), mac_model)
+    assert macs_cm2_g.shape == (2, 1)
+
+
+def test_element_macs_cached():
+    material = Material.from_formula("SiO2", density_g_cm3=2.65)
+    mac_model = Chantler2005()
+    energies_eV = np.linspace(100.0, 10000.0, 5)  # noqa
+
+    columns = material.compute_element_macs_cm2_g(energies_eV, mac_model, grid_key="grid")
+    assert columns.shape == (5, 2)
+    assert columns is material.compute_element_macs_cm2_g(energies_eV.copy(), mac_model, grid_key="grid")
+    assert columns is not material.compute_element_macs_cm2_g(energies_eV, Chantler2005(), grid_key="grid")
+    assert columns is not material.compute_element_macs_cm2_g(energies_eV, mac_model, grid_key="other")
+    assert columns is not material.compute_element_macs_cm2_g(energies_eV[:4], mac_model, grid_key="grid")
+    assert material.compute_element_macs_cm2_g(energies_eV[:4], mac_model, grid_key="grid").shape == (4, 2)
+
+    assert columns is not material.compute_element_macs_cm2_g(energies_eV, mac_model)
+    np.testing.assert_array_equal(columns, material.compute_element_macs_cm2_g(energies_eV, mac_model))
+    np.testing.assert_array_equal(columns @ material.weight_fractions,
+                                  material.compute_mac_cm2_g(energies_eV, mac_model, grid_key="grid"))
+    assert all(key[1] is not None for key in material._columns)
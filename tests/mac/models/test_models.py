@@ -24,12 +24,18 @@ Tests for the :py:mod:`xray_mac.mac.models` package.
 # limitations under the License.
 
 # Standard library modules.
+import os
+import pkgutil
+import subprocess
+import sys
 
 # Third party modules.
 
 # Local modules.
 
 # Project modules.
+from xray_mac import get_current_module_path
+import xray_mac.mac.models
 
 # Globals and constants variables.
 
@@ -40,3 +46,20 @@ def test_is_discovered():
     by the test framework.
     """
     assert True
+
+
+def test_lazy_imports():
+    module_names = ["xray_mac.mac.models.%s" % module.name
+                    for module in pkgutil.iter_modules(xray_mac.mac.models.__path__)]
+    assert "xray_mac.mac.models.chantler2005" in module_names
+
+    code = "import sys, %s; print(sorted(name for name in sys.modules if name.split('.')[0] in " \
+           "['scipy', 'h5py', 'matplotlib'])); casino = xray_mac.mac.models.casino; " \
+           "print(casino._henke_ebisu_coefficients is None and casino._heinrich_tables is None)"
+    code = code % ", ".join(module_names)
+
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = str(get_current_module_path(__file__, "../../.."))
+    result = subprocess.run([sys.executable, "-c", code], env=environment, capture_output=True, text=True, check=True)
+
+    assert result.stdout.split() == ["[]", "True"]
@@ -26,15 +26,20 @@ Tests for the :py:mod:`xray_mac.mac.models.penelope` module.
 ###############################################################################
 
 # Standard library modules.
+import io
 import os.path
+import zipfile
 
 # Third party modules.
+import numpy as np
+import pytest
 
 # Local modules.
 
 # Project modules.
 from xray_mac.mac import get_current_module_path
-from xray_mac.mac.models.penelope import list_files, PhotoElectric
+from xray_mac.mac.models.penelope import list_files, PhotoElectric, get_photo_electric_data, read_photo_electric_data, \
+    MacPenelope2018, insert_edge_knots
 
 # Globals and constants variables.
 
@@ -48,6 +53,161 @@ def test_is_discovered():
     assert True
 
 
+def create_photo_electric_file(atomic_number, shell_ids, ionization_energies_eV, rows):
+    lines = ["#  PENELOPE (v. 2018) photoelectric database",
+             "# IZ, NS, NGE: {:3d} {:3d} {:4d}".format(atomic_number, len(shell_ids), len(rows)),
+             "# Shell:     " + " ".join("{:11d}".format(shell_id) for shell_id in shell_ids),
+             "# Eion (eV)  " + " ".join("{:11.4E}".format(energy_eV) for energy_eV in ionization_energies_eV),
+             "#  Energy      Total"]
+    for row in rows:
+        lines.append(" ".join("{:12.5E}".format(value) for value in row))
+
+    return "\r\n".join(lines).encode("UTF-8")
+
+
+@pytest.fixture
+def photo_electric_file_path(tmp_path):
+    carbon_rows = [[50.0, 1.0e6, 0.0], [288.0, 1.0e5, 0.0], [288.0, 2.0e6, 1.9e6], [1.0e4, 2.0e2, 1.9e2]]
+    gold_rows = [[50.0, 1.92283E+07, 0.0, 0.0], [1.0e9, 1.08103E-03, 9.13454E-04, 4.87514E-11]]
+
+    photacs_file = io.BytesIO()
+    with zipfile.ZipFile(photacs_file, "w") as zip_file:
+        zip_file.writestr("pdgph-photacs/pdgph06.p18", create_photo_electric_file(6, [1], [288.0], carbon_rows[1:]))
+
+    file_path = tmp_path / "pendbase.zip"
+    with zipfile.ZipFile(file_path, "w") as zip_file:
+        zip_file.writestr("pendbase/readme.txt", "")
+        zip_file.writestr("pendbase/pdfiles/pdgph06.p18", create_photo_electric_file(6, [1], [288.0], carbon_rows))
+        zip_file.writestr("pendbase/pdfiles/pdgph79.p18", create_photo_electric_file(79, [1, 30], [80729.0, 5.0],
+                                                                                     gold_rows))
+        zip_file.writestr("pendbase/pdfiles/pdgph-photacs.zip", photacs_file.getvalue())
+
+    return file_path
+
+
+def test_read_photo_electric_data(photo_electric_file_path):
+    data = read_photo_electric_data(photo_electric_file_path)
+
+    assert data.atomic_numbers == [6, 79]
+    assert 6 in data
+    assert 7 not in data
+    assert data.energies_eV.shape == (6,)
+    assert data.partials_barn.shape == (6, 2)
+    assert not data.energies_eV.flags.writeable
+
+    shell_ids, ionization_energies_eV, energies_eV, totals_barn, partials_barn = data.element(79)  # noqa
+    np.testing.assert_array_equal([1, 30], shell_ids)
+    np.testing.assert_array_equal([80729.0, 5.0], ionization_energies_eV)
+    np.testing.assert_array_equal([50.0, 1.0e9], energies_eV)
+    np.testing.assert_array_equal([1.92283E+07, 1.08103E-03], totals_barn)
+    assert partials_barn[-1, -1] == 4.87514E-11
+
+    shell_ids, ionization_energies_eV, energies_eV, totals_barn, partials_barn = data.element(6)  # noqa
+    assert partials_barn.shape == (4, 1)
+    np.testing.assert_array_equal([288.0, 288.0], energies_eV[1:3])
+
+    with pytest.raises(KeyError):
+        data.element(7)
+
+    data = read_photo_electric_data(photo_electric_file_path, with_normalization=False)
+    assert data.atomic_numbers == [6]
+    assert data.element(6)[2].shape == (3,)
+
+
+def test_photo_electric_read_cache(photo_electric_file_path):
+    data = get_photo_electric_data(photo_electric_file_path)
+    assert data is get_photo_electric_data(photo_electric_file_path)
+    assert data is not get_photo_electric_data(photo_electric_file_path, with_normalization=False)
+
+    photo_electric = PhotoElectric()
+    photo_electric.read_data(photo_electric_file_path, 79)
+    assert photo_electric.atomic_number == 79
+    assert photo_electric.number_shells == 2
+    assert photo_electric.number_grid_energies == 2
+    assert photo_electric.shell_ids == [1, 30]
+    assert photo_electric.ionization_energies_eV[0] == 80729.0
+    assert photo_electric.totals_barn[0] == 1.92283E+07
+    assert photo_electric.partials_barn.shape == (2, 2)
+
+    photo_electric.read_data(photo_electric_file_path, 6, with_normalization=False)
+    assert photo_electric.atomic_number == 6
+    assert photo_electric.number_grid_energies == 3
+
+
+def test_mac_penelope(photo_electric_file_path):
+    mac = MacPenelope2018(photo_electric_file_path)
+
+    photo_electric = PhotoElectric()
+    photo_electric.read_data(photo_electric_file_path, 79)
+    assert mac.compute_mac_cm2_g(50.0, 79) == pytest.approx(photo_electric.totals_cm2_g[0])
+    assert mac.factors_cm2_g[79] == photo_electric.factor_cm2_g
+    assert np.isnan(mac.factors_cm2_g[7])
+
+    photo_electric.read_data(photo_electric_file_path, 6)
+    energies_eV = np.array([287.999, 288.0, 1.0e4])  # noqa
+    macs_cm2_g = mac.compute_mac_cm2_g(energies_eV, 6)
+    assert macs_cm2_g.shape == (3,)
+    np.testing.assert_allclose(photo_electric.totals_cm2_g[[1, 2, 3]], macs_cm2_g, rtol=1.0e-5)
+
+    macs_cm2_g = mac.compute_mac_cm2_g(energies_eV[:, np.newaxis], [6, 79])
+    assert macs_cm2_g.shape == (3, 2)
+
+    macs_cm2_g = mac.compute_subshell_mac_cm2_g(energies_eV, 6, "K")
+    np.testing.assert_allclose(photo_electric.partials_cm2_g[[1, 2, 3], 0], macs_cm2_g, rtol=1.0e-5)
+
+    macs_cm2_g = mac.compute_subshell_mac_cm2_g(1.0e9, [6, 79], ["K", "L3", 30])
+    assert macs_cm2_g.shape == (2, 3)
+    assert macs_cm2_g[0, 1] == 0.0
+    assert macs_cm2_g[0, 2] == 0.0
+    assert macs_cm2_g[1, 2] == pytest.approx(4.87514E-11 * mac.factors_cm2_g[79])
+
+    with pytest.raises(KeyError):
+        mac.compute_mac_cm2_g(1000.0, 7)
+
+
+def test_insert_edge_knots():
+    energies_eV = np.array([100.0, 1000.0, 2000.0, 4000.0])  # noqa
+    values = np.array([1.0e9, 1.0e6, 1.25e6, 1.5625e5])
+
+    grid_eV, edge_values = insert_edge_knots(energies_eV, values, [50.0, 1000.0, 1500.0, np.nan, 5000.0])  # noqa
+    np.testing.assert_array_equal([100.0, 1000.0, 1500.0, 1500.0, 2000.0, 4000.0], grid_eV)
+    np.testing.assert_allclose([1.0e15 / 1500.0**3, 1.0e16 / 1500.0**3], edge_values[2:4])
+
+    grid_eV, edge_values = insert_edge_knots(energies_eV[1:3], values[1:3], [1500.0])  # noqa
+    np.testing.assert_array_equal([1.0e6, 1.0e6, 1.25e6, 1.25e6], edge_values)
+
+    grid_eV, edge_values = insert_edge_knots(energies_eV, np.stack([values, values], axis=-1), [1500.0])  # noqa
+    assert edge_values.shape == (6, 2)
+
+
+def test_mac_penelope_edge_between_grid_energies(tmp_path):
+    """
+    The K edge at 1500 eV is between two grid energies, the cross sections follow E^-3 with a jump of 10 at the edge.
+    """
+    rows = [[energy_eV, total_barn, 0.9 * total_barn if energy_eV > 1500.0 else 0.0]
+            for energy_eV, total_barn in [(100.0, 1.0e9 / 100.0**3), (1000.0, 1.0e9 / 1000.0**3),
+                                          (2000.0, 1.0e10 / 2000.0**3), (4000.0, 1.0e10 / 4000.0**3),
+                                          (8000.0, 1.0e10 / 8000.0**3)]]
+    photacs_file = io.BytesIO()
+    with zipfile.ZipFile(photacs_file, "w") as zip_file:
+        zip_file.writestr("pdgph-photacs/pdgph13.p18", create_photo_electric_file(13, [1], [1500.0], rows))
+
+    file_path = tmp_path / "pendbase.zip"
+    with zipfile.ZipFile(file_path, "w") as zip_file:
+        zip_file.writestr("pendbase/pdfiles/pdgph13.p18", create_photo_electric_file(13, [1], [1500.0], rows))
+        zip_file.writestr("pendbase/pdfiles/pdgph-photacs.zip", photacs_file.getvalue())
+
+    mac = MacPenelope2018(file_path)
+
+    energies_eV = np.array([1200.0, 1499.999, 1500.0, 1800.0])  # noqa
+    totals_barn = np.array([1.0e9, 1.0e9, 1.0e10, 1.0e10]) / energies_eV**3
+    macs_cm2_g = mac.compute_mac_cm2_g(energies_eV, 13)
+    np.testing.assert_allclose(totals_barn * mac.factors_cm2_g[13], macs_cm2_g, rtol=1.0e-10)
+
+    macs_cm2_g = mac.compute_subshell_mac_cm2_g(energies_eV, 13, "K")
+    np.testing.assert_allclose([0.0, 0.0, 0.9, 0.9] * totals_barn * mac.factors_cm2_g[13], macs_cm2_g, rtol=1.0e-10)
+
+
 def test_data_file():
     data_file_path = get_current_module_path(__file__, "../../../data/penelope2018/pendbase.zip")
 
@@ -28,11 +28,14 @@ Tests for the :py:mod:`xray_mac.mac.models.pouchou1991` module.
 import unittest
 
 # Third party modules.
+import numpy as np
 
 # Local modules.
 
 # Project modules.
-from xray_mac.mac.models.pouchou1991 import MacPouchou1991
+from xray_mac.mac.models.pouchou1991 import MacPouchou1991, MacOverride, get_table, MACS_cm2_g
+from xray_mac.mac.models.heinrich_dtsa import MacHeinrichDTSA
+from xray_mac.mac.models.xray_lines import mac_for_lines
 
 # Globals and constants variables.
 
@@ -87,3 +90,36 @@ class TestMacPouchou1991(unittest.TestCase):
         self.assertEqual('Lb', self.mac.extract_transition_key('Lb2'))
 
         self.assertEqual('Ma', self.mac.extract_transition_key('Ma'))
+
+    def test_get_table(self):
+        table = get_table()
+        self.assertIs(table, get_table())
+        self.assertEqual(len(MACS_cm2_g), len(table))
+        self.assertFalse(table.flags.writeable)
+
+        self.assertTrue(np.all(np.diff(self.mac.codes) > 0))
+
+        for line, atomic_number_emitter, atomic_number_absorber, mac_cm2_g in MACS_cm2_g:
+            self.assertEqual(mac_cm2_g, self.mac.data_mac_cm2_g[line][atomic_number_emitter][atomic_number_absorber])
+            self.assertEqual(mac_cm2_g, self.mac.mac_cm2_g(atomic_number_absorber, atomic_number_emitter, line))
+
+    def test_compute_macs_cm2_g(self):
+        macs_cm2_g = self.mac.compute_macs_cm2_g([73, 5, 26, 73, 29, 300], [14, 5, 6, 14, 29, 5],
+                                                 ['Ka', 'Ka1', 'K', 'La', 'Lb2', 'Ka'])
+        np.testing.assert_array_equal([1490.0, 3500.0, 13500.0, np.nan, 6750.0, np.nan], macs_cm2_g)
+
+        macs_cm2_g = self.mac.compute_macs_cm2_g([[5], [6]], 6, ['Ka', 'Kb'])
+        np.testing.assert_array_equal([[39000.0, np.nan], [2170.0, np.nan]], macs_cm2_g)
+
+    def test_mac_override(self):
+        mac_model = MacHeinrichDTSA()
+        mac_override = MacOverride(mac_model, self.mac)
+
+        self.assertEqual(39000.0, mac_override.compute_mac_cm2_g(6, 'Ka', 5))
+        self.assertAlmostEqual(mac_for_lines(29, 'Ka', 13, mac_model), mac_override.compute_mac_cm2_g(29, 'Ka', 13))
+
+        macs_cm2_g = mac_override.compute_mac_cm2_g([6, 29, 29], ['Ka', 'Ka1', 'La'], [[5], [29]])
+        self.assertEqual((2, 3), macs_cm2_g.shape)
+        self.assertEqual(39000.0, macs_cm2_g[0, 0])
+        self.assertEqual(1755.0, macs_cm2_g[1, 2])
+        self.assertAlmostEqual(mac_for_lines(29, 'Ka1', 29, mac_model), macs_cm2_g[1, 1])
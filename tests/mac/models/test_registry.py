@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: tests.mac.models.test_registry
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the :py:mod:`xray_mac.mac.models.registry` module.
+"""
+
+###############################################################################
+# Copyright 2021 Hendrix Demers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###############################################################################
+
+# Standard library modules.
+
+# Third party modules.
+import numpy as np
+import pytest
+
+# Local modules.
+
+# Project modules.
+from xray_mac.mac.models.registry import compute_mac, get_engine, get_model_names, register_model, convert_to_eV, \
+    MODEL_CHANTLER2005, MODEL_HENKE1993, MODEL_HENKE_WINXRAY, MODEL_HEINRICH1987, MODEL_HEINRICH_DTSA, MODEL_CASINO, \
+    MODEL_PENELOPE2018, ENERGY_UNIT_keV, WAVELENGTH_UNIT_A, HC_eV_A
+from xray_mac.mac.models.chantler2005 import Chantler2005
+from xray_mac.mac.models.heinrich1987 import MacHeinrich1987, WARNING_MODE_NONE
+from xray_mac.mac.models.heinrich_dtsa import MacHeinrichDTSA
+from xray_mac.mac.models.henke_winxray import MacHenkeWinxray
+
+# Globals and constants variables.
+
+
+def test_is_discovered():
+    """
+    Test used to validate the file is included in the tests
+    by the test framework.
+    """
+    # assert False
+    assert True
+
+
+def test_get_model_names():
+    model_names = get_model_names()
+    for model_name in [MODEL_CHANTLER2005, MODEL_HENKE1993, MODEL_HENKE_WINXRAY, MODEL_HEINRICH1987,
+                       MODEL_HEINRICH_DTSA, MODEL_CASINO, MODEL_PENELOPE2018]:
+        assert model_name in model_names
+
+
+def test_get_engine():
+    engine = get_engine(MODEL_CHANTLER2005)
+    assert isinstance(engine, Chantler2005)
+    assert get_engine(MODEL_CHANTLER2005) is engine
+
+    engine = get_engine(MODEL_HEINRICH1987, warning_mode=WARNING_MODE_NONE)
+    assert isinstance(engine, MacHeinrich1987)
+    assert engine.warning_mode == WARNING_MODE_NONE
+    assert get_engine(MODEL_HEINRICH1987) is not engine
+
+    engine = get_engine(MODEL_HENKE_WINXRAY, database_file_path="missing.bin")
+    assert engine.database_file_path == "missing.bin"
+    assert isinstance(engine.mac_model, MacHenkeWinxray)
+
+    with pytest.raises(KeyError):
+        get_engine("Unknown")
+
+
+def test_register_model():
+    class ModelTest:
+        def __init__(self, factor=1.0):
+            self.factor = factor
+
+        def compute_mac_cm2_g(self, energies_eV, atomic_numbers):  # noqa
+            return self.factor * np.asarray(energies_eV) * np.asarray(atomic_numbers)
+
+    register_model("Test", ModelTest)
+    engine = get_engine("Test")
+    assert "Test" in get_model_names()
+
+    assert compute_mac("Test", 10.0, 2) == pytest.approx(20.0)
+    assert compute_mac("Test", 10.0, 2, factor=2.0) == pytest.approx(40.0)
+
+    register_model("Test", lambda: ModelTest(3.0))
+    assert get_engine("Test") is not engine
+    assert compute_mac("Test", 10.0, 2) == pytest.approx(60.0)
+
+
+def test_get_engine_unhashable_options():
+    class ModelTest:
+        def __init__(self, factors=None):
+            self.factors = factors
+
+        def compute_mac_cm2_g(self, energies_eV, atomic_numbers):  # noqa
+            return sum(self.factors) * np.asarray(energies_eV) * np.asarray(atomic_numbers)
+
+    register_model("Test", ModelTest)
+    engine = get_engine("Test", factors=[1.0, 2.0])
+    assert engine.factors == [1.0, 2.0]
+    assert get_engine("Test", factors=[1.0, 2.0]) is not engine
+    assert get_engine("Test", factors=(1.0, 2.0)) is get_engine("Test", factors=(1.0, 2.0))
+
+    assert compute_mac("Test", 10.0, 2, factors=[1.0, 2.0]) == pytest.approx(60.0)
+
+    with pytest.raises(KeyError):
+        get_engine("Unknown", factors=[1.0])
+
+
+def test_convert_to_eV():
+    assert convert_to_eV(10.0) == pytest.approx(10.0)
+    np.testing.assert_allclose([1000.0, 8046.0], convert_to_eV([1.0, 8.046], ENERGY_UNIT_keV))
+    assert convert_to_eV(1.0, WAVELENGTH_UNIT_A) == pytest.approx(HC_eV_A)
+
+    with pytest.raises(ValueError):
+        convert_to_eV(1.0, "J")
+
+
+def test_compute_mac():
+    mac_cm2_g = compute_mac(MODEL_HEINRICH_DTSA, 8046.0, 29)
+    assert isinstance(mac_cm2_g, float)
+    assert mac_cm2_g == pytest.approx(MacHeinrichDTSA().compute_mac_cm2_g(8046.0, 29))
+
+    macs_cm2_g = compute_mac(MODEL_HEINRICH_DTSA, [[8.046], [1.4867]], [13, 29], energy_unit=ENERGY_UNIT_keV)
+    assert macs_cm2_g.shape == (2, 2)
+    assert macs_cm2_g[0, 1] == pytest.approx(mac_cm2_g)
+
+    for model_name in [MODEL_CHANTLER2005, MODEL_HENKE1993, MODEL_HENKE_WINXRAY, MODEL_CASINO]:
+        mac_cm2_g = compute_mac(model_name, 8046.0, 29)
+        assert mac_cm2_g == pytest.approx(50.0, rel=0.1)
+        np.testing.assert_allclose([mac_cm2_g, mac_cm2_g], compute_mac(model_name, [8046.0, 8046.0], 29))
@@ -35,6 +35,7 @@ import numpy as np
 
 # Project modules.
 from xray_mac.mac import get_current_module_path
+from xray_mac.mac.models import instrumentation
 
 # Globals and constants variables.
 # Define used to related element name and atomic number.
@@ -64,12 +65,31 @@ CC = 0.92
 CH_H2O = 0.1111
 CO = 0.8889
 
+# Product of the Planck constant and the speed of light to convert x-ray energies and wavelengths.
+HC_eV_A = 12398.1  # noqa
+HC_keV_A = 12.3981  # noqa
+
 NOISE_FWHM = 53.0
 DETECTOR_FWHM = 1.61
 HDV = 0.01
 
 noz = 0
 
+# Energy and there corresponding columns value in the kcoeff.prn (0) and lcoeff.prn (1) files.
+# position is a pair of (fileIndex, columnIndex).
+# Updated value to have the same energy for x-ray line and in the files.
+HENKE_EBISU_ENERGIES_keV = np.array([0.183, 0.277, 0.392, 0.452, 0.525, 0.573, 0.637, 0.677, 0.705, 0.776,  # noqa
+                                     0.848, 0.852, 0.930, 1.012])
+# Original values
+# energie[14] ={0.185, 0.281, 0.392, 0.452, 0.525, 0.573, 0.637, 0.677, 0.705, 0.776, 0.849, 0.852, 0.930, 1.012}
+HENKE_EBISU_POSITIONS = [[0, 1], [0, 2], [0, 3], [1, 1], [0, 4], [1, 3], [1, 4], [0, 5], [1, 5], [1, 6], [0, 6],
+                         [1, 7], [1, 8], [1, 9]]
+HENKE_EBISU_MINIMUM_ATOMIC_NUMBER = 3
+HENKE_EBISU_MAXIMUM_ATOMIC_NUMBER = 94
+
+_henke_ebisu_coefficients = None
+_heinrich_tables = None
+
 # Inner-shell ionisation energy (critical excitation energy) in keV.
 transitions = [
     [0.013598, 0.000000, 0.000000, 0.000000, 0.000000, 0.000000, 0.000000, 0.000000, 0.000000, 0.000000],
@@ -203,7 +223,7 @@ def mac_zaluzec_cm2_g(wavelength_A, atomic_number_absorber):  # noqa
     l_A = wavelength_A  # noqa
     absorber = atomic_number_absorber
 
-    energy_eV = 12398.1 / l_A  # noqa
+    energy_eV = HC_eV_A / l_A  # noqa
     c = 0.
     n = 0.
     c_abs = 0.0
@@ -240,7 +260,7 @@ def mac_zaluzec_cm2_g(wavelength_A, atomic_number_absorber):  # noqa
                 logging.error("Erreur dans la fonction COEFF_ABS H")
                 raise ValueError
             else:
-                c_abs = c * math.pow((12398.1 / energy_eV), n)
+                c_abs = c * math.pow((HC_eV_A / energy_eV), n)
 
             if c_abs < 0.0:
                 c_abs = 0.0
@@ -262,7 +282,7 @@ def mac_zaluzec_cm2_g(wavelength_A, atomic_number_absorber):  # noqa
                 logging.error("\n\nerreur dans la fonction COEFF_ABS Be")
                 raise ValueError
             else:
-                c_abs = c * math.pow((12398.1 / energy_eV), n)
+                c_abs = c * math.pow((HC_eV_A / energy_eV), n)
 
             return c_abs
 
@@ -281,7 +301,7 @@ def mac_zaluzec_cm2_g(wavelength_A, atomic_number_absorber):  # noqa
                 logging.error("\n\nerreur dans la fonction COEFF_ABS C")
                 raise ValueError
             else:
-                c_abs = c * math.pow((12398.1 / energy_eV), n)
+                c_abs = c * math.pow((HC_eV_A / energy_eV), n)
 
             return c_abs
 
@@ -297,7 +317,7 @@ def mac_zaluzec_cm2_g(wavelength_A, atomic_number_absorber):  # noqa
                 logging.error("\n\nerreur dans la fonction COEFF_ABS O")
                 raise ValueError
             else:
-                c_abs = c * math.pow((12398.1 / energy_eV), n)
+                c_abs = c * math.pow((HC_eV_A / energy_eV), n)
 
             return c_abs
 
@@ -305,7 +325,7 @@ def mac_zaluzec_cm2_g(wavelength_A, atomic_number_absorber):  # noqa
             if 556 < energy_eV <= 1487:
                 c = 1.2860
                 n = 2.712
-                c_abs = c * math.pow((12398.1 / energy_eV), n)
+                c_abs = c * math.pow((HC_eV_A / energy_eV), n)
 
                 return c_abs
             if energy_eV <= 556:
@@ -326,7 +346,7 @@ def mac_zaluzec_cm2_g(wavelength_A, atomic_number_absorber):  # noqa
             if 637 < energy_eV <= 1487:
                 c = 1.759
                 n = 2.706
-                c_abs = c * math.pow((12398.1 / energy_eV), n)
+                c_abs = c * math.pow((HC_eV_A / energy_eV), n)
 
                 return c_abs
 
@@ -345,7 +365,7 @@ def mac_zaluzec_cm2_g(wavelength_A, atomic_number_absorber):  # noqa
             if 776 < energy_eV <= 1487:
                 c = 41.17
                 n = 1.906
-                c_abs = c * math.pow((12398.1 / energy_eV), n)
+                c_abs = c * math.pow((HC_eV_A / energy_eV), n)
 
                 return c_abs
 
@@ -376,7 +396,7 @@ def special_equations(energy_keV, atomic_number):  # noqa
     """
     z = atomic_number
 
-    l_A = 12.3981 / energy_keV  # noqa
+    l_A = HC_keV_A / energy_keV  # noqa
     if z == 1:
         if 2.0 >= energy_keV >= 1:
             macs = 3.0353 * math.pow(l_A, 0.01460)
@@ -556,12 +576,82 @@ def special_equations(energy_keV, atomic_number):  # noqa
     return 0.0
 
 
+def read_coefficient_file(file_path):
+    """
+    Read a CASINO coefficient file (KCOEFF.PRN or LCOEFF.PRN) into a (number of rows, number of columns) array.
+
+    @param file_path path of the coefficient file.
+    @return coefficients, the first row is for lithium (Z = 3).
+    """
+    rows = []
+    with open(file_path, 'r') as coefficient_file:
+        for line in coefficient_file:
+            items = line.split()
+            # Skip the DOS end of file marker.
+            if len(items) > 1:
+                rows.append([float(item) for item in items])
+
+    return np.array(rows)
+
+
+def get_henke_ebisu_coefficients():
+    """
+    Return the Henke and Ebisu (1974) coefficients as a (Z, energy) table.
+
+    Both KCOEFF.PRN and LCOEFF.PRN files are read only once per process, the column of each energy in
+    HENKE_EBISU_ENERGIES_keV is taken from the file given by HENKE_EBISU_POSITIONS.
+
+    @return coefficients with shape (95, 14), the rows below Z = 3 are zero.
+    """
+    global _henke_ebisu_coefficients
+
+    if _henke_ebisu_coefficients is None:
+        file_path_K = get_current_module_path(__file__, "../../../data/casino/KCOEFF.PRN")  # noqa
+        file_path_L = get_current_module_path(__file__, "../../../data/casino/LCOEFF.PRN")  # noqa
+        instrumentation.increment("load.casino", 2)
+        with instrumentation.timer("load.casino"):
+            files_coefficients = [read_coefficient_file(file_path_K), read_coefficient_file(file_path_L)]
+
+        coefficients = np.zeros((HENKE_EBISU_MAXIMUM_ATOMIC_NUMBER + 1, len(HENKE_EBISU_ENERGIES_keV)))
+        number_rows = HENKE_EBISU_MAXIMUM_ATOMIC_NUMBER - HENKE_EBISU_MINIMUM_ATOMIC_NUMBER + 1
+        for energy_index, (file_index, column_index) in enumerate(HENKE_EBISU_POSITIONS):
+            values = files_coefficients[file_index][:number_rows, column_index - 1]
+            coefficients[HENKE_EBISU_MINIMUM_ATOMIC_NUMBER:, energy_index] = values
+
+        coefficients.setflags(write=False)
+        _henke_ebisu_coefficients = coefficients
+
+    return _henke_ebisu_coefficients
+
+
+def get_heinrich_tables():
+    """
+    Return the transitions and atomic masses tables as arrays for the Heinrich model of arrays.
+
+    The arrays are created only once per process, at the first call.
+
+    @return transitions in keV with shape (number of elements, 10) and atomic masses in g/mol indexed by Z.
+    """
+    global _heinrich_tables
+
+    if _heinrich_tables is None:
+        transitions_keV = np.array(transitions)  # noqa
+        atomic_masses_g_mol = np.array(A)  # noqa
+        transitions_keV.setflags(write=False)
+        atomic_masses_g_mol.setflags(write=False)
+        _heinrich_tables = transitions_keV, atomic_masses_g_mol
+
+    return _heinrich_tables
+
+
 def macs_henke_ebisu(energy_keV, atomic_number):  # noqa
     """
     Compute mass absorption coefficient from Henke and Ebisu (1974) model.
 
     Parameterization from tables in files KCOEFF.PRN and LCOEFF.PRN.
 
+    The energies and atomic numbers can be arrays, they are broadcast together.
+
     @todo Find the unit of the returned mass absorption coefficient.
 
     @note Use Zaluzec model for hydrogen absorber.
@@ -572,113 +662,55 @@ def macs_henke_ebisu(energy_keV, atomic_number):  # noqa
     @retval -1.0 if energy is greater than 1.6 keV.
     @retval -1.0 if absorber is less than 3 or greater than 94.
     """
-    if energy_keV <= 0.0:
+    energies_keV, atomic_numbers = np.broadcast_arrays(np.asarray(energy_keV, dtype=float),  # noqa
+                                                       np.asarray(atomic_number, dtype=int))
+    instrumentation.record_evaluation("casino.henke_ebisu", energies_keV.size)
+
+    if np.any(energies_keV <= 0.0):
         raise ValueError
 
-    z = atomic_number
+    shape = energies_keV.shape
+    energies_keV = energies_keV.ravel()  # noqa
+    atomic_numbers = atomic_numbers.ravel()
 
-    if z == 1:
-        absp = mac_zaluzec_cm2_g(12.3981 / energy_keV, z)
-        return absp
-
-    if energy_keV > 1.6:
-        return -1
-
-    zmin = 3
-    zmax = 94
-    if (z < zmin) or (z > zmax):
-        return -1
-
-    i = 0
-    emin = i
-    emax = i + 1
-    # ffitfener = 0
-    nener = 14
-
-    # Energy and there corresponding columns value in the kcoeff.prn (0) and lcoeff.prn (1) files.
-    # position is a pair of (fileIndex, columnIndex).
-    # Updated value to have the same energy for x-ray line and in the files.
-    energies_keV = [0.183, 0.277, 0.392, 0.452, 0.525, 0.573, 0.637, 0.677, 0.705, 0.776, 0.848, 0.852, 0.930, 1.012]  # noqa
-    # Original values
-    # energie[14] ={0.185, 0.281, 0.392, 0.452, 0.525, 0.573, 0.637, 0.677, 0.705, 0.776, 0.849, 0.852, 0.930, 1.012}
-    position = [[0, 1], [0, 2], [0, 3], [1, 1], [0, 4], [1, 3], [1, 4], [0, 5], [1, 5], [1, 6], [0, 6], [1, 7], [1, 8],
-                [1, 9]]
-
-    if 0.183 <= energy_keV <= 1.012:
-        # Recherche de position dans les fichiers.
-        condition = True
-        while condition:
-            emin = i
-            emax = i + 1
-            i += 1
-
-            condition = ((energies_keV[emax] < energy_keV) and (i < nener))
-
-        ffitfener = 0
-    else:
-        if energy_keV < 0.183:
-            emin = 1
-            emax = 2
-            ffitfener = 1
-        else:
-            # Position par defaut si extrapolation au-dela de 1.01.
-            emin = 12
-            emax = 13
-            ffitfener = 0
-
-    posfmin = position[emin][0]
-    posfmax = position[emax][0]
-    poscmin = position[emin][1]
-    poscmax = position[emax][1]
-    posl = z - 2
-
-    # kcol = 6
-    # lcol = 9
-    #
-    # absmin = 0.0
-    # absmax = 0.0
-
-    # for INI File
-    file_path_K = get_current_module_path(__file__, "../../../data/casino/KCOEFF.PRN")  # noqa
-    file_path_L = get_current_module_path(__file__, "../../../data/casino/LCOEFF.PRN")  # noqa
-
-    if posfmin == 0:
-        with open(file_path_K, 'r') as kcoeff:
-            lines = kcoeff.readlines()
-
-            items = lines[posl - 1].split()
-            absmin = float(items[poscmin - 1])
-    else:
-        with open(file_path_L, 'r') as lcoeff:
-            lines = lcoeff.readlines()
+    absp = np.full(energies_keV.shape, -1.0)
 
-            items = lines[posl - 1].split()
-            absmin = float(items[poscmin - 1])
+    hydrogen = atomic_numbers == 1
+    for index in np.flatnonzero(hydrogen):
+        absp[index] = mac_zaluzec_cm2_g(HC_keV_A / energies_keV[index], 1)
 
-    if posfmax == 0:
-        with open(file_path_K, 'r') as kcoeff:
-            lines = kcoeff.readlines()
+    valid = ~hydrogen & (energies_keV <= 1.6)
+    valid &= atomic_numbers >= HENKE_EBISU_MINIMUM_ATOMIC_NUMBER
+    valid &= atomic_numbers <= HENKE_EBISU_MAXIMUM_ATOMIC_NUMBER
 
-            items = lines[posl - 1].split()
-            absmax = float(items[poscmax - 1])
-    else:
-        with open(file_path_L, 'r') as lcoeff:
-            lines = lcoeff.readlines()
+    e = energies_keV[valid]
+    z = atomic_numbers[valid]
+    energies_table_keV = HENKE_EBISU_ENERGIES_keV  # noqa
 
-            items = lines[posl - 1].split()
-            absmax = float(items[poscmax - 1])
+    # Position in the files, fixed positions below 0.183 keV (exponential fit) and above 1.012 keV (extrapolation).
+    emax = np.clip(np.searchsorted(energies_table_keV, e, side='left'), 1, len(energies_table_keV) - 1)
+    emax = np.where(e < energies_table_keV[0], 2, emax)
+    emin = emax - 1
+
+    coefficients = get_henke_ebisu_coefficients()
+    absmin = coefficients[z, emin]
+    absmax = coefficients[z, emax]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        absp_linear = ((absmax - absmin) / (energies_table_keV[emax] - energies_table_keV[emin])) * \
+                      (e - energies_table_keV[emin]) + absmin
 
-    # absp = 0.0
-    if ffitfener == 0:
-        absp = ((absmax - absmin) / (energies_keV[emax] - energies_keV[emin])) * (energy_keV - energies_keV[emin]) + \
-               absmin
-    else:
         # Fit exponentiel a faible energie.
-        absp = math.exp(
-            ((math.log(absmax) - math.log(absmin)) / (math.log(energies_keV[emax]) - math.log(energies_keV[emin]))) * (
-                        math.log(energy_keV) - math.log(energies_keV[emin])) + math.log(absmin))
+        absp_exponential = np.exp(((np.log(absmax) - np.log(absmin)) /
+                                   (np.log(energies_table_keV[emax]) - np.log(energies_table_keV[emin]))) *
+                                  (np.log(e) - np.log(energies_table_keV[emin])) + np.log(absmin))
+
+    absp[valid] = np.where(e < energies_table_keV[0], absp_exponential, absp_linear)
+
+    if len(shape) == 0:
+        return float(absp[0])
 
-    return absp
+    return absp.reshape(shape)
 
 
 def macs_total(energy_keV, atomic_number):  # noqa
@@ -690,15 +722,27 @@ def macs_total(energy_keV, atomic_number):  # noqa
 
     @todo Find the unit of the returned mass absorption coefficient.
 
-    @param energy_keV electron energy in keV.
+    @param energy_keV electron energy in keV, can be an array broadcast with the atomic number.
     @param atomic_number atomic number of the absorber
-    @return mass absorption coefficient in ??.
+    @return mass absorption coefficient in ??, a float for scalar inputs.
     """
+    if np.ndim(energy_keV) == 0 and np.ndim(atomic_number) == 0:
+        if energy_keV <= 1.01:
+            return macs_henke_ebisu(energy_keV, atomic_number)
+        return macs_heinrich(HC_keV_A / energy_keV, atomic_number)
 
-    if energy_keV <= 1.01:
-        abst = macs_henke_ebisu(energy_keV, atomic_number)
-    else:
-        abst = macs_heinrich(12.3981 / energy_keV, atomic_number)
+    energies_keV, atomic_numbers = np.broadcast_arrays(np.asarray(energy_keV, dtype=float),  # noqa
+                                                       np.asarray(atomic_number, dtype=int))
+
+    abst = np.empty(energies_keV.shape)
+    low = energies_keV <= 1.01
+    if np.any(low):
+        abst[low] = macs_henke_ebisu(energies_keV[low], atomic_numbers[low])
+    if not np.all(low):
+        abst[~low] = macs_heinrich(HC_keV_A / energies_keV[~low], atomic_numbers[~low])
+
+    if abst.ndim == 0:
+        return float(abst)
 
     return abst
 
@@ -707,16 +751,66 @@ def macs_heinrich(wavelength_A, atomic_number_absorber):  # noqa
     """
     Compute mass absorption coefficient from Heinrich model.
 
+    The wavelengths and atomic numbers can be arrays, they are broadcast together. The parameters of the model depend
+    on the energy only through its position relative to the edges of the absorber, they are computed once for each
+    absorber and interval between the edges by :py:func:`get_heinrich_parameters`.
+
     @todo Find the unit of the returned mass absorption coefficient.
 
     @param wavelength_A electron wavelength in Angstrom.
     @param atomic_number_absorber
-    @return mass absorption coefficient in ??.
+    @return mass absorption coefficient in ??, a float for scalar inputs.
     """
-    l_A = wavelength_A  # noqa
+    if np.ndim(wavelength_A) == 0 and np.ndim(atomic_number_absorber) == 0:
+        energy_keV = HC_keV_A / wavelength_A  # noqa
+        z = int(atomic_number_absorber)
+        c_total, ntot, atot, btot, cutoff = get_heinrich_parameters(energy_keV, z)
+
+        if energy_keV < transitions[z - 1][9]:
+            return float(1.02 * c_total * math.pow((12.397 / energy_keV), ntot) * c_total * math.pow(z, 4) / A[z] * (
+                (energy_keV * 1000 - cutoff) / (transitions[z - 1][9] - cutoff)))
+
+        return float(c_total * math.pow(z, 4) / A[z] * math.pow((12.397 / energy_keV), ntot) * (
+            1 - math.exp((-energy_keV * 1000 + btot) / atot)))
+
+    wavelengths_A, atomic_numbers = np.broadcast_arrays(np.asarray(wavelength_A, dtype=float),  # noqa
+                                                        np.asarray(atomic_number_absorber, dtype=int))
+    shape = wavelengths_A.shape
+    energies_keV = (HC_keV_A / wavelengths_A).ravel()  # noqa
+    atomic_numbers = atomic_numbers.ravel()
+
+    transitions_keV, atomic_masses_g_mol = get_heinrich_tables()  # noqa
+    edges_keV = transitions_keV[atomic_numbers - 1]  # noqa
+    keys = np.column_stack([atomic_numbers, np.sign(energies_keV[:, np.newaxis] - edges_keV)])
+    _keys, first_indices, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    parameters = np.array([get_heinrich_parameters(energies_keV[index], int(atomic_numbers[index]))
+                           for index in first_indices]).reshape(-1, 5)
+    c_total, ntot, atot, btot, cutoff = parameters[inverse.ravel()].T
+
+    z = atomic_numbers.astype(float)
+    atomic_masses_g_mol = atomic_masses_g_mol[atomic_numbers]
+    with np.errstate(all='ignore'):
+        factor_n = np.power(12.397 / energies_keV, ntot)
+        macsh = c_total * np.power(z, 4) / atomic_masses_g_mol * factor_n * (
+                    1 - np.exp((-energies_keV * 1000 + btot) / atot))
 
-    z = atomic_number_absorber
-    atomic_number = atomic_number_absorber
+        macsh_cutoff = 1.02 * c_total * factor_n * c_total * np.power(z, 4) / atomic_masses_g_mol * (
+                    (energies_keV * 1000 - cutoff) / (edges_keV[:, 9] - cutoff))
+
+    macsh = np.where(energies_keV < edges_keV[:, 9], macsh_cutoff, macsh)
+
+    return macsh.reshape(shape)
+
+
+def get_heinrich_parameters(energy_keV, atomic_number):  # noqa
+    """
+    Parameters C, n, a, b and cutoff of the Heinrich model for an x-ray energy and an absorber.
+
+    @param energy_keV x-ray energy in keV.
+    @param atomic_number atomic number of the absorber.
+    @return c_total, ntot, atot, btot and cutoff (NaN above the last edge).
+    """
+    z = atomic_number
 
     # c_total = 0
 
@@ -738,8 +832,6 @@ def macs_heinrich(wavelength_A, atomic_number_absorber):  # noqa
     for i in range(10):
         energy_c_keV[i] = transitions[atomic_number - 1][i]
 
-    energy_keV = 12.3981 / l_A  # noqa
-
     if energy_keV > energy_c_keV[0]:
         if atomic_number < 6:
             C[0][0] = -2.87536e-4
@@ -947,6 +1039,7 @@ def macs_heinrich(wavelength_A, atomic_number_absorber):  # noqa
         b[3] = 0
         b[4] = 0
 
+    cutoff = math.nan
     if energy_keV < energy_c_keV[9]:
         cutoff = (0.252 * z - 31.1812) * z + 1042
 
@@ -986,14 +1079,25 @@ def macs_heinrich(wavelength_A, atomic_number_absorber):  # noqa
     else:
         c_total = c_tot[0]
 
-    macsh = c_total * math.pow(z, 4) / A[atomic_number] * math.pow((12.397 / energy_keV), ntot) * (
-                1 - math.exp((-energy_keV * 1000 + btot) / atot))
+    return c_total, ntot, atot, btot, cutoff
 
-    if energy_keV < energy_c_keV[9]:
-        macsh = 1.02 * c_total * math.pow((12.397 / energy_keV), ntot) * c_total * math.pow(z, 4) / A[atomic_number] * (
-                    (energy_keV * 1000 - cutoff) / (energy_c_keV[9] - cutoff))
 
-    return macsh
+class MacCasino:
+    """
+    MAC model of CASINO with the interface of the other models, see :py:func:`macs_total`.
+    """
+    def compute_mac_cm2_g(self, energy_eV, atomic_number):  # noqa
+        """
+        Compute the mass absorption coefficient.
+
+        @param energy_eV x-ray energy in eV, can be an array broadcast with the atomic number.
+        @param atomic_number atomic number of the absorber.
+        @return mass absorption coefficient in cm2/g, a float for scalar inputs.
+        """
+        energies_keV = np.asarray(energy_eV, dtype=float) * 1.0e-3  # noqa
+        instrumentation.record_evaluation("model.Casino", np.broadcast(energies_keV, atomic_number).size)
+
+        return macs_total(energies_keV, atomic_number)
 
 
 def efficiency(energy_keV):  # noqa
@@ -1038,7 +1142,7 @@ def efficiency(energy_keV):  # noqa
     # Cristal.
     parameters[8] = 0.3
 
-    l_A = 12.3981 / energy_keV  # noqa
+    l_A = HC_keV_A / energy_keV  # noqa
 
     if energy_keV < 7.0:
         if energy_keV > 0.03:
@@ -1089,7 +1193,7 @@ def efficiency(energy_keV):  # noqa
 
     if energy_keV > 15.0:
         tsi = parameters[8]
-        asi = macs_total(12.3981 / l_A, 14) * MASS_DENSITY_SI_g_cm3 * tsi
+        asi = macs_total(HC_keV_A / l_A, 14) * MASS_DENSITY_SI_g_cm3 * tsi
         eff = (1.0 - math.exp(-asi))
 
         return eff
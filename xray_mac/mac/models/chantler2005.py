@@ -27,12 +27,16 @@ Chantler 2005 MAC model.
 # Standard library modules.
 import csv
 import logging
+from collections.abc import Mapping
 
 # Third party modules.
-from scipy.interpolate import interp1d
+import numpy as np
 
 # Local modules.
 from xray_mac.mac import get_current_module_path
+from xray_mac.mac.models import instrumentation
+from xray_mac.mac.models.mac_database import read_database_data, get_default_data_path, MODEL_CHANTLER2005
+from xray_mac.mac.models.interpolation import Interpolation1D, LINEAR
 
 # Globals and constants variables.
 SECTION_NAME = "Chantler2005"
@@ -46,99 +50,181 @@ MAC_cm2_g = "mac_cm2_g"
 ENERGY_UNIT_eV = "eV"
 ENERGY_UNIT_keV = "keV"
 
+_mac_tables = {}
+
+
+class FFastMacTable(Mapping):
+    """
+    Columnar view of a FFastMAC csv file.
+
+    The file is stored as one (number of rows, 2 * number of elements) array, each element uses two consecutive
+    columns: the energy and the MAC. The per-element arrays are sliced on first access and kept.
+    """
+    def __init__(self, columns, energy_unit=ENERGY_UNIT_keV):
+        self.columns = columns
+        self.energy_factor = 1.0e3 if energy_unit == ENERGY_UNIT_keV else 1.0
+
+        self._elements = {}
+
+        energies = self.columns[:, 0::2]
+        macs_cm2_g = self.columns[:, 1::2]
+        self._valid = (energies > 0.0) & np.isfinite(macs_cm2_g)
+        self._atomic_numbers = [int(index) + 1 for index in np.flatnonzero(self._valid.any(axis=0))]
+
+    def __getitem__(self, atomic_number):
+        if atomic_number not in self._elements:
+            if atomic_number not in self._atomic_numbers:
+                raise KeyError(atomic_number)
+
+            index = 2 * (atomic_number - 1)
+            valid = self._valid[:, atomic_number - 1]
+
+            energies_eV = self.columns[valid, index] * self.energy_factor  # noqa
+            macs_cm2_g = self.columns[valid, index + 1]
+            energies_eV.setflags(write=False)
+            macs_cm2_g.setflags(write=False)
+
+            self._elements[atomic_number] = {ENERGIES_eV: energies_eV, MAC_cm2_g: macs_cm2_g}
+
+        return self._elements[atomic_number]
+
+    def __iter__(self):
+        return iter(self._atomic_numbers)
+
+    def __len__(self):
+        return len(self._atomic_numbers)
+
+
+def read_columns(file_path):
+    """
+    Parse a FFastMAC csv file in one pass, missing or invalid values are set to NaN.
+    """
+    rows = []
+    with open(file_path) as input_file:
+        for items in csv.reader(input_file):
+            row = []
+            for item in items:
+                try:
+                    row.append(float(item) if item != '' else np.nan)
+                except ValueError as status:
+                    logging.error(status)
+                    logging.info(items)
+                    row.append(np.nan)
+            rows.append(row)
+
+    number_columns = max(len(row) for row in rows)
+    columns = np.full((len(rows), number_columns), np.nan)
+    for index, row in enumerate(rows):
+        columns[index, :len(row)] = row
+
+    columns.setflags(write=False)
+    return columns
 
-class Chantler2005:
-    def __init__(self):
-        self.minimum_energy_eV = 0.0
-        self.minimum_mac_cm2_g = 0.0
 
+def get_mac_table(file_path=None, energy_unit=ENERGY_UNIT_keV):
+    """
+    Return the MAC table of a FFastMAC csv file, the file is parsed only once per process.
+    """
+    if file_path is None:
+        file_path = get_current_module_path(__file__, "../../../data/chantler2005/FFastMAC.csv")
+
+    key = (str(file_path), energy_unit)
+    instrumentation.record_cache("chantler2005.mac_table", key in _mac_tables)
+    if key not in _mac_tables:
+        instrumentation.increment("load.chantler2005")
+        with instrumentation.timer("load.chantler2005"):
+            _mac_tables[key] = FFastMacTable(read_columns(file_path), energy_unit)
+
+    return _mac_tables[key]
+
+
+class Chantler2005:
+    def __init__(self, database_file_path=None):
+        """
+        :param database_file_path: MAC database file used until a csv file is read, see
+            :py:func:`xray_mac.mac.models.mac_database.read_database_data`
+        """
         self.mac_data = {}
         self.edge_energies_eV = {}
 
         self.experimental_data = {}
+        self.database_file_path = database_file_path
 
     def read_mac_data(self, file_path=None, energy_unit=ENERGY_UNIT_keV):
-        if file_path is None:
-            file_path = get_current_module_path(__file__, "../../../data/chantler2005/FFastMAC.csv")
-        self.reset_data()
-        input_file = csv.reader(open(file_path))
-
-        for items in input_file:
-            self.extract_data_from_items_line(items, energy_unit)
+        """
+        Use the MAC table of a FFastMAC csv file, the cached interpolations are dropped if the table changes.
+        """
+        mac_table = get_mac_table(file_path, energy_unit)
+        if mac_table is not self.experimental_data:
+            self.reset_data()
+            self.experimental_data = mac_table
 
     def reset_data(self):
         self.experimental_data = {}
+        self.mac_data = {}
 
-    def extract_data_from_items_line(self, items, energy_unit):
-        index = 0
-        maximum_index = len(items)
-        atomic_number = 1
-
-        while index < maximum_index:
-            try:
-                if items[index] != '':
-                    if energy_unit == ENERGY_UNIT_keV:
-                        energy_keV = float(items[index])  # noqa
-                        energy_eV = energy_keV * 1.0e3  # noqa
-                    else:
-                        energy_eV = float(items[index])  # noqa
-
-                    mac_cm2_g = float(items[index+1])
-
-                    if energy_eV > 0.0:
-                        self.experimental_data.setdefault(atomic_number, {})
-                        self.experimental_data[atomic_number].setdefault(ENERGIES_eV, []).append(energy_eV)
-                        self.experimental_data[atomic_number].setdefault(MAC_cm2_g, []).append(mac_cm2_g)
-            except ValueError as status:
-                logging.error(status)
-                logging.info(items)
-
-            atomic_number += 1
-            index += 2
+    def read_data(self, atomic_number):
+        """
+        Tabulated energies in eV and MACs in cm2/g of an absorber.
 
-    def compute_mac_cm2_g(self, energy_emitter_eV, atomic_number_absorber):  # noqa
-        return self._compute_mac_cm2_g(energy_emitter_eV, atomic_number_absorber)
+        Until a csv file is read with :py:meth:`read_mac_data`, the data comes from the MAC database file if it exists,
+        has the absorber and was built from the current default csv file, the default csv file is parsed otherwise.
+
+        :return: energies and MACs, None if the absorber is not in the data. A csv file read without the absorber is
+            kept.
+        """
+        if not self.experimental_data:
+            data = read_database_data(MODEL_CHANTLER2005, atomic_number, self.database_file_path,
+                                      get_default_data_path(MODEL_CHANTLER2005))
+            if data is not None:
+                return data
 
-    def _compute_mac_cm2_g(self, energyEmitter_eV, atomic_number_absorber):  # noqa
-        if atomic_number_absorber not in self.mac_data:
             self.read_mac_data()
 
-            energies_eV = self.experimental_data[atomic_number_absorber][ENERGIES_eV]  # noqa
-            macs_cm2_g = self.experimental_data[atomic_number_absorber][MAC_cm2_g]
+        if atomic_number not in self.experimental_data:
+            return None
 
-            if len(energies_eV) > 0:
-                self.mac_data.setdefault(atomic_number_absorber, {})
+        data = self.experimental_data[atomic_number]
+        return data[ENERGIES_eV], data[MAC_cm2_g]
 
-                self.minimum_energy_eV = energies_eV[0]
+    def compute_mac_cm2_g(self, energy_emitter_eV, atomic_number_absorber):  # noqa
+        """
+        Compute the MAC of one or more x-ray energies in one or more absorbers.
 
-                self.minimum_mac_cm2_g = macs_cm2_g[0]
+        The energies and atomic numbers are broadcast together and each absorber is evaluated with one batched linear
+        interpolation, see :py:class:`xray_mac.mac.models.interpolation.Interpolation1D`. Energies outside the
+        tabulated range of an absorber are clamped to its first or last value.
 
-                self.maximum_energy_eV = energies_eV[-1]
+        :param energy_emitter_eV: x-ray energy or array of x-ray energies in eV
+        :param atomic_number_absorber: atomic number or array of atomic numbers of the absorber
+        :return: MAC in cm2/g, a float for scalar inputs and an array otherwise
+        """
+        energies_eV, atomic_numbers = np.broadcast_arrays(np.asarray(energy_emitter_eV, dtype=float),  # noqa
+                                                          np.asarray(atomic_number_absorber, dtype=int))
+        instrumentation.record_evaluation("model.Chantler2005", energies_eV.size)
 
-                self.maximum_mac_cm2_g = macs_cm2_g[-1]
+        macs_cm2_g = np.zeros(energies_eV.shape)
+        for atomic_number in np.unique(atomic_numbers):
+            mask = atomic_numbers == atomic_number
+            macs_cm2_g[mask] = self._compute_mac_cm2_g(energies_eV[mask], int(atomic_number))
 
-                self.mac_data[atomic_number_absorber] = interp1d(energies_eV, macs_cm2_g)
+        if macs_cm2_g.ndim == 0:
+            return float(macs_cm2_g)
 
-            else:
-                logging.error("No mac for %i and %0.1f", atomic_number_absorber, energyEmitter_eV)
-                return 0.0
-
-        if energyEmitter_eV <= self.minimum_energy_eV:
-            return self.minimum_mac_cm2_g
-
-        if energyEmitter_eV >= self.maximum_energy_eV:
-            return self.maximum_mac_cm2_g
-
-        if atomic_number_absorber in self.mac_data:
-            try:
-                mac_value = self.mac_data[atomic_number_absorber](energyEmitter_eV)
-            except ValueError:
-                print(atomic_number_absorber, energyEmitter_eV)
-                mac_value = self.minimum_mac_cm2_g
-            return mac_value
-        else:
-            logging.error("No mac for %i and %0.1f", atomic_number_absorber, energyEmitter_eV)
-            return 0.0
+        return macs_cm2_g
+
+    def _compute_mac_cm2_g(self, energies_emitter_eV, atomic_number_absorber):  # noqa
+        instrumentation.record_cache("chantler2005.interpolation", atomic_number_absorber in self.mac_data)
+        if atomic_number_absorber not in self.mac_data:
+            data = self.read_data(atomic_number_absorber)
+            if data is None:
+                logging.error("No mac for %i", atomic_number_absorber)
+                return np.zeros_like(energies_emitter_eV)
+
+            energies_eV, macs_cm2_g = data  # noqa
+            self.mac_data[atomic_number_absorber] = Interpolation1D(energies_eV, macs_cm2_g, kind=LINEAR, clamp=True)
+
+        return self.mac_data[atomic_number_absorber](energies_emitter_eV)
 
 
 def compare_all_versions():
@@ -6,6 +6,10 @@
 .. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
 
 Properties of elements.
+
+The element properties are kept once per process in a read-only :py:class:`ElementTable` built from
+``data/element_properties.csv``, with NumPy arrays indexed by the atomic number. The functions of this module and
+:py:class:`xray_mac.mac.models.elements.ElementProperties` use this table.
 """
 
 ###############################################################################
@@ -25,15 +29,33 @@ Properties of elements.
 ###############################################################################
 
 # Standard library modules.
+import csv
+import logging
 import math
 
 # Third party modules.
+import numpy as np
 
 # Local modules.
 
 # Project modules.
+from xray_mac.mac import get_current_module_path
 
 # Globals and constants variables.
+ATOMIC_NUMBER = "atomic number"
+SYMBOL = "symbol"
+NAME = "name"
+MASS_DENSITY_g_cm3 = "mass density (g/cm3)"
+ATOMIC_MASS_g_mol = "atomic mass (g/mol)"
+FERMI_ENERGY_eV = "Fermi energy (eV)"
+K_FERMI = "k Fermi (eV)"
+PLASMON_ENERGY_eV = "plasmon energy (eV)"
+
+FIELD_NAMES = [ATOMIC_NUMBER, SYMBOL, NAME, MASS_DENSITY_g_cm3, ATOMIC_MASS_g_mol, FERMI_ENERGY_eV, K_FERMI,
+               PLASMON_ENERGY_eV]
+
+_element_tables = {}
+
 g_avogadro_number_atom_mol = 6.02205E23
 
 g_element_symbol = [
@@ -192,29 +214,173 @@ g_plasmon_energy = [
 ]
 
 
+class AtomicNumberError(KeyError, IndexError):
+    pass
+
+
+class SymbolError(KeyError):
+    pass
+
+
+def get_element_properties_file_path():
+    return get_current_module_path(__file__, "../../../data/element_properties.csv")
+
+
+class ElementTable:
+    """
+    Read-only element properties of a csv file, as arrays indexed by the atomic number.
+
+    The index 0 and the missing values of the arrays are NaN. The accessors take an atomic number or an array of them.
+    """
+    def __init__(self, file_path=None):
+        if file_path is None:
+            file_path = get_element_properties_file_path()
+        self.file_path = file_path
+
+        with open(file_path, newline='') as input_file:
+            reader = csv.DictReader(input_file, fieldnames=FIELD_NAMES)
+
+            # Read the header row.
+            next(reader)
+
+            rows = {int(row[ATOMIC_NUMBER]): row for row in reader}
+
+        size = max(rows, default=0) + 1
+
+        def read_values(field_name):
+            values = np.full(size, np.nan)
+            for atomic_number, row in rows.items():
+                if row[field_name] != "":
+                    values[atomic_number] = float(row[field_name])
+            values.setflags(write=False)
+            return values
+
+        self.atomic_numbers = np.array(sorted(rows), dtype=int)
+        self.symbols = tuple(rows[atomic_number][SYMBOL] if atomic_number in rows else ""
+                             for atomic_number in range(size))
+        self.names = tuple(rows[atomic_number][NAME] if atomic_number in rows else "" for atomic_number in range(size))
+        self.mass_densities_g_cm3 = read_values(MASS_DENSITY_g_cm3)
+        self.atomic_masses_g_mol = read_values(ATOMIC_MASS_g_mol)
+        self.fermi_energies_eV = read_values(FERMI_ENERGY_eV)  # noqa
+        self.k_fermis_eV = read_values(K_FERMI)  # noqa
+        self.plasmon_energies_eV = read_values(PLASMON_ENERGY_eV)  # noqa
+
+        mean_ionization_energies_eV = np.full(size, np.nan)  # noqa
+        for atomic_number in rows:
+            mean_ionization_energies_eV[atomic_number] = get_mean_ionization_energy_eV(atomic_number)
+        mean_ionization_energies_eV.setflags(write=False)
+        self.mean_ionization_energies_eV = mean_ionization_energies_eV  # noqa
+
+        self.atomic_numbers.setflags(write=False)
+
+        self.symbol_atomic_numbers = {symbol: atomic_number for atomic_number, symbol in enumerate(self.symbols)
+                                      if symbol}
+        self.name_atomic_numbers = {name: atomic_number for atomic_number, name in enumerate(self.names) if name}
+        # Also accept the spelling of the names returned by get_name(), e.g. Aluminum and Aluminium.
+        for index, name in enumerate(g_element_name):
+            self.name_atomic_numbers.setdefault(name, index + 1)
+
+    def __contains__(self, atomic_number):
+        return 0 < atomic_number < len(self.symbols) and self.symbols[atomic_number] != ""
+
+    def symbol(self, atomic_number):
+        if atomic_number not in self:
+            self._raise_atomic_number_error(atomic_number)
+        return self.symbols[atomic_number]
+
+    def name(self, atomic_number):
+        if atomic_number not in self:
+            self._raise_atomic_number_error(atomic_number)
+        return self.names[atomic_number]
+
+    def atomic_number(self, symbol):
+        try:
+            return self.symbol_atomic_numbers[symbol]
+        except KeyError:
+            message = "No atomic number for symbol %s" % symbol
+            logging.error(message)
+            raise SymbolError(message)
+
+    def mass_density_g_cm3(self, atomic_numbers):
+        return self._get_values(self.mass_densities_g_cm3, atomic_numbers)
+
+    def atomic_mass_g_mol(self, atomic_numbers):
+        return self._get_values(self.atomic_masses_g_mol, atomic_numbers)
+
+    def fermi_energy_eV(self, atomic_numbers):  # noqa
+        return self._get_values(self.fermi_energies_eV, atomic_numbers)
+
+    def k_fermi_eV(self, atomic_numbers):  # noqa
+        return self._get_values(self.k_fermis_eV, atomic_numbers)
+
+    def plasmon_energy_eV(self, atomic_numbers):  # noqa
+        return self._get_values(self.plasmon_energies_eV, atomic_numbers)
+
+    def mean_ionization_energy_eV(self, atomic_numbers):  # noqa
+        return self._get_values(self.mean_ionization_energies_eV, atomic_numbers)
+
+    def _get_values(self, values, atomic_numbers):
+        """
+        Values of atomic numbers, a float for a scalar atomic number.
+
+        :raise AtomicNumberError: if a value is missing
+        """
+        if np.ndim(atomic_numbers) == 0:
+            atomic_number = int(atomic_numbers)
+            if 0 < atomic_number < len(values):
+                value = float(values[atomic_number])
+                if not math.isnan(value):
+                    return value
+            self._raise_atomic_number_error(atomic_number)
+
+        atomic_numbers = np.asarray(atomic_numbers, dtype=int)
+        inside = (atomic_numbers > 0) & (atomic_numbers < len(values))
+        selected_values = values[np.where(inside, atomic_numbers, 0)]
+        missing = np.isnan(selected_values)
+        if np.any(missing):
+            self._raise_atomic_number_error(atomic_numbers[missing].flat[0])
+
+        return selected_values
+
+    @staticmethod
+    def _raise_atomic_number_error(atomic_number):
+        message = "No data for atomic number %i." % atomic_number
+        logging.error(message)
+        raise AtomicNumberError(message)
+
+
+def get_element_table(file_path=None):
+    """
+    Element table of a csv file, built once per process.
+    """
+    if file_path is None:
+        file_path = get_element_properties_file_path()
+
+    key = str(file_path)
+    if key not in _element_tables:
+        _element_tables[key] = ElementTable(file_path)
+
+    return _element_tables[key]
+
+
 def get_mass_density_g_cm3(atomic_number):
-    index = int(atomic_number) - 1
-    return g_mass_density_g_cm3[index]
+    return get_element_table().mass_density_g_cm3(atomic_number)
 
 
 def get_atomic_mass_g_mol(atomic_number):
-    index = int(atomic_number) - 1
-    return g_atomic_mass_g_mol[index]
+    return get_element_table().atomic_mass_g_mol(atomic_number)
 
 
 def get_fermi_energy_eV(atomic_number):  # noqa
-    index = int(atomic_number) - 1
-    return g_fermi_energy[index]
+    return get_element_table().fermi_energy_eV(atomic_number)
 
 
 def get_k_fermi_eV(atomic_number):  # noqa
-    index = int(atomic_number) - 1
-    return g_k_fermi[index]
+    return get_element_table().k_fermi_eV(atomic_number)
 
 
 def get_plasmon_energy_eV(atomic_number):  # noqa
-    index = int(atomic_number) - 1
-    return g_plasmon_energy[index]
+    return get_element_table().plasmon_energy_eV(atomic_number)
 
 
 def get_mean_ionization_energy_eV(atomic_number):  # noqa
@@ -285,8 +451,7 @@ def compute_atomic_density_atom_cm3(mass_density_g_cm3, atomic_mass_g_mol):
 
 
 def get_symbol(atomic_number):
-    index = int(atomic_number - 1)
-    return g_element_symbol[index]
+    return get_element_table().symbol(int(atomic_number))
 
 
 def get_name(atomic_number):
@@ -295,17 +460,17 @@ def get_name(atomic_number):
 
 
 def get_atomic_number_by_symbol(symbol):
-    try:
-        return g_element_symbol.index(symbol.capitalize()) + 1
-    except ValueError:
+    atomic_number = get_element_table().symbol_atomic_numbers.get(symbol.capitalize())
+    if atomic_number is None:
         print(symbol)
+    return atomic_number
 
 
 def get_atomic_number_by_name(name):
-    try:
-        return g_element_name.index(name.capitalize()) + 1
-    except ValueError:
+    atomic_number = get_element_table().name_atomic_numbers.get(name.capitalize())
+    if atomic_number is None:
         print(name)
+    return atomic_number
 
 
 def get_atomic_number(atomic_number=None, name=None, symbol=None):
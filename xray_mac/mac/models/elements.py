@@ -25,116 +25,65 @@ Element properties from file.
 ###############################################################################
 
 # Standard library modules.
-import csv
-import logging
+import math
 
 # Third party modules.
 
 # Local modules.
 
 # Project modules.
-from xray_mac.mac import get_current_module_path
+from xray_mac.mac.models.element_properties import get_element_table, AtomicNumberError, SymbolError, \
+    ATOMIC_NUMBER, SYMBOL, NAME, MASS_DENSITY_g_cm3, ATOMIC_MASS_g_mol, FERMI_ENERGY_eV, K_FERMI, \
+    PLASMON_ENERGY_eV  # noqa: F401
 
 # Globals and constants variables.
-ATOMIC_NUMBER = "atomic number"
-SYMBOL = "symbol"
-NAME = "name"
-MASS_DENSITY_g_cm3 = "mass density (g/cm3)"
-ATOMIC_MASS_g_mol = "atomic mass (g/mol)"
-FERMI_ENERGY_eV = "Fermi energy (eV)"
-K_FERMI = "k Fermi (eV)"
-PLASMON_ENERGY_eV = "plasmon energy (eV)"
-
-
-class AtomicNumberError(KeyError):
-    pass
-
-
-class SymbolError(KeyError):
-    pass
 
 
 class ElementProperties:
+    """
+    Element properties of a csv file, see :py:class:`xray_mac.mac.models.element_properties.ElementTable`.
+
+    The table of a file is shared by all the instances.
+    """
     def __init__(self):
         self.data = None
+        self.table = None
 
     def read_data(self, file_path=None):
-        if file_path is None:
-            file_path = get_current_module_path(__file__, "../../../data/element_properties.csv")
-
-        fieldnames = [ATOMIC_NUMBER, SYMBOL, NAME, MASS_DENSITY_g_cm3, ATOMIC_MASS_g_mol, FERMI_ENERGY_eV, K_FERMI,
-                      PLASMON_ENERGY_eV]
-        input_file = csv.DictReader(open(file_path), fieldnames=fieldnames)
-
-        # Read the header row.
-        next(input_file)
-
-        self.data = {}
-        for field_name in fieldnames:
-            self.data[field_name] = {}
-
-        for items in input_file:
-            atomic_number = int(items[ATOMIC_NUMBER])
-            for field_name, value in items.items():
-                if value != "":
-                    self.data[field_name][atomic_number] = value
+        self.table = get_element_table(file_path)
+
+        self.data = {
+            ATOMIC_NUMBER: {atomic_number: atomic_number for atomic_number in self.table.atomic_numbers.tolist()},
+            SYMBOL: {atomic_number: self.table.symbols[atomic_number]
+                     for atomic_number in self.table.atomic_numbers.tolist()},
+            NAME: {atomic_number: self.table.names[atomic_number]
+                   for atomic_number in self.table.atomic_numbers.tolist()},
+        }
+        for field_name, values in [(MASS_DENSITY_g_cm3, self.table.mass_densities_g_cm3),
+                                   (ATOMIC_MASS_g_mol, self.table.atomic_masses_g_mol),
+                                   (FERMI_ENERGY_eV, self.table.fermi_energies_eV),
+                                   (K_FERMI, self.table.k_fermis_eV),
+                                   (PLASMON_ENERGY_eV, self.table.plasmon_energies_eV)]:
+            self.data[field_name] = {atomic_number: float(values[atomic_number])
+                                     for atomic_number in self.table.atomic_numbers.tolist()
+                                     if not math.isnan(values[atomic_number])}
+
+    def get_table(self):
+        if self.table is None:
+            self.table = get_element_table()
+        return self.table
 
     def symbol(self, atomic_number):
-        if self.data is None:
-            self.read_data()
-
-        try:
-            value = str(self.data[SYMBOL][atomic_number])
-        except KeyError as message:
-            logging.error("%s for %i", message, atomic_number)
-            raise AtomicNumberError("No data for atomic number %i." % atomic_number)
-
-        return value
+        return self.get_table().symbol(atomic_number)
 
     def name(self, atomic_number):
-        if self.data is None:
-            self.read_data()
-
-        try:
-            value = str(self.data[NAME][atomic_number])
-        except KeyError as message:
-            logging.error("%s for %i", message, atomic_number)
-            raise AtomicNumberError("No data for atomic number %i." % atomic_number)
-
-        return value
+        return self.get_table().name(atomic_number)
 
     def mass_density_g_cm3(self, atomic_number):
-        if self.data is None:
-            self.read_data()
-
-        try:
-            value = float(self.data[MASS_DENSITY_g_cm3][atomic_number])
-        except KeyError as message:
-            logging.error("%s for %i", message, atomic_number)
-            raise AtomicNumberError("No data for atomic number %i." % atomic_number)
-
-        return value
+        return self.get_table().mass_density_g_cm3(atomic_number)
 
     def atomic_mass_g_mol(self, atomic_number):
-        if self.data is None:
-            self.read_data()
-
-        try:
-            value = float(self.data[ATOMIC_MASS_g_mol][atomic_number])
-        except KeyError as message:
-            logging.error("%s for %i", message, atomic_number)
-            raise AtomicNumberError("No data for atomic number %i." % atomic_number)
-
-        return value
+        return self.get_table().atomic_mass_g_mol(atomic_number)
 
     def atomic_number(self, symbol):
-        if self.data is None:
-            self.read_data()
-
-        for temp_atomic_number, temp_symbol in self.data[SYMBOL].items():
-            if symbol == temp_symbol:
-                return temp_atomic_number
-
-        message = "No atomic number for symbol %s" % symbol
-        logging.error(message)
-        raise SymbolError(message)
+        return self.get_table().atomic_number(symbol)
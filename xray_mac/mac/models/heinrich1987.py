@@ -35,15 +35,106 @@ import numpy
 # Local modules.
 
 # Project modules.
-from xray_mac.mac.models.element_properties import get_atomic_mass_g_mol
+from xray_mac.mac.models import instrumentation
+from xray_mac.mac.models.element_properties import get_atomic_mass_g_mol, g_atomic_mass_g_mol
 from xray_mac.mac.models.ionization_energies import IonizationEnergiesDtsa
 
 
 # Globals and constants variables.
+REGION_EDGES = ['K', 'L1', 'L2', 'L3', 'M1', 'M2', 'M3', 'M4', 'M5', 'N1']
+NUMBER_REGIONS = 11
+
+# Validity flags, combined as a bitmask.
+VALIDITY_NEAR_EDGE = 1
+VALIDITY_VERY_LOW_ENERGY = 2
+VALIDITY_BELOW_M5 = 4
+VALIDITY_BETWEEN_M4_M5 = 8
+
+VALIDITY_NAMES = {
+    VALIDITY_NEAR_EDGE: "near edge",
+    VALIDITY_VERY_LOW_ENERGY: "very low energy",
+    VALIDITY_BELOW_M5: "below M5",
+    VALIDITY_BETWEEN_M4_M5: "between M4 and M5"}
+
+# How the validity warnings are emitted.
+WARNING_MODE_POINT = "point"
+WARNING_MODE_SUMMARY = "summary"
+WARNING_MODE_NONE = "none"
+
+
+class HeinrichCoefficientTables:
+    """
+    Dense tables of the Heinrich (1987) parameters for every atomic number and energy region.
+
+    The C, n, a and b tables have shape (Z + 1, 12) and are indexed by the atomic number and the region number (1 to
+    11), the edges table has shape (Z + 1, 10) with the edges of :py:data:`REGION_EDGES`.
+
+    The region edges table has, for each atomic number, the cumulative minimum of the edges from K to N1 in reverse
+    order. It is sorted, a missing edge (zero energy) hides the edges after it, and the number of its values at or
+    above an x-ray energy is the number of edges not crossed, see :py:meth:`MacHeinrich1987.get_regions`.
+    """
+    def __init__(self, mac_model, maximum_atomic_number=len(g_atomic_mass_g_mol)):
+        shape = (maximum_atomic_number + 1, NUMBER_REGIONS + 1)
+        self.C = numpy.full(shape, numpy.nan)  # noqa
+        self.n = numpy.full(shape, numpy.nan)
+        self.a = numpy.full(shape, numpy.nan)
+        self.b_eV = numpy.full(shape, numpy.nan)  # noqa
+
+        self.edges_eV = numpy.full((maximum_atomic_number + 1, len(REGION_EDGES)), numpy.nan)  # noqa
+        self.atomic_masses_g_mol = numpy.full(maximum_atomic_number + 1, numpy.nan)
+        self.cutoffs_eV = numpy.full(maximum_atomic_number + 1, numpy.nan)  # noqa
+
+        for atomic_number in range(1, maximum_atomic_number + 1):
+            try:
+                edges_eV = [mac_model.ionization_energies.ionization_energy_eV(atomic_number, subshell)  # noqa
+                            for subshell in REGION_EDGES]
+            except KeyError:
+                continue
+
+            self.edges_eV[atomic_number] = edges_eV
+            self.atomic_masses_g_mol[atomic_number] = get_atomic_mass_g_mol(atomic_number)
+            self.cutoffs_eV[atomic_number] = mac_model.compute_cutoff_eV(atomic_number)
+
+            for region in range(1, NUMBER_REGIONS + 1):
+                self.C[atomic_number, region] = mac_model.coefficient_C[region](atomic_number)
+                self.n[atomic_number, region] = mac_model.coefficient_n[region](atomic_number)
+                self.a[atomic_number, region] = mac_model.coefficient_a[region](atomic_number)
+                if region in mac_model.coefficient_b_eV:
+                    self.b_eV[atomic_number, region] = mac_model.coefficient_b_eV[region](atomic_number)
+
+        self.region_edges_eV = numpy.minimum.accumulate(self.edges_eV, axis=1)[:, ::-1].copy()  # noqa
+
+    def is_available(self, atomic_number):
+        return 0 < atomic_number < len(self.atomic_masses_g_mol) and \
+            not numpy.isnan(self.atomic_masses_g_mol[atomic_number])
+
+
+def summarize_validity(flags):
+    """
+    Count the points failing each validity check.
+
+    :param flags: validity flags returned by :py:meth:`MacHeinrich1987.compute_macs_cm2_g_with_validity`
+    :return: number of points for each check name, with the total number of points and of valid points
+    """
+    flags = numpy.asarray(flags)
+
+    summary = {"points": int(flags.size), "valid": int(numpy.count_nonzero(flags == 0))}
+    for flag, name in VALIDITY_NAMES.items():
+        summary[name] = int(numpy.count_nonzero(flags & flag))
+
+    return summary
 
 
 class MacHeinrich1987:
-    def __init__(self):
+    def __init__(self, warning_mode=WARNING_MODE_POINT):
+        """
+        :param str warning_mode: how the validity warnings are emitted: for each point (:py:data:`WARNING_MODE_POINT`),
+            once per array evaluation with the number of points failing each check (:py:data:`WARNING_MODE_SUMMARY`),
+            or not at all (:py:data:`WARNING_MODE_NONE`). A scalar evaluation is one point, it always uses the
+            per point warnings unless the mode is :py:data:`WARNING_MODE_NONE`.
+        """
+        self.warning_mode = warning_mode
+
         self.ionization_energies = IonizationEnergiesDtsa()
 
         self.coefficient_C = {
@@ -97,7 +188,8 @@ class MacHeinrich1987:
             10: self.compute_a_region10,
             11: self.compute_a_region10}
 
-        self._vec_computeMac_cm2_g = numpy.vectorize(self._compute_mac_cm2_g)
+        self._coefficient_tables = None
+        self._coefficient_tables_ionization_energies = None
 
     @staticmethod
     def check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_eV):  # noqa
@@ -109,6 +201,7 @@ class MacHeinrich1987:
             message = "X-ray emitted (%0.1f eV) is near the energy edge (%0.1f eV) by %0.1f eV." % args
             warnings.warn(message)
             logging.warning(message)
+            instrumentation.increment("heinrich1987.warnings")
 
     @staticmethod
     def check_very_low_energy_eV(energy_emitter_eV, energy_limit_eV=180.0):  # noqa
@@ -118,6 +211,7 @@ class MacHeinrich1987:
             message = "X-ray emitted (%0.1f eV) is very low, less than limit (%0.1f)." % args
             warnings.warn(message)
             logging.warning(message)
+            instrumentation.increment("heinrich1987.warnings")
 
     @staticmethod
     def check_energy_between_m4_m5_z(region, atomic_number):
@@ -126,6 +220,7 @@ class MacHeinrich1987:
             message = "X-ray emitted between M4 and M5 for element %i." % atomic_number
             warnings.warn(message)
             logging.warning(message)
+            instrumentation.increment("heinrich1987.warnings")
 
     @staticmethod
     def check_energy_below_m5(region):
@@ -134,23 +229,208 @@ class MacHeinrich1987:
             message = "X-ray emitted below M5."
             warnings.warn(message)
             logging.warning(message)
+            instrumentation.increment("heinrich1987.warnings")
 
     def compute_mac_cm2_g(self, energy_emitter_eV, atomic_number_absorber):  # noqa
-        if isinstance(energy_emitter_eV, numpy.ndarray):
-            return self._vec_computeMac_cm2_g(energy_emitter_eV, atomic_number_absorber)
+        if numpy.ndim(energy_emitter_eV) > 0 or numpy.ndim(atomic_number_absorber) > 0:
+            return self.compute_macs_cm2_g(energy_emitter_eV, atomic_number_absorber)
         else:
             return self._compute_mac_cm2_g(energy_emitter_eV, atomic_number_absorber)
 
+    @property
+    def coefficient_tables(self):
+        """
+        Coefficient tables of the model, built on first use and rebuilt if the ionization energies are replaced.
+        """
+        if self._coefficient_tables is None or \
+                self._coefficient_tables_ionization_energies is not self.ionization_energies:
+            self._coefficient_tables = HeinrichCoefficientTables(self)
+            self._coefficient_tables_ionization_energies = self.ionization_energies
+
+        return self._coefficient_tables
+
+    @property
+    def emit_warnings(self):
+        return self.warning_mode != WARNING_MODE_NONE
+
+    def compute_macs_cm2_g(self, energies_emitter_eV, atomic_numbers_absorber):  # noqa
+        """
+        Compute the MAC for arrays of x-ray energies and absorbers.
+
+        The inputs are broadcast together and evaluated absorber by absorber with the precomputed coefficient tables,
+        the values are the same as the ones of the scalar evaluation. The validity warnings follow the warning mode.
+        """
+        macs_cm2_g, flags = self._compute_macs_and_validity(energies_emitter_eV, atomic_numbers_absorber,
+                                                            self.warning_mode == WARNING_MODE_POINT)
+
+        if self.warning_mode == WARNING_MODE_SUMMARY:
+            self.warn_validity_summary(flags)
+
+        return macs_cm2_g
+
+    def compute_macs_cm2_g_with_validity(self, energies_emitter_eV, atomic_numbers_absorber):  # noqa
+        """
+        Compute the MAC for arrays of x-ray energies and absorbers with the validity flags of each point.
+
+        No warning is emitted, the flags are a bitmask of :py:data:`VALIDITY_NEAR_EDGE`,
+        :py:data:`VALIDITY_VERY_LOW_ENERGY`, :py:data:`VALIDITY_BELOW_M5` and :py:data:`VALIDITY_BETWEEN_M4_M5`, zero
+        for a valid point. Use :py:func:`summarize_validity` to count them.
+
+        :return: MACs in cm2/g and validity flags
+        """
+        return self._compute_macs_and_validity(energies_emitter_eV, atomic_numbers_absorber, False)
+
+    def _compute_macs_and_validity(self, energies_emitter_eV, atomic_numbers_absorber, emit_point_warnings):  # noqa
+        energies_eV, atomic_numbers = numpy.broadcast_arrays(numpy.asarray(energies_emitter_eV, dtype=float),  # noqa
+                                                             numpy.asarray(atomic_numbers_absorber, dtype=int))
+        instrumentation.record_evaluation("model.Heinrich1987", energies_eV.size)
+
+        macs_cm2_g = numpy.empty(energies_eV.shape)
+        flags = numpy.zeros(energies_eV.shape, dtype=numpy.uint8)
+        for atomic_number in numpy.unique(atomic_numbers):
+            mask = atomic_numbers == atomic_number
+            atomic_number = int(atomic_number)
+
+            regions = self.get_regions(atomic_number, energies_eV[mask])
+            macs_cm2_g[mask] = self._compute_macs_cm2_g(energies_eV[mask], atomic_number, regions)
+            flags[mask] = self.compute_validity_flags(atomic_number, energies_eV[mask], regions)
+
+            if emit_point_warnings:
+                self.check_validity(atomic_number, energies_eV[mask], regions)
+
+        return macs_cm2_g, flags
+
+    def _compute_macs_cm2_g(self, energies_eV, atomic_number, regions):  # noqa
+        tables = self.coefficient_tables
+
+        C = tables.C[atomic_number, regions]  # noqa
+        n = tables.n[atomic_number, regions]
+        a = tables.a[atomic_number, regions]
+        b_eV = tables.b_eV[atomic_number, regions]  # noqa
+        atomic_mass_g_mol = tables.atomic_masses_g_mol[atomic_number]
+        cutoff_eV = tables.cutoffs_eV[atomic_number]  # noqa
+        edge_energy_n1_eV = tables.edges_eV[atomic_number, -1]  # noqa
+
+        with numpy.errstate(all='ignore'):
+            factor_c = C * math.pow(atomic_number, 4) / atomic_mass_g_mol
+            factor_n = numpy.power(12397.0 / energies_eV, n)
+
+            # Model 1.
+            factor_exp = 1.0 - numpy.exp((-energies_eV + b_eV) / a)
+            macs1_cm2_g = factor_c * factor_n * factor_exp
+
+            # Model 2, region 11.
+            factor_cutoff = (energies_eV - cutoff_eV) / (edge_energy_n1_eV - cutoff_eV)
+            macs2_cm2_g = 1.02 * factor_n * factor_c * factor_cutoff
+
+        macs_cm2_g = numpy.where(regions == 11, macs2_cm2_g, macs1_cm2_g)
+        macs_cm2_g[(macs_cm2_g < 0.0) | (energies_eV <= 0.0)] = 1.0E6
+
+        return macs_cm2_g
+
+    def get_regions(self, atomic_number, xray_energies_eV):  # noqa
+        """
+        Vectorized version of :py:meth:`get_region` for one absorber, without the edge checks.
+
+        The region is the one below the first edge (K, L1, ..., N1) crossed by the x-ray energy. A missing edge has a
+        zero energy, so the edges are not always sorted; the region is found with one binary search in the sorted
+        region edges of the absorber, see :py:class:`HeinrichCoefficientTables`. An energy equal to the K edge is in
+        region 1.
+        """
+        tables = self.coefficient_tables
+        if not tables.is_available(atomic_number):
+            raise KeyError(atomic_number)
+
+        instrumentation.record_evaluation("heinrich1987.get_regions", numpy.size(xray_energies_eV))
+
+        regions = NUMBER_REGIONS - numpy.searchsorted(tables.region_edges_eV[atomic_number], xray_energies_eV,
+                                                      side='left')
+        regions[xray_energies_eV >= tables.edges_eV[atomic_number, 0]] = 1
+
+        return regions
+
+    def compute_validity_flags(self, atomic_number, xray_energies_eV, regions):  # noqa
+        """
+        Validity flags of the points of one absorber, see :py:meth:`compute_macs_cm2_g_with_validity`.
+        """
+        tables = self.coefficient_tables
+        valid = xray_energies_eV > 0.0
+
+        flags = numpy.zeros(numpy.shape(xray_energies_eV), dtype=numpy.uint8)
+
+        edges_eV = tables.edges_eV[atomic_number]  # noqa
+        for index, edge_energy_eV in enumerate(edges_eV):  # noqa
+            differences_eV = xray_energies_eV - edge_energy_eV  # noqa
+            near_edge = valid & (regions > index) & (differences_eV >= -5.0) & (differences_eV <= 20.0)
+            flags[near_edge] |= VALIDITY_NEAR_EDGE
+
+        cutoff_eV = tables.cutoffs_eV[atomic_number]  # noqa
+        very_low = (xray_energies_eV <= 180.0) | ((regions == 11) & (xray_energies_eV <= cutoff_eV * 1.1))
+        flags[valid & very_low] |= VALIDITY_VERY_LOW_ENERGY
+
+        flags[valid & (regions >= 10)] |= VALIDITY_BELOW_M5
+
+        if atomic_number < 70:
+            flags[valid & (regions == 9)] |= VALIDITY_BETWEEN_M4_M5
+
+        return flags
+
+    @staticmethod
+    def warn_validity_summary(flags):
+        """Warning with the number of points failing each validity check, if any."""
+        summary = summarize_validity(flags)
+
+        if summary["valid"] < summary["points"]:
+            counts = ", ".join("%i %s" % (summary[name], name) for name in VALIDITY_NAMES.values() if summary[name])
+            message = "X-ray energies outside the validity domain (%s) for %i of %i points." % \
+                      (counts, summary["points"] - summary["valid"], summary["points"])
+            warnings.warn(message)
+            logging.warning(message)
+            instrumentation.increment("heinrich1987.warnings")
+
+    def check_validity(self, atomic_number, xray_energies_eV, regions):  # noqa
+        """
+        Vectorized version of the checks done by the scalar evaluation, the warnings are only emitted for the points
+        that fail a check.
+        """
+        tables = self.coefficient_tables
+        valid = xray_energies_eV > 0.0
+
+        for energy_eV in xray_energies_eV[valid & (xray_energies_eV <= 180.0)]:  # noqa
+            self.check_very_low_energy_eV(energy_eV)
+
+        edges_eV = tables.edges_eV[atomic_number]  # noqa
+        for index, edge_energy_eV in enumerate(edges_eV):  # noqa
+            differences_eV = xray_energies_eV - edge_energy_eV  # noqa
+            near_edge = valid & (regions > index) & (differences_eV >= -5.0) & (differences_eV <= 20.0)
+            for energy_eV in xray_energies_eV[near_edge]:  # noqa
+                self.check_xray_energy_close_edge_energy(energy_eV, edge_energy_eV)
+
+        for region in regions[valid & (regions >= 10)]:
+            self.check_energy_below_m5(region)
+
+        for region in regions[valid & (regions == 9)]:
+            self.check_energy_between_m4_m5_z(region, atomic_number)
+
+        cutoff_eV = tables.cutoffs_eV[atomic_number]  # noqa
+        very_low = valid & (regions == 11) & (xray_energies_eV <= cutoff_eV * 1.1)
+        for energy_eV in xray_energies_eV[very_low]:  # noqa
+            self.check_very_low_energy_eV(energy_eV, energy_limit_eV=cutoff_eV * 1.1)
+
     def _compute_mac_cm2_g(self, energy_emitter_eV, atomic_number_absorber):  # noqa
+        instrumentation.record_evaluation("model.Heinrich1987", 1)
+
         if energy_emitter_eV <= 0.0:
             return 1.0E6
 
-        self.check_very_low_energy_eV(energy_emitter_eV)
+        if self.emit_warnings:
+            self.check_very_low_energy_eV(energy_emitter_eV)
 
         region = self.get_region(atomic_number_absorber, energy_emitter_eV)
-        self.check_energy_below_m5(region)
+        if self.emit_warnings:
+            self.check_energy_below_m5(region)
 
-        self.check_energy_between_m4_m5_z(region, atomic_number_absorber)
+            self.check_energy_between_m4_m5_z(region, atomic_number_absorber)
 
         C = self.coefficient_C[region](atomic_number_absorber)  # noqa
 
@@ -161,7 +441,8 @@ class MacHeinrich1987:
         if region == 11:
             cutoff_eV = self.compute_cutoff_eV(atomic_number_absorber)  # noqa
 
-            self.check_very_low_energy_eV(energy_emitter_eV, energy_limit_eV=cutoff_eV * 1.1)
+            if self.emit_warnings:
+                self.check_very_low_energy_eV(energy_emitter_eV, energy_limit_eV=cutoff_eV * 1.1)
 
             mac_cm2_g = self.compute_model2(atomic_number_absorber, atomic_mass_g_mol, energy_emitter_eV, C, n,
                                             cutoff_eV)
@@ -240,10 +521,13 @@ class MacHeinrich1987:
         return mac_cm2_g
 
     def get_region(self, atomic_number, xray_energy_eV):  # noqa
+        instrumentation.increment("heinrich1987.get_region")
+
         # Region 1
         edge_energy_K_eV = self.ionization_energies.ionization_energy_eV(atomic_number, 'K')  # noqa
 
-        self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_K_eV)
+        if self.emit_warnings:
+            self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_K_eV)
 
         if xray_energy_eV >= edge_energy_K_eV:
             return 1
@@ -251,7 +535,8 @@ class MacHeinrich1987:
         # Region 2
         edge_energy_L1_eV = self.ionization_energies.ionization_energy_eV(atomic_number, 'L1')  # noqa
 
-        self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_L1_eV)
+        if self.emit_warnings:
+            self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_L1_eV)
 
         if edge_energy_K_eV >= xray_energy_eV > edge_energy_L1_eV:
             return 2
@@ -259,7 +544,8 @@ class MacHeinrich1987:
         # Region 3
         edge_energy_L2_eV = self.ionization_energies.ionization_energy_eV(atomic_number, 'L2')  # noqa
 
-        self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_L2_eV)
+        if self.emit_warnings:
+            self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_L2_eV)
 
         if edge_energy_L1_eV >= xray_energy_eV > edge_energy_L2_eV:
             return 3
@@ -267,7 +553,8 @@ class MacHeinrich1987:
         # Region 4
         edge_energy_L3_eV = self.ionization_energies.ionization_energy_eV(atomic_number, 'L3')  # noqa
 
-        self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_L3_eV)
+        if self.emit_warnings:
+            self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_L3_eV)
 
         if edge_energy_L2_eV >= xray_energy_eV > edge_energy_L3_eV:
             return 4
@@ -275,7 +562,8 @@ class MacHeinrich1987:
         # Region 5
         edge_energy_M1_eV = self.ionization_energies.ionization_energy_eV(atomic_number, 'M1')  # noqa
 
-        self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_M1_eV)
+        if self.emit_warnings:
+            self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_M1_eV)
 
         if edge_energy_L3_eV >= xray_energy_eV > edge_energy_M1_eV:
             return 5
@@ -283,7 +571,8 @@ class MacHeinrich1987:
         # Region 6
         edge_energy_M2_eV = self.ionization_energies.ionization_energy_eV(atomic_number, 'M2')  # noqa
 
-        self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_M2_eV)
+        if self.emit_warnings:
+            self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_M2_eV)
 
         if edge_energy_M1_eV >= xray_energy_eV > edge_energy_M2_eV:
             return 6
@@ -291,7 +580,8 @@ class MacHeinrich1987:
         # Region 7
         edge_energy_M3_eV = self.ionization_energies.ionization_energy_eV(atomic_number, 'M3')  # noqa
 
-        self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_M3_eV)
+        if self.emit_warnings:
+            self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_M3_eV)
 
         if edge_energy_M2_eV >= xray_energy_eV > edge_energy_M3_eV:
             return 7
@@ -299,7 +589,8 @@ class MacHeinrich1987:
         # Region 8
         edge_energy_M4_eV = self.ionization_energies.ionization_energy_eV(atomic_number, 'M4')  # noqa
 
-        self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_M4_eV)
+        if self.emit_warnings:
+            self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_M4_eV)
 
         if edge_energy_M3_eV >= xray_energy_eV > edge_energy_M4_eV:
             return 8
@@ -307,7 +598,8 @@ class MacHeinrich1987:
         # Region 9
         edge_energy_M5_eV = self.ionization_energies.ionization_energy_eV(atomic_number, 'M5')  # noqa
 
-        self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_M5_eV)
+        if self.emit_warnings:
+            self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_M5_eV)
 
         if edge_energy_M4_eV >= xray_energy_eV > edge_energy_M5_eV:
             return 9
@@ -315,7 +607,8 @@ class MacHeinrich1987:
         # Region 10
         edge_energy_N1_eV = self.ionization_energies.ionization_energy_eV(atomic_number, 'N1')  # noqa
 
-        self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_N1_eV)
+        if self.emit_warnings:
+            self.check_xray_energy_close_edge_energy(xray_energy_eV, edge_energy_N1_eV)
 
         if edge_energy_M5_eV >= xray_energy_eV > edge_energy_N1_eV:
             return 10
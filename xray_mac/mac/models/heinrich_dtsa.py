@@ -28,21 +28,51 @@ MAC Heinrich model from DTSA program.
 import math
 
 # Third party modules.
+import numpy as np
 
 # Local modules.
 
 # Project modules.
-from xray_mac.mac.models.ionization_energies import IonizationEnergies
-from xray_mac.mac.models.element_properties import get_atomic_mass_g_mol
+from xray_mac.mac.models import instrumentation
+from xray_mac.mac.models.ionization_energies import IonizationEnergies, SUBSHELL_INDICES
+from xray_mac.mac.models.element_properties import get_atomic_mass_g_mol, get_element_table
 
 # Globals and constants variables.
+EDGE_SUBSHELLS = ['K', 'L1', 'L2', 'L3', 'M1', 'M2', 'M3', 'M4', 'M5', 'N1']
 
 
 class MacHeinrichDTSA:
     def __init__(self):
         self.ionization_energies = IonizationEnergies()
 
+        self._edge_energies_eV = None
+        self._edge_energies_ionization_energies = None
+
+    @property
+    def edge_energies_eV(self):  # noqa
+        """
+        Edge energies used by the model (K, L1, ..., N1), one row per atomic number, NaN for a missing element.
+
+        Built on first use and rebuilt if the ionization energies are replaced.
+        """
+        if self._edge_energies_eV is None or self._edge_energies_ionization_energies is not self.ionization_energies:
+            edge_table = self.ionization_energies.get_edge_table()
+            columns = [SUBSHELL_INDICES[subshell] for subshell in EDGE_SUBSHELLS]
+
+            self._edge_energies_eV = np.where(edge_table.present[:, np.newaxis], edge_table.energies_eV[:, columns],
+                                              np.nan)
+            self._edge_energies_eV.setflags(write=False)
+
+            self._edge_energies_ionization_energies = self.ionization_energies
+
+        return self._edge_energies_eV
+
     def compute_mac_cm2_g(self, energy_eV, atomic_number):  # noqa
+        if np.ndim(energy_eV) > 0 or np.ndim(atomic_number) > 0:
+            return self.compute_macs_cm2_g(energy_eV, atomic_number)
+
+        instrumentation.record_evaluation("model.HeinrichDTSA", 1)
+
         if energy_eV <= 10.0:
             return 1e6
 
@@ -188,6 +218,168 @@ class MacHeinrichDTSA:
 
         return mu_cm2_g
 
+    def compute_macs_cm2_g(self, energies_eV, atomic_numbers):  # noqa
+        """
+        Compute the MAC for arrays of x-ray energies and absorbers.
+
+        The inputs are broadcast together, the edge energies come from :py:attr:`edge_energies_eV` and each branch of
+        the scalar evaluation is applied on the points selected by a mask, the values are the same as the ones of
+        :py:meth:`compute_mac_cm2_g` for each point.
+
+        :param energies_eV: x-ray energies in eV
+        :param atomic_numbers: atomic numbers of the absorbers
+        :return: MACs in cm2/g
+        """
+        energies_eV, atomic_numbers = np.broadcast_arrays(np.asarray(energies_eV, dtype=float),  # noqa
+                                                          np.asarray(atomic_numbers, dtype=int))
+        instrumentation.record_evaluation("model.HeinrichDTSA", energies_eV.size)
+
+        macs_cm2_g = np.where(energies_eV <= 10.0, 1e6, 0.001)
+
+        mask = (energies_eV > 10.0) & (atomic_numbers >= 3) & (atomic_numbers <= 95)
+        if not np.any(mask):
+            return macs_cm2_g
+
+        edge_energies_eV = self.edge_energies_eV  # noqa
+        z_indices = atomic_numbers[mask]
+        missing = (z_indices >= len(edge_energies_eV))
+        missing[~missing] = np.isnan(edge_energies_eV[z_indices[~missing], 0])
+        if np.any(missing):
+            raise KeyError(int(z_indices[missing][0]))
+
+        macs_cm2_g[mask] = self._compute_macs_cm2_g(energies_eV[mask], z_indices, edge_energies_eV[z_indices])
+
+        return macs_cm2_g
+
+    def _compute_macs_cm2_g(self, energy_eV, z_indices, edges_eV):  # noqa
+        z = z_indices.astype(float)
+        ee_K, ee_LI, ee_LII, ee_LIII, ee_MI, ee_MII, ee_MIII, ee_MIV, ee_MV, ee_NI = edges_eV.T  # noqa
+
+        cc = np.empty_like(energy_eV)
+        az = np.empty_like(energy_eV)
+        nm = np.empty_like(energy_eV)
+        bias = np.zeros_like(energy_eV)
+
+        # energy is above the K edge.
+        above_k = energy_eV > ee_K
+
+        m = above_k & (z < 6)
+        zm = z[m]
+        cc[m] = 1.808599e-3 * zm - 2.87536e-4
+        az[m] = (-14.15422 * zm + 155.6055) * zm + 24.4545
+        bias[m] = 18.2 * zm - 103.0
+        nm[m] = (-0.01273815 * zm + 0.02652873) * zm + 3.34745
+
+        m = above_k & (z >= 6)
+        zm = z[m]
+        cc[m] = 5.253e-3 + zm * (1.33257e-3 + zm * (-7.5937e-5 + zm * (1.69357e-6 + -1.3975e-8 * zm)))
+        az[m] = ((-0.152624 * zm + 6.52) * zm + 47.0) * zm
+        nm[m] = 3.112 - 0.0121 * zm
+
+        # These special conditions are not mentioned in the IXCOM 11
+        # article but are implemented in DTSA
+        m = above_k & (z >= 50)
+        zm = z[m]
+        az[m] = ((-0.015 * zm + 3.52) * zm + 47) * zm
+
+        m = above_k & (z >= 57)
+        zm = z[m]
+        cc[m] = 2.0e-4 + (1.0e-4 - zm) * zm
+
+        # energy is below K-edge & above L3-edge.
+        above_l3 = ~above_k & (energy_eV > ee_LIII)
+
+        m = above_l3
+        zm = z[m]
+        factor1 = -9.07306E-10 + zm * 3.19245E-12
+        cc[m] = -0.0924e-3 + zm * (0.141478e-3 + zm * (-0.00524999e-3 + zm * (9.85296E-8 + zm * factor1)))
+        az[m] = (((-1.16286e-4 * zm + 0.01253775) * zm + 0.067429) * zm + 17.8096) * zm
+        nm[m] = (-4.982E-5 * zm + 1.889e-3) * zm + 2.7575
+
+        m = above_l3 & (ee_LI > energy_eV) & (energy_eV > ee_LII)
+        cc[m] *= 0.858
+
+        m = above_l3 & (energy_eV < ee_LII)
+        zm = z[m]
+        cc[m] *= (0.8933 + zm * (-8.29e-3 + 6.38E-5 * zm))
+
+        below_l3 = ~above_k & ~above_l3
+        above_m1 = below_l3 & (ee_LIII >= energy_eV) & (energy_eV > ee_MI)
+
+        m = above_m1
+        zm = z[m]
+        nm[m] = ((4.4509E-6 * zm - 1.08246e-3) * zm + 0.084597) * zm + 0.5385
+        az[m] = (((-1.8641019e-4 * zm + 2.63199611e-2) * zm - 0.822863477) * zm + 10.2575657) * zm
+
+        m = above_m1 & (z < 30)
+        zm = z[m]
+        factor1 = zm + 1.889757e-2
+        cc[m] = (((7.2773258e-9 * zm - 1.1641145e-6) * zm + 6.9602789e-5) * zm - 1.8517159e-3) * factor1
+
+        m = above_m1 & (z >= 30)
+        zm = z[m]
+        factor1 = zm + 3.0039e-3
+        cc[m] = (((1.497763e-10 * zm - 4.0585911e-8) * zm + 4.0424792e-6) * zm - 1.73663566e-4) * factor1
+
+        m = above_m1 & (z < 61)
+        zm = z[m]
+        bias[m] = (((-1.683474e-4 * zm + 0.018972278) * zm - 0.536839169) * zm + 5.654) * zm
+
+        m = above_m1 & (z >= 61)
+        zm = z[m]
+        bias[m] = (((3.1779619e-3 * zm - 0.699473097) * zm + 51.114164) * zm - 1232.4022) * zm
+
+        below_m1 = below_l3 & ~above_m1
+        above_m5 = below_m1 & (energy_eV >= ee_MV)
+
+        m = above_m5
+        zm = z[m]
+        az[m] = (4.62 - 0.04 * zm) * zm
+        cc[m] = ((-1.29086e-9 * zm + 2.209365e-7) * zm - 7.83544e-6) * zm + 7.7708e-5
+        cc[m] *= ((4.865E-6 * zm - 0.0006561) * zm + 0.0162) * zm + 1.406
+        bias[m] = ((3.78e-4 * zm - 0.052) * zm + 2.51) * ee_MIV[m]
+        nm[m] = 3.0 - 0.004 * zm
+
+        above_m2 = above_m5 & (energy_eV >= ee_MII)
+        above_m3 = above_m5 & ~above_m2 & (energy_eV >= ee_MIII)
+        above_m4 = above_m5 & ~above_m2 & ~above_m3 & (energy_eV >= ee_MIV)
+        below_m4 = above_m5 & ~above_m2 & ~above_m3 & ~above_m4
+
+        zm = z[above_m2]
+        cc[above_m2] *= ((-0.0001285 * zm + 0.01955) * zm + 0.584)
+        zm = z[above_m3]
+        cc[above_m3] *= 0.001366 * zm + 1.082
+        cc[above_m4] *= 0.95
+        zm = z[below_m4]
+        cc[below_m4] *= (4.0664e-4 * zm - 4.8e-2) * zm + 1.6442
+
+        m = below_m1 & ~above_m5
+        zm = z[m]
+        cc[m] = 1.08 * (((-6.69827e-9 * zm + 1.707073e-6) * zm - 1.4653e-4) * zm + 4.3156e-3)
+        az[m] = ((5.39309e-3 * zm - 0.61239) * zm + 19.64) * zm
+        bias[m] = 4.5 * zm - 113.0
+        nm[m] = 0.3736 + 0.02401 * zm
+
+        atomic_weight = get_element_table().atomic_masses_g_mol[z_indices]
+
+        mu = np.empty_like(energy_eV)
+
+        m = energy_eV > ee_NI
+        zm = z[m]
+        mu[m] = cc[m] * np.power(12397.0 / energy_eV[m], nm[m]) * zm * zm * zm * zm / atomic_weight[m]
+        mu[m] = mu[m] * (1 - np.exp((bias[m] - energy_eV[m]) / az[m]))
+
+        m = ~m
+        zm = z[m]
+        factor1 = 1 - np.exp((bias[m] - ee_NI[m]) / az[m])
+        mu[m] = cc[m] * np.power(12397.0 / energy_eV[m], nm[m]) * zm * zm * zm * zm / atomic_weight[m] * factor1
+
+        cutoff = self.get_cutoff(zm)
+
+        mu[m] = 1.02 * mu[m] * (energy_eV[m] - cutoff) / (ee_NI[m] - cutoff)
+
+        return mu
+
     @staticmethod
     def get_cutoff(atomic_number):  # noqa
         r"""
@@ -30,10 +30,12 @@ import os.path
 import math
 
 # Third party modules.
+import numpy as np
 
 # Local modules.
 
 # Project modules.
+from xray_mac.mac.models import instrumentation
 from xray_mac.mac.models.elements import ElementProperties
 from xray_mac.mac import create_root_path
 
@@ -131,6 +133,8 @@ g_coefficient = [41746.75,
                  182.13,
                  176.78]
 
+_henke_archives = {}
+
 
 def get_coefficient(atomic_number):
     index = atomic_number - 1
@@ -185,12 +189,71 @@ def wavelength_photon_nm(energy_eV):  # noqa
     return value_nm
 
 
+class HenkeArchive:
+    """
+    Members of the Henke scattering factor archive, decompressed once and indexed by element symbol.
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+        self.members = {}
+        instrumentation.increment("load.henke")
+        with instrumentation.timer("load.henke"), tarfile.open(file_path, mode='r:gz') as tar_file:
+            for member in tar_file.getmembers():
+                if member.isfile() and member.name.endswith('.nff'):
+                    symbol = os.path.splitext(os.path.basename(member.name))[0]
+                    self.members[symbol] = tar_file.extractfile(member).read()
+
+        self._data = {}
+
+    def symbols(self):
+        return list(self.members)
+
+    def read_data(self, symbol):
+        """
+        Energies and f2 values of an element, parsed on first use.
+
+        :param str symbol: lower case symbol of the element
+        :return: read-only arrays of energies in eV and f2, empty if the element is not in the archive
+        """
+        instrumentation.record_cache("henke.element", symbol in self._data)
+        if symbol not in self._data:
+            if symbol in self.members:
+                lines = self.members[symbol].splitlines()[1:]
+                values = np.array([line.split(b'\t')[:3] for line in lines if line.strip()], dtype=float)
+                energies_eV = values[:, 0]  # noqa
+                f2s = values[:, 2]
+            else:
+                energies_eV = np.empty(0)  # noqa
+                f2s = np.empty(0)
+
+            energies_eV.setflags(write=False)
+            f2s.setflags(write=False)
+            self._data[symbol] = energies_eV, f2s
+
+        return self._data[symbol]
+
+
+def get_henke_archive(file_path):
+    """
+    Archive of the Henke scattering factors, read once per process for each file.
+    """
+    key = str(file_path)
+    instrumentation.record_cache("henke.archive", key in _henke_archives)
+    if key not in _henke_archives:
+        _henke_archives[key] = HenkeArchive(file_path)
+
+    return _henke_archives[key]
+
+
 class MacHenke(object):
     def __init__(self, data_path):
         self.data_path = data_path
 
         self._filename = "sf.tar.gz"
 
+        self.element_properties = ElementProperties()
+
     def compute_coefficient_keVcm2_g(self, atomic_number):  # noqa
         r0_m = 2.817938e-15
         h_Js = 6.62618E-34  # noqa
@@ -202,8 +265,7 @@ class MacHenke(object):
 
         N0_atom_mol = 6.02205E23  # noqa
 
-        element_properties = ElementProperties()
-        A_g_mol = element_properties.atomic_mass_g_mol(atomic_number)  # noqa
+        A_g_mol = self.element_properties.atomic_mass_g_mol(atomic_number)  # noqa
 
         K_atomJm2_g = 2.0 * N0_atom_mol / (math.pi * C_1_Jm2 * A_g_mol)  # noqa
 
@@ -211,61 +273,20 @@ class MacHenke(object):
 
         return K_keVcm2_g
 
-    def get_elements(self):
-        elements = []
-
+    def get_archive(self):
         gz_filename = os.path.join(self.data_path, self._filename)
 
-        tar_file = tarfile.TarFile.gzopen(gz_filename, mode='r')
-
-        files = tar_file.getnames()
+        return get_henke_archive(gz_filename)
 
-        for file in files:
-            if '.nff' in file:
-                element = os.path.splitext(os.path.basename(file))[0]
-                elements.append(element)
-
-        return elements
+    def get_elements(self):
+        return self.get_archive().symbols()
 
     def read_data(self, atomic_number):
-        gz_filename = os.path.join(self.data_path, self._filename)
-
-        tar_file = tarfile.TarFile.gzopen(gz_filename, mode='r')
-
-        files = tar_file.getnames()
-
-        element_properties = ElementProperties()
-        symbol = element_properties.symbol(atomic_number).lower()
-
-        filename = symbol + '.nff'
-
-        energies_eV = []  # noqa
-        macs_cm2_g = []
-
-        if filename in files:
-            lines = tar_file.extractfile(filename).readlines()
-
-            f1s = []
-            f2s = []
-
-            for line in lines[1:]:
-                values = line.split(b'\t')
-
-                energy_eV = float(values[0])  # noqa
-
-                energies_eV.append(energy_eV)
-
-                f1s.append(float(values[1]))
-
-                f2 = float(values[2])
-
-                f2s.append(f2)
-
-                mac_cm2_g = self.compute_mac_cm2_g(atomic_number, energy_eV, f2)
+        symbol = self.element_properties.symbol(atomic_number).lower()
 
-                macs_cm2_g.append(mac_cm2_g)
+        energies_eV, f2s = self.get_archive().read_data(symbol)  # noqa
 
-        tar_file.close()
+        macs_cm2_g = self.compute_mac_cm2_g(atomic_number, energies_eV, f2s)
 
         return energies_eV, macs_cm2_g
 
@@ -276,8 +297,7 @@ class MacHenke(object):
 
         for element in elements:
 
-            element_properties = ElementProperties()
-            atomic_number = element_properties.atomic_number(element)
+            atomic_number = self.element_properties.atomic_number(element)
 
             energies_eV, macs_cm2_g = self.read_data(atomic_number)  # noqa
 
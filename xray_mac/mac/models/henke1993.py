@@ -26,84 +26,114 @@ Henke 1993 MAC model.
 
 # Standard library modules.
 import logging
+import os.path
 
 # Third party modules.
 import numpy
-from scipy.interpolate import interp1d
 
 # Local modules.
 
 # Project modules.
+from xray_mac.mac.models import instrumentation
 from xray_mac.mac.models.henke import MacHenke
 from xray_mac.mac.models.henke_winxray import MacHenkeWinxray
+from xray_mac.mac.models.mac_database import read_database_data, get_default_data_path, MODEL_HENKE1993, \
+    MODEL_HENKE_WINXRAY
+from xray_mac.mac.models.interpolation import Interpolation1D, LINEAR, NEAREST, ZERO, SLINEAR, QUADRATIC, CUBIC, \
+    LOG_LOG  # noqa: F401
 
 # Globals and constants variables.
-LINEAR = 'linear'
-NEAREST = 'nearest'
-ZERO = 'zero'
-SLINEAR = 'slinear'
-QUADRATIC = 'quadratic'
-CUBIC = 'cubic'
+STEP_RELATIVE_TOLERANCE = 1.0e-4
 
 
-class Interpolation1D:
-    def __init__(self, x, y, kind=LINEAR):
-        self._interpolateFunc = interp1d(x, y, kind=kind)
+class LogLogInterpolation(Interpolation1D):
+    """
+    Linear interpolation in log-log space of one tabulated curve, clamped to the end values outside the table.
 
-    def __call__(self, x_new):
-        return self._interpolateFunc(x_new)
+    Two energies closer than :py:data:`STEP_RELATIVE_TOLERANCE` are an absorption edge, interpolated as a step.
+    """
+    def __init__(self, x, y):
+        super().__init__(x, y, kind=LOG_LOG, clamp=True, step_tolerance=STEP_RELATIVE_TOLERANCE)
 
 
 class MacHenke1993:
-    def __init__(self, data_path, model='Henke'):
+    def __init__(self, data_path, model='Henke', database_file_path=None):
+        """
+        :param data_path: directory of the tabulated data
+        :param str model: 'Henke' for the scattering factor archive or 'HenkeWinxray' for the WinXRay tables
+        :param database_file_path: MAC database file, only used if the data path is the default one of the model, see
+            :py:func:`xray_mac.mac.models.mac_database.read_database_data`
+        """
         if model == 'HenkeWinxray':
             self.mac_model = MacHenkeWinxray(data_path)
+            database_model = MODEL_HENKE_WINXRAY
         else:
             self.mac_model = MacHenke(data_path)
+            database_model = MODEL_HENKE1993
+        self._evaluation_name = "model." + database_model
 
-        self.minimumEnergy_eV = 0.0
-
-        self.minimumMAC_cm2_g = 0.0
+        self.database_model = None
+        if os.path.normpath(os.path.abspath(data_path)) == get_default_data_path(database_model):
+            self.database_model = database_model
+        self.database_file_path = database_file_path
 
         self.mac_data = {}
 
-        self._vec_computeMac_cm2_g = numpy.vectorize(self._compute_mac_cm2_g)
-
     def compute_mac_cm2_g(self, energy_emitter_eV, atomic_number_absorber):  # noqa
-        if isinstance(energy_emitter_eV, numpy.ndarray):
-            return self._vec_computeMac_cm2_g(energy_emitter_eV, atomic_number_absorber)
-        else:
-            return self._compute_mac_cm2_g(energy_emitter_eV, atomic_number_absorber)
+        """
+        Compute the MAC for an x-ray energy and an absorber, or for arrays of them.
+
+        The tabulated MACs of each absorber are read once and interpolated in log-log space, the values below or above
+        the table of this absorber are the first or last tabulated MAC.
+
+        :param energy_emitter_eV: x-ray energy or energies in eV
+        :param atomic_number_absorber: atomic number or numbers of the absorber
+        :return: MAC in cm2/g, a float for scalar inputs
+        """
+        energies_eV, atomic_numbers = numpy.broadcast_arrays(numpy.asarray(energy_emitter_eV, dtype=float),  # noqa
+                                                             numpy.asarray(atomic_number_absorber, dtype=int))
+        instrumentation.record_evaluation(self._evaluation_name, energies_eV.size)
+
+        macs_cm2_g = numpy.zeros(energies_eV.shape)
+        for atomic_number in numpy.unique(atomic_numbers):
+            mask = atomic_numbers == atomic_number
+            atomic_number = int(atomic_number)
+
+            interpolation = self.get_interpolation(atomic_number)
+            if interpolation is None:
+                logging.error("No mac for %i and %0.1f", atomic_number, energies_eV[mask][0])
+            else:
+                macs_cm2_g[mask] = interpolation(energies_eV[mask])
 
-    def _compute_mac_cm2_g(self, energy_emitter_eV, atomic_number_absorber):  # noqa
+        if macs_cm2_g.ndim == 0:
+            return float(macs_cm2_g)
+        else:
+            return macs_cm2_g
+
+    def read_data(self, atomic_number):
+        """
+        Tabulated energies in eV and MACs in cm2/g of an absorber, from the MAC database file if it exists, has the
+        absorber and was built from the current data files, parsed from the data files otherwise.
+        """
+        if self.database_model is not None:
+            data = read_database_data(self.database_model, atomic_number, self.database_file_path,
+                                      get_default_data_path(self.database_model))
+            if data is not None:
+                return data
+
+        return self.mac_model.read_data(atomic_number)
+
+    def get_interpolation(self, atomic_number_absorber):
+        """
+        Interpolation of the tabulated MACs of an absorber, None if there is no data.
+        """
+        instrumentation.record_cache("henke1993.interpolation", atomic_number_absorber in self.mac_data)
         if atomic_number_absorber not in self.mac_data:
-            energies_eV, macs_cm2_g = self.mac_model.read_data(atomic_number_absorber)  # noqa
+            energies_eV, macs_cm2_g = self.read_data(atomic_number_absorber)  # noqa
 
             if len(energies_eV) > 0:
-                self.mac_data.setdefault(atomic_number_absorber, {})
-
-                self.minimumEnergy_eV = energies_eV[0]
-
-                self.minimumMAC_cm2_g = macs_cm2_g[0]
-
-                self.maximumEnergy_eV = energies_eV[-1]
-
-                self.maximumMAC_cm2_g = macs_cm2_g[-1]
-
-                self.mac_data[atomic_number_absorber] = Interpolation1D(energies_eV, macs_cm2_g)
-
+                self.mac_data[atomic_number_absorber] = LogLogInterpolation(energies_eV, macs_cm2_g)
             else:
-                logging.error("No mac for %i and %0.1f", atomic_number_absorber, energy_emitter_eV)
-                return 0.0
+                return None
 
-        if energy_emitter_eV <= self.minimumEnergy_eV:
-            return self.minimumMAC_cm2_g
-
-        if energy_emitter_eV >= self.maximumEnergy_eV:
-            return self.maximumMAC_cm2_g
-
-        if atomic_number_absorber in self.mac_data:
-            return self.mac_data[atomic_number_absorber](energy_emitter_eV)
-        else:
-            logging.error("No mac for %i and %0.1f", atomic_number_absorber, energy_emitter_eV)
-            return 0.0
+        return self.mac_data[atomic_number_absorber]
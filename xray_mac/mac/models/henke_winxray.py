@@ -26,16 +26,20 @@ MAC Henke model from Winxray program.
 
 # Standard library modules.
 import os.path
-import struct
 
 # Third party modules.
+import numpy as np
 
 # Local modules.
 
 # Project modules.
+from xray_mac.mac.models import instrumentation
 from xray_mac.mac.models.elements import ElementProperties
 
 # Globals and constants variables.
+BINARY_NUMBER_POINTS_OFFSET = 8
+BINARY_HEADER_SIZE = 16
+BINARY_DTYPE = np.dtype([('energy_eV', '<f4'), ('mac_cm2_g', '<f4')])
 
 
 class MacHenkeWinxray(object):
@@ -44,12 +48,32 @@ class MacHenkeWinxray(object):
         self.pathnameBinary = os.path.join(data_path, "binary")
         self.pathnameText = os.path.join(data_path, "text")
 
-    def read_data(self, atomic_number):
-        return self.read_text_data(atomic_number)
+        self.element_properties = ElementProperties()
+
+    def read_data(self, atomic_number, binary=False):
+        """
+        Read the MAC table of an element.
+
+        :param int atomic_number: atomic number of the element
+        :param bool binary: read the binary table if it exists, the text table is used otherwise
+        :return: energies in eV and MACs in cm2/g
+        """
+        instrumentation.increment("load.henke_winxray")
+        with instrumentation.timer("load.henke_winxray"):
+            if binary and os.path.isfile(self.get_binary_filename(atomic_number)):
+                return self.read_binary_data(atomic_number)
+
+            return self.read_text_data(atomic_number)
+
+    def get_binary_filename(self, atomic_number):
+        symbol = self.element_properties.symbol(atomic_number).lower()
+
+        filename = symbol + '_eV.mhb'
+
+        return os.path.join(self.pathnameBinary, filename)
 
     def read_text_data(self, atomic_number):
-        element_properties = ElementProperties()
-        symbol = element_properties.symbol(atomic_number).lower()
+        symbol = self.element_properties.symbol(atomic_number).lower()
 
         filename = symbol + '.dat'
 
@@ -70,30 +94,13 @@ class MacHenkeWinxray(object):
         return energies_eV, mac_cm2_g
 
     def read_binary_data(self, atomic_number):
-        element_properties = ElementProperties()
-        symbol = element_properties.symbol(atomic_number).lower()
-
-        filename = symbol + '_eV.mhb'
+        """
+        Map the binary table of an element, the energies and MACs are read-only float32 views of the file.
+        """
+        filename = self.get_binary_filename(atomic_number)
 
-        filename = os.path.join(self.pathnameBinary, filename)
+        number_points = int(np.fromfile(filename, dtype='<i4', count=1, offset=BINARY_NUMBER_POINTS_OFFSET)[0])
 
-        data = open(filename, 'rb').read()
+        data = np.memmap(filename, dtype=BINARY_DTYPE, mode='r', offset=BINARY_HEADER_SIZE, shape=(number_points,))
 
-        stop = struct.calcsize('f'*2)
-
-        start, stop = stop, stop + struct.calcsize('if')
-
-        number_points = struct.unpack('if', data[start:stop])[0]
-
-        energies_eV = [0.0]*number_points  # noqa
-        mac_cm2_g = [0.0]*number_points
-
-        for index in range(number_points):
-            start, stop = stop, stop + struct.calcsize('ff')
-
-            values = struct.unpack('ff', data[start:stop])
-
-            energies_eV[index] = values[0]
-            mac_cm2_g[index] = values[1]
-
-        return energies_eV, mac_cm2_g
+        return data['energy_eV'], data['mac_cm2_g']
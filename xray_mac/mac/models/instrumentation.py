@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xray_mac.mac.models.instrumentation
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Opt-in counters and timers of the hot paths of the models.
+
+The instrumentation is disabled by default, a hook then costs one function call and one test of a global flag. When
+enabled, the hooks count the data file loads, the cache hits and misses of the per-element tables, the model
+evaluations and points of each back end, and accumulate the wall time of each stage. The names are dotted, for example
+``load.chantler2005``, ``cache.henke1993.interpolation.miss``
+or ``model.Chantler2005.points``.
+
+Usage::
+
+    with instrumented() as statistics:
+        material.compute_mac_cm2_g(energies_eV, mac_model)
+    print(statistics["counters"], statistics["times_s"])
+"""
+
+###############################################################################
+# Copyright 2021 Hendrix Demers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###############################################################################
+
+# Standard library modules.
+import contextlib
+import threading
+import time
+
+# Third party modules.
+
+# Local modules.
+
+# Project modules.
+
+# Globals and constants variables.
+_enabled = False
+_counters = {}
+_times_s = {}
+_lock = threading.Lock()
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    """
+    Set all the counters and timers to zero.
+    """
+    with _lock:
+        _counters.clear()
+        _times_s.clear()
+
+
+def increment(name, value=1):
+    """
+    Add a value to a counter, nothing is done if the instrumentation is disabled.
+    """
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + value
+
+
+def record_cache(name, hit):
+    """
+    Count a hit or a miss of a cache, the counters are ``cache.<name>.hit`` and ``cache.<name>.miss``.
+    """
+    if _enabled:
+        increment("cache.%s.%s" % (name, "hit" if hit else "miss"))
+
+
+def record_evaluation(name, number_points):
+    """
+    Count an evaluation and its points, the counters are ``<name>.evaluations`` and ``<name>.points``.
+    """
+    if _enabled:
+        with _lock:
+            key = name + ".evaluations"
+            _counters[key] = _counters.get(key, 0) + 1
+            key = name + ".points"
+            _counters[key] = _counters.get(key, 0) + int(number_points)
+
+
+class _Timer:
+    __slots__ = ['name', 'start_time_s']
+
+    def __init__(self, name):
+        self.name = name
+        self.start_time_s = None
+
+    def __enter__(self):
+        self.start_time_s = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed_time_s = time.perf_counter() - self.start_time_s
+        with _lock:
+            _times_s[self.name] = _times_s.get(self.name, 0.0) + elapsed_time_s
+        return False
+
+
+class _NullTimer:
+    __slots__ = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name):
+    """
+    Context manager adding its wall time to the timer of a stage, it does nothing if the instrumentation is disabled.
+    """
+    if _enabled:
+        return _Timer(name)
+    return _NULL_TIMER
+
+
+def snapshot():
+    """
+    Copy of the counters and of the cumulative times in seconds.
+
+    :return: dictionary with ``enabled``, ``counters`` and ``times_s``
+    """
+    with _lock:
+        return {"enabled": _enabled,
+                "counters": dict(sorted(_counters.items())),
+                "times_s": dict(sorted(_times_s.items()))}
+
+
+@contextlib.contextmanager
+def instrumented(reset_statistics=True):
+    """
+    Enable the instrumentation in a block, the dictionary returned is filled with the :py:func:`snapshot` at the exit.
+
+    :param bool reset_statistics: set the counters and timers to zero at the start of the block
+    """
+    was_enabled = _enabled
+    if reset_statistics:
+        reset()
+
+    statistics = {}
+    enable()
+    try:
+        yield statistics
+    finally:
+        statistics.update(snapshot())
+        if not was_enabled:
+            disable()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xray_mac.mac.models.interpolation
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Interpolation of the tabulated MAC models.
+
+The curve is stored as piecewise polynomials, the breakpoints and the coefficients of each segment are computed once
+when the interpolation is created. An evaluation finds the segments of all the abscissas with one ``searchsorted``, in
+any order, and evaluates the polynomials with the Horner scheme. The log-log kind uses straight lines in log-log space.
+
+An abscissa repeated in the table is an absorption edge: the curve takes the value below the edge on the left of the
+edge and the value above the edge at and on the right of the edge.
+"""
+
+###############################################################################
+# Copyright 2021 Hendrix Demers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###############################################################################
+
+# Standard library modules.
+import logging
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xray_mac.mac.models import instrumentation
+
+# Globals and constants variables.
+LINEAR = 'linear'
+NEAREST = 'nearest'
+ZERO = 'zero'
+SLINEAR = 'slinear'
+QUADRATIC = 'quadratic'
+CUBIC = 'cubic'
+LOG_LOG = 'log-log'
+
+SPLINE_DEGREES = {QUADRATIC: 2, CUBIC: 3}
+KINDS = [LINEAR, NEAREST, ZERO, SLINEAR, QUADRATIC, CUBIC, LOG_LOG]
+
+
+class Interpolation1D:
+    """
+    Interpolation of a tabulated curve, see the module documentation.
+
+    The spline kinds are the interpolating splines of :py:func:`scipy.interpolate.make_interp_spline`, the same as
+    :py:class:`scipy.interpolate.interp1d`, and do not accept repeated abscissas. A log-log segment with a value that is
+    not positive is interpolated linearly.
+    """
+    def __init__(self, x, y, kind=LINEAR, clamp=False, step_tolerance=0.0):
+        """
+        :param x: abscissas, sorted with a stable sort if needed
+        :param y: values, the first dimension is the abscissas
+        :param str kind: one of :py:data:`KINDS`
+        :param bool clamp: the values outside the table are the end values if True, a ValueError is raised otherwise
+        :param float step_tolerance: an abscissa closer than this relative distance to the previous one is moved on it,
+            so that an edge tabulated with two nearly equal energies is a step
+        """
+        if kind not in KINDS:
+            message = "Unknown interpolation kind: %s" % kind
+            logging.error(message)
+            raise ValueError(message)
+
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if x.ndim != 1 or len(x) < 2 or len(y) != len(x):
+            message = "Invalid interpolation table: %i abscissas and %i values" % (len(x), len(y))
+            logging.error(message)
+            raise ValueError(message)
+
+        indices = np.argsort(x, kind='stable')
+        x = x[indices]
+        y = y[indices]
+        if step_tolerance > 0.0:
+            x = x.copy()
+            for index in np.nonzero(np.diff(x) <= step_tolerance * np.abs(x[:-1]))[0]:
+                x[index + 1] = x[index]
+
+        self.kind = kind
+        self.clamp = clamp
+
+        self.x = x
+        self.y = y
+        self.minimum_x = x[0]
+        self.maximum_x = x[-1]
+        self.minimum_y = y[0]
+        self.maximum_y = y[-1]
+
+        if kind in SPLINE_DEGREES:
+            self.breakpoints, self.coefficients = self._compute_spline_coefficients(x, y, SPLINE_DEGREES[kind])
+            self.linear_coefficients = None
+        else:
+            self.breakpoints = x
+            self.coefficients, self.linear_coefficients = self._compute_coefficients(x, y, kind)
+
+        for array in [self.x, self.y, self.breakpoints, self.coefficients, self.linear_coefficients]:
+            if array is not None:
+                array.setflags(write=False)
+
+    @staticmethod
+    def _compute_coefficients(x, y, kind):
+        """
+        Coefficients of each segment, highest power first as :py:class:`scipy.interpolate.PPoly`.
+
+        The log-log coefficients are the slope in log-log space and the value at the start of the segment. A segment of
+        zero width, an edge, has the value above the edge.
+        """
+        extra_axes = (slice(None),) + (np.newaxis,) * (y.ndim - 1)
+        widths = np.diff(x)[extra_axes]
+        y0 = y[:-1]
+        y1 = y[1:]
+
+        if kind in (ZERO, NEAREST):
+            coefficients = np.where(widths > 0.0, y0, y1)[np.newaxis]
+            return coefficients, None
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slopes = np.where(widths > 0.0, (y1 - y0) / widths, 0.0)
+        linear_coefficients = np.stack([slopes, np.where(widths > 0.0, y0, y1)])
+
+        if kind != LOG_LOG:
+            return linear_coefficients, None
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_widths = np.diff(np.log(x))[extra_axes]
+            log_slopes = np.where(widths > 0.0, np.log(y1 / y0) / log_widths, 0.0)
+        coefficients = np.stack([log_slopes, np.where(widths > 0.0, y0, y1)])
+
+        positives = (y0 > 0.0) & (y1 > 0.0)
+        coefficients[:, ~positives] = np.nan
+        linear_coefficients[:, positives] = np.nan
+
+        return coefficients, linear_coefficients
+
+    @staticmethod
+    def _compute_spline_coefficients(x, y, degree):
+        from scipy.interpolate import make_interp_spline, PPoly
+
+        if np.any(np.diff(x) <= 0.0):
+            message = "Repeated abscissas are not allowed with a spline interpolation"
+            logging.error(message)
+            raise ValueError(message)
+
+        columns = y.reshape(len(y), -1)
+        polynomials = [PPoly.from_spline(make_interp_spline(x, column, k=degree)) for column in columns.T]
+
+        segments = np.diff(polynomials[0].x) > 0.0
+        breakpoints = np.append(polynomials[0].x[:-1][segments], polynomials[0].x[-1])
+        coefficients = np.stack([polynomial.c[:, segments] for polynomial in polynomials], axis=-1)
+
+        return breakpoints, coefficients.reshape(coefficients.shape[:2] + y.shape[1:])
+
+    def __call__(self, x_new):
+        """
+        Evaluate the interpolation.
+
+        :param x_new: abscissa or abscissas, in any order
+        :return: values, shape of x_new followed by the extra dimensions of y
+        :raise ValueError: if an abscissa is outside the table and the interpolation is not clamped
+        """
+        x_new = np.asarray(x_new, dtype=float)
+        instrumentation.record_evaluation("interpolation", x_new.size)
+
+        with instrumentation.timer("interpolation"):
+            return self._interpolate(x_new)
+
+    def _interpolate(self, x_new):
+        if self.clamp:
+            x_new = np.clip(x_new, self.minimum_x, self.maximum_x)
+        elif np.any(x_new < self.minimum_x) or np.any(x_new > self.maximum_x):
+            message = "A value in x_new is outside the interpolation range [%g, %g]" % (self.minimum_x, self.maximum_x)
+            logging.error(message)
+            raise ValueError(message)
+
+        indices = np.clip(np.searchsorted(self.breakpoints, x_new, side='right') - 1, 0, len(self.breakpoints) - 2)
+        x0 = self.breakpoints[indices]
+
+        extra_axes = (Ellipsis,) + (np.newaxis,) * (self.y.ndim - 1)
+
+        if self.kind == NEAREST:
+            x1 = self.breakpoints[indices + 1]
+            values = self.y[indices + (x_new - x0 > x1 - x_new)]
+        elif self.kind == LOG_LOG:
+            with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                values = self.coefficients[1, indices] * np.exp(self.coefficients[0, indices] *
+                                                                np.log(x_new / x0)[extra_axes])
+            linear_values = self._evaluate(self.linear_coefficients, indices, (x_new - x0)[extra_axes])
+            values = np.where(np.isnan(values), linear_values, values)
+        else:
+            values = self._evaluate(self.coefficients, indices, (x_new - x0)[extra_axes])
+
+        return np.where((x_new >= self.maximum_x)[extra_axes], self.maximum_y, values)
+
+    @staticmethod
+    def _evaluate(coefficients, indices, t):
+        values = coefficients[0, indices]
+        for coefficient in coefficients[1:]:
+            values = values * t + coefficient[indices]
+        return values
@@ -6,6 +6,14 @@
 .. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
 
 Container of ionization energy for each atomic number and subshell.
+
+The edge energies of a file are read once per process into a read-only :py:class:`EdgeTable`, a dense
+(atomic number, subshell) array with the columns in the order of :py:data:`SUBSHELLS`. The queries accept arrays of
+atomic numbers and energies.
+
+The tables are kept in a thread-safe registry, see :py:func:`get_edge_table`, and hold only NumPy arrays, so the
+pages of a table loaded before forking workers stay shared. Call :py:func:`preload` to load the default tables at
+start-up.
 """
 
 ###############################################################################
@@ -26,8 +34,12 @@ Container of ionization energy for each atomic number and subshell.
 
 # Standard library modules.
 import csv
+import logging
+import threading
+from types import MappingProxyType
 
 # Third party modules.
+import numpy as np
 
 # Local modules.
 
@@ -88,89 +100,288 @@ CONVERT_SUBSHELLS = {
 }
 
 
-class IonizationEnergies:
-    def __init__(self):
-        self.edge_energies_eV = None
+SUBSHELL_INDICES = {subshell: SUBSHELLS.index(converted_subshell)
+                    for subshell, converted_subshell in CONVERT_SUBSHELLS.items()}
 
-    def read_edge_data(self, file_path=None):
-        if file_path is None:
-            file_path = get_current_module_path(__file__, "../../../data/chantler2005/FFastEdgeDB.csv")
-
-        input_file = csv.reader(open(file_path))
-
-        self.edge_energies_eV = {}
-        atomic_number = 0
-        for items in input_file:
-            atomic_number += 1
-            edge_energies_eV = [float(item) for item in items]
-            self.edge_energies_eV[atomic_number] = {}
-            for subshell, edge_energy_eV in zip(SUBSHELLS, edge_energies_eV):
-                subshell = CONVERT_SUBSHELLS[subshell]
-                self.edge_energies_eV[atomic_number][subshell] = edge_energy_eV
-
-    def ionization_energy_eV(self, atomic_number, subshell):
-        if self.edge_energies_eV is None:
-            self.read_edge_data()
+_edge_tables = {}
+_edge_tables_lock = threading.Lock()
 
-        subshell = CONVERT_SUBSHELLS[subshell]
 
-        return self.edge_energies_eV[atomic_number][subshell]
+def read_ffast_edge_energies(file_path):
+    """
+    Edge energies of the FFast file, one row of :py:data:`SUBSHELLS` energies per atomic number.
+    """
+    edge_energies_eV = {}  # noqa
+    with open(file_path, newline='') as input_file:
+        for atomic_number, items in enumerate(csv.reader(input_file), start=1):
+            edge_energies_eV[atomic_number] = {CONVERT_SUBSHELLS[subshell]: float(item)
+                                               for subshell, item in zip(SUBSHELLS, items)}
 
+    return edge_energies_eV
 
-class IonizationEnergiesDtsa:
-    def __init__(self):
-        self.edge_energies_eV = None
 
-    def read_edge_data(self, file_path=None):
-        if file_path is None:
-            file_path = get_current_module_path(__file__, "../../../data/dtsa/XrayDataEdge.csv")
+def read_dtsa_edge_energies(file_path):
+    """
+    Edge energies of the DTSA file, one row per atomic number and edge, the first row of an edge is used.
+    """
+    edge_energies_eV = {}  # noqa
+    with open(file_path, newline='') as input_file:
+        reader = csv.reader(input_file)
 
-        input_file = csv.reader(open(file_path))
+        # Skip the header.
+        next(reader)
 
-        # Extract header
-        row = next(input_file)
+        for row in reader:
+            try:
+                atomic_number = int(row[0])
+                edge_energy_eV = float(row[1])  # noqa
+                subshell = CONVERT_SUBSHELLS[row[2].replace('edge', '')]
+            except (ValueError, KeyError, IndexError):
+                logging.warning("Invalid edge row in %s: %s", file_path, row)
+                continue
+
+            edge_energies_eV.setdefault(atomic_number, {}).setdefault(subshell, edge_energy_eV)
+
+    return edge_energies_eV
+
+
+class EdgeTable:
+    """
+    Read-only edge energies of all the atomic numbers and subshells.
+
+    :py:attr:`energies_eV` has one row per atomic number and one column per subshell of :py:data:`SUBSHELLS`, 0.0
+    where the subshell has no edge. :py:attr:`sorted_energies_eV` has the edges of each row sorted in increasing
+    order, followed by infinity.
+    """
+    def __init__(self, edge_energies_eV):  # noqa
+        """
+        :param dict edge_energies_eV: edge energy of each subshell name for each atomic number
+        """
+        size = max(edge_energies_eV, default=0) + 1
+        energies_eV = np.zeros((size, len(SUBSHELLS)))  # noqa
+        defined = np.zeros((size, len(SUBSHELLS)), dtype=bool)
+        for atomic_number, subshell_energies_eV in edge_energies_eV.items():  # noqa
+            for subshell, energy_eV in subshell_energies_eV.items():  # noqa
+                energies_eV[atomic_number, SUBSHELL_INDICES[subshell]] = energy_eV
+                defined[atomic_number, SUBSHELL_INDICES[subshell]] = True
+
+        present = np.zeros(size, dtype=bool)
+        present[list(edge_energies_eV)] = True
+
+        sorted_energies_eV = np.sort(np.where(energies_eV > 0.0, energies_eV, np.inf), axis=1)  # noqa
+
+        self.energies_eV = energies_eV  # noqa
+        self.defined = defined
+        self.present = present
+        self.sorted_energies_eV = sorted_energies_eV  # noqa
+        self.number_edges = np.sum(np.isfinite(sorted_energies_eV), axis=1)
+        for array in [self.energies_eV, self.defined, self.present, self.sorted_energies_eV, self.number_edges]:
+            array.setflags(write=False)
+
+        self._edge_energies_eV = None
+
+    @property
+    def edge_energies_eV(self):  # noqa
+        """
+        Read-only mapping of the edge energy of each subshell name for each atomic number, built on first use.
+        """
+        if self._edge_energies_eV is None:
+            edge_energies_eV = {}  # noqa
+            for atomic_number in np.flatnonzero(self.present).tolist():
+                columns = np.flatnonzero(self.defined[atomic_number]).tolist()
+                edge_energies_eV[atomic_number] = MappingProxyType({SUBSHELLS[column]:
+                                                                    self.energies_eV.item(atomic_number, column)
+                                                                    for column in columns})
+            self._edge_energies_eV = MappingProxyType(edge_energies_eV)
+
+        return self._edge_energies_eV
+
+    def __contains__(self, atomic_number):
+        return 0 <= atomic_number < len(self.present) and self.present.item(atomic_number)
+
+    def edge_energy_eV(self, atomic_number, column):  # noqa
+        """
+        Edge energy of one atomic number, None if the atomic number is not in the table.
+        """
+        if 0 <= atomic_number < len(self.present) and self.present.item(atomic_number):
+            return self.energies_eV.item(atomic_number, column)
+        return None
+
+    def contains(self, atomic_numbers):
+        atomic_numbers = np.asarray(atomic_numbers, dtype=int)
+        inside = (atomic_numbers >= 0) & (atomic_numbers < len(self.present))
+        return inside & self.present[np.where(inside, atomic_numbers, 0)]
+
+
+def get_edge_table(file_path, read_edge_energies):
+    """
+    Edge table of a file, read once per process.
+
+    The registry is thread-safe: the lock is only taken while a table is not loaded yet, and the table is read once
+    even if several threads ask for it at the same time.
+
+    :param file_path: edge file
+    :param read_edge_energies: function returning the edge energies of the file, see :py:func:`read_ffast_edge_energies`
+    """
+    key = (read_edge_energies.__name__, str(file_path))
+
+    edge_table = _edge_tables.get(key)
+    if edge_table is None:
+        with _edge_tables_lock:
+            edge_table = _edge_tables.get(key)
+            if edge_table is None:
+                edge_table = EdgeTable(read_edge_energies(file_path))
+                _edge_tables[key] = edge_table
+
+    return edge_table
+
+
+def preload():
+    """
+    Load the default FFast and DTSA edge tables, for example before starting threads or forking workers.
+
+    :return: the FFast and DTSA edge tables
+    """
+    return IonizationEnergies().get_edge_table(), IonizationEnergiesDtsa().get_edge_table()
 
-        keys = []
-        for value in row:
-            if value[0] == '#':
-                value = value[1:]
 
-            value = value.strip()
-            value = value.replace(' ', '_')
-            value = value.replace('(', '')
-            value = value.replace(')', '')
+class IonizationEnergies:
+    """
+    Edge energies of the FFast database.
 
-            keys.append(value)
+    The ionization energy of an atomic number missing in the data raises a KeyError.
+    """
+    missing_energy_eV = None
 
-        self.edge_energies_eV = {}
+    def __init__(self):
+        self.edge_table = None
 
-        for row in input_file:
-            try:
-                atomic_number = int(row[0])
-                edge_energies_eV = float(row[1])
-                subshell = row[2]
+    @property
+    def edge_energies_eV(self):  # noqa
+        """
+        Edge energy of each subshell name for each atomic number, None before the data is read.
+        """
+        if self.edge_table is None:
+            return None
+        return self.edge_table.edge_energies_eV
 
-                subshell = subshell.replace('edge', '')
-                subshell = CONVERT_SUBSHELLS[subshell]
+    @staticmethod
+    def get_default_file_path():
+        return get_current_module_path(__file__, "../../../data/chantler2005/FFastEdgeDB.csv")
 
-                if len(subshell) > 4:
-                    print(atomic_number, subshell)
+    read_edge_energies = staticmethod(read_ffast_edge_energies)
 
-                self.edge_energies_eV.setdefault(atomic_number, {})
+    def read_edge_data(self, file_path=None):
+        if file_path is None:
+            file_path = self.get_default_file_path()
 
-                self.edge_energies_eV[atomic_number].setdefault(subshell, edge_energies_eV)
-            except ValueError:
-                print(row)
+        self.edge_table = get_edge_table(file_path, self.read_edge_energies)
 
-    def ionization_energy_eV(self, atomic_number, subshell):
-        if self.edge_energies_eV is None:
+    def get_edge_table(self):
+        if self.edge_table is None:
             self.read_edge_data()
-
-        subshell = CONVERT_SUBSHELLS[subshell]
-
-        energy_eV = 0.0
-        if atomic_number in self.edge_energies_eV:
-            if subshell in self.edge_energies_eV[atomic_number]:
-                energy_eV = self.edge_energies_eV[atomic_number][subshell]
-
-        return energy_eV
+        return self.edge_table
+
+    def ionization_energy_eV(self, atomic_number, subshell):  # noqa
+        """
+        Ionization energy of a subshell, 0.0 if the subshell has no edge.
+
+        :param atomic_number: atomic number or array of atomic numbers
+        :param str subshell: subshell name, any name of :py:data:`CONVERT_SUBSHELLS`
+        :return: energy in eV, a float for a scalar atomic number
+        """
+        edge_table = self.edge_table if self.edge_table is not None else self.get_edge_table()
+        column = SUBSHELL_INDICES[subshell]
+
+        if isinstance(atomic_number, (int, np.integer)) or np.ndim(atomic_number) == 0:
+            energy_eV = edge_table.edge_energy_eV(int(atomic_number), column)  # noqa
+            if energy_eV is None:
+                energy_eV = self._get_missing_energy_eV(atomic_number)
+            return energy_eV
+
+        atomic_numbers = np.asarray(atomic_number, dtype=int)
+        present = edge_table.contains(atomic_numbers)
+        if not np.all(present):
+            self._get_missing_energy_eV(int(atomic_numbers[~present].flat[0]))
+
+        return np.where(present, edge_table.energies_eV[np.where(present, atomic_numbers, 0), column],
+                        self.missing_energy_eV if self.missing_energy_eV is not None else 0.0)
+
+    def next_edge_above_eV(self, atomic_numbers, energies_eV):  # noqa
+        """
+        Lowest edge energy above each energy, infinity if there is none.
+        """
+        return self._find_edges(atomic_numbers, energies_eV, above=True)
+
+    def next_edge_below_eV(self, atomic_numbers, energies_eV):  # noqa
+        """
+        Highest edge energy at or below each energy, 0.0 if there is none.
+        """
+        return self._find_edges(atomic_numbers, energies_eV, above=False)
+
+    def region_index(self, atomic_numbers, energies_eV):  # noqa
+        """
+        Number of edges at or below each energy, the index of the interval between the sorted edges of the element.
+
+        :return: integer array with the broadcast shape of the inputs, an int for scalar inputs
+        """
+        energies_eV, rows = self._broadcast(atomic_numbers, energies_eV)  # noqa
+        sorted_energies_eV = self.get_edge_table().sorted_energies_eV  # noqa
+
+        indices = np.zeros(energies_eV.shape, dtype=int)
+        for row in np.unique(rows):
+            mask = rows == row
+            indices[mask] = np.searchsorted(sorted_energies_eV[row], energies_eV[mask], side='right')
+
+        if indices.ndim == 0:
+            return int(indices)
+        return indices
+
+    def _find_edges(self, atomic_numbers, energies_eV, above):  # noqa
+        indices = np.asarray(self.region_index(atomic_numbers, energies_eV))
+        _energies_eV, rows = self._broadcast(atomic_numbers, energies_eV)  # noqa
+        sorted_energies_eV = self.get_edge_table().sorted_energies_eV  # noqa
+
+        if above:
+            edges_eV = sorted_energies_eV[rows, np.minimum(indices, len(SUBSHELLS) - 1)]  # noqa
+            edges_eV = np.where(indices < len(SUBSHELLS), edges_eV, np.inf)
+        else:
+            edges_eV = np.where(indices > 0, sorted_energies_eV[rows, np.maximum(indices - 1, 0)], 0.0)  # noqa
+
+        if edges_eV.ndim == 0:
+            return float(edges_eV)
+        return edges_eV
+
+    def _broadcast(self, atomic_numbers, energies_eV):  # noqa
+        """
+        Broadcast energies and table rows of the atomic numbers, the row 0 without edges for a missing atomic number.
+        """
+        energies_eV, atomic_numbers = np.broadcast_arrays(np.asarray(energies_eV, dtype=float),  # noqa
+                                                          np.asarray(atomic_numbers, dtype=int))
+
+        present = self.get_edge_table().contains(atomic_numbers)
+        if not np.all(present):
+            self._get_missing_energy_eV(int(atomic_numbers[~present].flat[0]))
+
+        return energies_eV, np.where(present, atomic_numbers, 0)
+
+    def _get_missing_energy_eV(self, atomic_number):  # noqa
+        if self.missing_energy_eV is None:
+            logging.error("No edge energies for atomic number %i", atomic_number)
+            raise KeyError(atomic_number)
+        return self.missing_energy_eV
+
+
+class IonizationEnergiesDtsa(IonizationEnergies):
+    """
+    Edge energies of DTSA.
+
+    The ionization energy of an atomic number or a subshell missing in the data is 0.0.
+    """
+    missing_energy_eV = 0.0
+
+    @staticmethod
+    def get_default_file_path():
+        return get_current_module_path(__file__, "../../../data/dtsa/XrayDataEdge.csv")
+
+    read_edge_energies = staticmethod(read_dtsa_edge_energies)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xray_mac.mac.models.line_mac_matrix
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Precomputed MAC of the x-ray lines in the absorbers.
+
+The MAC of every line of the line table, see :py:mod:`xray_mac.mac.models.xray_lines`, is computed once with a model
+for the absorbers 1 to 99 and saved as a ``.npy`` file of records, one per line, with the atomic number of the
+emitter, the line name, its energy and fraction, and a float32 row of the MACs in cm2/g of the absorbers. A MAC the
+model cannot compute is NaN. The file is memory-mapped, a lookup is an array index instead of a model evaluation.
+"""
+
+###############################################################################
+# Copyright 2021 Hendrix Demers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###############################################################################
+
+# Standard library modules.
+import functools
+import logging
+import os.path
+import warnings
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xray_mac.mac import get_current_module_path, create_root_path
+from xray_mac.mac.models.xray_lines import get_xray_lines, XrayLines
+from xray_mac.mac.models.registry import get_engine, MODEL_HEINRICH1987, MODEL_HEINRICH_DTSA, MODEL_HENKE1993, \
+    MODEL_CHANTLER2005, MODEL_CASINO
+
+# Globals and constants variables.
+MODELS = [MODEL_HEINRICH1987, MODEL_HEINRICH_DTSA, MODEL_HENKE1993, MODEL_CHANTLER2005, MODEL_CASINO]
+
+MINIMUM_ABSORBER = 1
+MAXIMUM_ABSORBER = 99
+NUMBER_ABSORBERS = MAXIMUM_ABSORBER - MINIMUM_ABSORBER + 1
+
+LINE_DTYPE = np.dtype([('atomic_number', '<i4'), ('line', 'U16'), ('energy_eV', '<f8'), ('fraction', '<f8'),
+                       ('macs_cm2_g', '<f4', (NUMBER_ABSORBERS,))])
+
+_line_mac_matrices = {}
+
+
+def get_default_file_path(model_name):
+    return get_current_module_path(__file__, "../../../data/line_mac_matrix/%s.npy" % model_name)
+
+
+def get_default_mac_models():
+    """
+    Factory of each model of :py:data:`MODELS`, the models of the registry without the validity warnings.
+    """
+    from xray_mac.mac.models.heinrich1987 import WARNING_MODE_NONE
+
+    mac_models = {model_name: functools.partial(get_engine, model_name) for model_name in MODELS}
+    mac_models[MODEL_HEINRICH1987] = functools.partial(get_engine, MODEL_HEINRICH1987, warning_mode=WARNING_MODE_NONE)
+
+    return mac_models
+
+
+def compute_line_macs_cm2_g(mac_model, xray_lines):
+    """
+    MAC of each line in each absorber, NaN if the model cannot compute it.
+
+    :param mac_model: MAC model with a ``compute_mac_cm2_g(energies_eV, atomic_numbers)`` method
+    :param xray_lines: line table
+    :return: float32 array, one row per line and one column per absorber
+    """
+    macs_cm2_g = np.full((len(xray_lines), NUMBER_ABSORBERS), np.nan, dtype=np.float32)
+
+    for column, atomic_number in enumerate(range(MINIMUM_ABSORBER, MAXIMUM_ABSORBER + 1)):
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                column_macs_cm2_g = np.asarray(mac_model.compute_mac_cm2_g(xray_lines.energies_eV, atomic_number),
+                                               dtype=float)
+        except (KeyError, IndexError, ValueError, OSError) as status:
+            logging.debug("No MAC for absorber %i: %s", atomic_number, status)
+            continue
+
+        macs_cm2_g[:, column] = np.where(column_macs_cm2_g > 0.0, column_macs_cm2_g, np.nan)
+
+    return macs_cm2_g
+
+
+def build_line_mac_matrix(file_path, mac_model, xray_lines=None):
+    """
+    Write the matrix file of a model.
+
+    :param file_path: matrix file
+    :param mac_model: MAC model with a ``compute_mac_cm2_g(energies_eV, atomic_numbers)`` method
+    :param xray_lines: line table, :py:func:`get_xray_lines` if None
+    :return: number of lines written
+    """
+    if xray_lines is None:
+        xray_lines = get_xray_lines()
+
+    lines = np.zeros(len(xray_lines), dtype=LINE_DTYPE)
+    lines['atomic_number'] = xray_lines.atomic_numbers
+    lines['line'] = xray_lines.names
+    lines['energy_eV'] = xray_lines.energies_eV
+    lines['fraction'] = xray_lines.fractions
+    lines['macs_cm2_g'] = compute_line_macs_cm2_g(mac_model, xray_lines)
+
+    np.save(file_path, lines, allow_pickle=False)
+
+    return len(lines)
+
+
+def build_line_mac_matrices(model_names=None, mac_models=None):
+    """
+    Write the default matrix file of models.
+
+    :param model_names: models to build, all the models of ``mac_models`` if None
+    :param dict mac_models: factory of each model, :py:func:`get_default_mac_models` if None
+    """
+    if mac_models is None:
+        mac_models = get_default_mac_models()
+    if model_names is None:
+        model_names = list(mac_models)
+
+    for model_name in model_names:
+        file_path = get_default_file_path(model_name)
+        create_root_path(os.path.dirname(file_path))
+
+        number_lines = build_line_mac_matrix(file_path, mac_models[model_name]())
+        logging.info("%s: %i lines written in %s", model_name, number_lines, file_path)
+
+
+class LineMacMatrix:
+    """
+    Memory-mapped matrix file created by :py:func:`build_line_mac_matrix`.
+
+    The overrides, for example the measured MACs of :py:class:`xray_mac.mac.models.pouchou1991.MacPouchou1991`, replace
+    the MAC of a line in an absorber. They are kept apart from the read-only file.
+    """
+    def __init__(self, file_path, overrides=None):
+        """
+        :param file_path: matrix file
+        :param overrides: table with the ``compute_macs_cm2_g`` method of
+            :py:class:`xray_mac.mac.models.pouchou1991.MacPouchou1991`, no override if None
+        """
+        self.file_path = file_path
+
+        self._lines = np.load(file_path, mmap_mode='r', allow_pickle=False)
+        if self._lines.dtype != LINE_DTYPE:
+            message = "Not a line MAC matrix file: %s" % file_path
+            logging.error(message)
+            raise ValueError(message)
+
+        self.macs_cm2_g = self._lines['macs_cm2_g']
+        self.xray_lines = XrayLines(list(zip(self._lines['atomic_number'].tolist(), self._lines['energy_eV'].tolist(),
+                                             self._lines['fraction'].tolist(), self._lines['line'].tolist())))
+
+        self.override_indices = np.zeros(0, dtype=int)
+        self.override_macs_cm2_g = np.zeros(0)
+        if overrides is not None:
+            self.set_overrides(overrides)
+
+    def __len__(self):
+        return len(self._lines)
+
+    def set_overrides(self, overrides):
+        """
+        Replace the MACs available in the overrides model, see :py:meth:`__init__`.
+        """
+        absorbers = np.arange(MINIMUM_ABSORBER, MAXIMUM_ABSORBER + 1)
+        override_macs_cm2_g = overrides.compute_macs_cm2_g(absorbers, self.xray_lines.atomic_numbers[:, np.newaxis],
+                                                           self.xray_lines.names[:, np.newaxis]).ravel()
+
+        self.override_indices = np.flatnonzero(~np.isnan(override_macs_cm2_g))
+        self.override_macs_cm2_g = override_macs_cm2_g[self.override_indices]
+
+    def mac_cm2_g(self, emitter_atomic_numbers, lines, absorber_atomic_numbers):
+        """
+        MAC of x-ray lines in absorbers, the fraction weighted mean of the MAC of its lines for a family.
+
+        :param emitter_atomic_numbers: atomic number or numbers of the emitter
+        :param lines: line name or names, for example "Ka1" or the family "Ka"
+        :param absorber_atomic_numbers: atomic number or numbers of the absorber, from 1 to 99
+        :return: MAC in cm2/g with the broadcast shape of the inputs, a float for scalar inputs
+        :raise KeyError: if a line is not in the matrix
+        :raise ValueError: if an absorber is not in the matrix
+        """
+        emitter_atomic_numbers, lines, absorber_atomic_numbers = np.broadcast_arrays(
+            np.asarray(emitter_atomic_numbers, dtype=int), np.asarray(lines),
+            np.asarray(absorber_atomic_numbers, dtype=int))
+
+        if np.any(absorber_atomic_numbers < MINIMUM_ABSORBER) or np.any(absorber_atomic_numbers > MAXIMUM_ABSORBER):
+            message = "Absorber atomic numbers must be from %i to %i" % (MINIMUM_ABSORBER, MAXIMUM_ABSORBER)
+            logging.error(message)
+            raise ValueError(message)
+
+        rows, weights = self.xray_lines.resolve_rows(emitter_atomic_numbers, lines)
+        columns = np.broadcast_to((absorber_atomic_numbers - MINIMUM_ABSORBER)[..., np.newaxis], rows.shape)
+
+        macs_cm2_g = self.macs_cm2_g[rows, columns].astype(float)
+
+        if len(self.override_indices) > 0:
+            indices = rows * NUMBER_ABSORBERS + columns
+            positions = np.minimum(np.searchsorted(self.override_indices, indices), len(self.override_indices) - 1)
+            overridden = self.override_indices[positions] == indices
+            macs_cm2_g[overridden] = self.override_macs_cm2_g[positions[overridden]]
+
+        macs_cm2_g = np.sum(macs_cm2_g * weights, axis=-1)
+
+        if macs_cm2_g.ndim == 0:
+            return float(macs_cm2_g)
+        return macs_cm2_g
+
+
+def get_line_mac_matrix(model_name, file_path=None, pouchou1991=False):
+    """
+    Matrix of a model, opened once per process.
+
+    :param str model_name: one of :py:data:`MODELS`
+    :param file_path: matrix file, :py:func:`get_default_file_path` if None
+    :param bool pouchou1991: apply the MACs of :py:class:`xray_mac.mac.models.pouchou1991.MacPouchou1991` if True
+    """
+    if file_path is None:
+        file_path = get_default_file_path(model_name)
+
+    key = (str(file_path), pouchou1991)
+    if key not in _line_mac_matrices:
+        overrides = None
+        if pouchou1991:
+            from xray_mac.mac.models.pouchou1991 import MacPouchou1991
+            overrides = MacPouchou1991()
+
+        _line_mac_matrices[key] = LineMacMatrix(file_path, overrides)
+
+    return _line_mac_matrices[key]
@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xray_mac.mac.models.mac_database
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Indexed binary database of the tabulated MAC models.
+
+The file starts with a header (magic string, number of entries and number of sources), followed by the index, one
+record per (model, atomic number) with the offset and the number of points of its data, by the sources, one record per
+model with the size and modification time of its source files, and by the data. The data of each entry is a contiguous
+float64 segment of energies in eV followed by a float64 segment of MACs in cm2/g. The file is memory-mapped, the arrays
+returned are read-only views of the file.
+
+The tabulated models read their data from the default database file when it exists and their source files are the
+ones recorded in the file, see :py:func:`read_database_data`, and parse their source files otherwise.
+"""
+
+###############################################################################
+# Copyright 2021 Hendrix Demers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###############################################################################
+
+# Standard library modules.
+import logging
+import os.path
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xray_mac.mac import get_current_module_path
+from xray_mac.mac.models import instrumentation
+
+# Globals and constants variables.
+MODEL_CHANTLER2005 = "Chantler2005"
+MODEL_HENKE1993 = "Henke1993"
+MODEL_HENKE_WINXRAY = "HenkeWinxray"
+
+MAGIC = b"XRAYMAC2"
+HEADER_DTYPE = np.dtype([('magic', 'S8'), ('number_entries', '<i8'), ('number_sources', '<i8')])
+INDEX_DTYPE = np.dtype([('model', 'S24'), ('atomic_number', '<i4'), ('offset', '<i8'), ('length', '<i8')])
+SOURCE_DTYPE = np.dtype([('model', 'S24'), ('size', '<i8'), ('mtime_ns', '<i8')])
+DATA_DTYPE = np.dtype('<f8')
+
+DATA_PATHS = {MODEL_CHANTLER2005: "../../../data/chantler2005/FFastMAC.csv",
+              MODEL_HENKE1993: "../../../data/henke1993/data",
+              MODEL_HENKE_WINXRAY: "../../../data/henke1993/winxray"}
+
+_mac_databases = {}
+
+
+def get_default_file_path():
+    return get_current_module_path(__file__, "../../../data/mac_database.bin")
+
+
+def get_default_data_path(model):
+    """
+    Data file or directory of a model used to build the default database.
+    """
+    return get_current_module_path(__file__, DATA_PATHS[model])
+
+
+def get_source_stamp(source_path):
+    """
+    Total size in bytes and latest modification time in ns of a source file or of the files of a source directory.
+    """
+    if os.path.isfile(source_path):
+        file_paths = [source_path]
+    else:
+        file_paths = [os.path.join(directory, filename)
+                      for directory, _directories, filenames in os.walk(source_path) for filename in filenames]
+
+    size = 0
+    mtime_ns = 0
+    for file_path in file_paths:
+        status = os.stat(file_path)
+        size += status.st_size
+        mtime_ns = max(mtime_ns, status.st_mtime_ns)
+
+    return size, mtime_ns
+
+
+def get_default_readers():
+    """
+    Readers of the tabulated models, each returns the energies in eV and MACs in cm2/g of an atomic number.
+    """
+    from xray_mac.mac.models.chantler2005 import get_mac_table, ENERGIES_eV, MAC_cm2_g
+    from xray_mac.mac.models.henke import MacHenke
+    from xray_mac.mac.models.henke_winxray import MacHenkeWinxray
+
+    def read_chantler2005(atomic_number):
+        data = get_mac_table()[atomic_number]
+        return data[ENERGIES_eV], data[MAC_cm2_g]
+
+    henke = MacHenke(get_default_data_path(MODEL_HENKE1993))
+    henke_winxray = MacHenkeWinxray(get_default_data_path(MODEL_HENKE_WINXRAY))
+
+    readers = {MODEL_CHANTLER2005: read_chantler2005,
+               MODEL_HENKE1993: henke.read_data,
+               MODEL_HENKE_WINXRAY: henke_winxray.read_data}
+
+    return readers
+
+
+def build_mac_database(file_path=None, readers=None, atomic_numbers=range(1, 100), source_paths=None):
+    """
+    Write the database file from the tabulated models.
+
+    An element missing in a model is skipped.
+
+    :param file_path: database file, :py:func:`get_default_file_path` if None
+    :param dict readers: function for each model name returning the energies in eV and MACs in cm2/g of an atomic
+        number, :py:func:`get_default_readers` if None
+    :param atomic_numbers: atomic numbers to include
+    :param dict source_paths: source file or directory of the models whose stamp is recorded, see
+        :py:func:`get_source_stamp`, :py:func:`get_default_data_path` of each model if None and readers is None
+    :return: number of entries written
+    """
+    if file_path is None:
+        file_path = get_default_file_path()
+    if readers is None:
+        readers = get_default_readers()
+        if source_paths is None:
+            source_paths = {model: get_default_data_path(model) for model in readers}
+    if source_paths is None:
+        source_paths = {}
+
+    entries = []
+    for model, reader in readers.items():
+        for atomic_number in atomic_numbers:
+            try:
+                energies_eV, macs_cm2_g = reader(atomic_number)  # noqa
+            except (KeyError, IndexError, OSError) as status:
+                logging.debug("No data for %s and %i: %s", model, atomic_number, status)
+                continue
+
+            energies_eV = np.asarray(energies_eV, dtype=DATA_DTYPE)  # noqa
+            macs_cm2_g = np.asarray(macs_cm2_g, dtype=DATA_DTYPE)
+            if len(energies_eV) == 0 or len(energies_eV) != len(macs_cm2_g):
+                logging.debug("No data for %s and %i", model, atomic_number)
+                continue
+
+            entries.append((model, atomic_number, energies_eV, macs_cm2_g))
+
+    sources = np.zeros(len(source_paths), dtype=SOURCE_DTYPE)
+    for record, (model, source_path) in zip(sources, source_paths.items()):
+        record['model'] = model.encode('ascii')
+        record['size'], record['mtime_ns'] = get_source_stamp(source_path)
+
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header['magic'] = MAGIC
+    header['number_entries'] = len(entries)
+    header['number_sources'] = len(sources)
+
+    index = np.zeros(len(entries), dtype=INDEX_DTYPE)
+    offset = HEADER_DTYPE.itemsize + index.nbytes + sources.nbytes
+    offset += -offset % DATA_DTYPE.itemsize
+    data_offset = offset
+    for record, (model, atomic_number, energies_eV, macs_cm2_g) in zip(index, entries):  # noqa
+        record['model'] = model.encode('ascii')
+        record['atomic_number'] = atomic_number
+        record['offset'] = offset
+        record['length'] = len(energies_eV)
+        offset += 2 * energies_eV.nbytes
+
+    with open(file_path, 'wb') as output_file:
+        output_file.write(header.tobytes())
+        output_file.write(index.tobytes())
+        output_file.write(sources.tobytes())
+        output_file.write(b'\0' * (data_offset - HEADER_DTYPE.itemsize - index.nbytes - sources.nbytes))
+        for _model, _atomic_number, energies_eV, macs_cm2_g in entries:
+            output_file.write(energies_eV.tobytes())
+            output_file.write(macs_cm2_g.tobytes())
+
+    return len(entries)
+
+
+class MacDatabase:
+    """
+    Memory-mapped database file created by :py:func:`build_mac_database`.
+    """
+    def __init__(self, file_path=None):
+        if file_path is None:
+            file_path = get_default_file_path()
+        self.file_path = file_path
+
+        self._buffer = np.memmap(file_path, dtype=np.uint8, mode='r')
+
+        header = np.frombuffer(self._buffer, dtype=HEADER_DTYPE, count=1)[0]
+        if header['magic'] != MAGIC:
+            message = "Not a MAC database file: %s" % file_path
+            logging.error(message)
+            raise ValueError(message)
+
+        index = np.frombuffer(self._buffer, dtype=INDEX_DTYPE, count=int(header['number_entries']),
+                              offset=HEADER_DTYPE.itemsize)
+
+        self._index = {}
+        for record in index:
+            key = (record['model'].decode('ascii'), int(record['atomic_number']))
+            self._index[key] = (int(record['offset']), int(record['length']))
+
+        sources = np.frombuffer(self._buffer, dtype=SOURCE_DTYPE, count=int(header['number_sources']),
+                                offset=HEADER_DTYPE.itemsize + index.nbytes)
+
+        self._sources = {}
+        for record in sources:
+            self._sources[record['model'].decode('ascii')] = (int(record['size']), int(record['mtime_ns']))
+        self._current_sources = {}
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def models(self):
+        return sorted(set(model for model, _atomic_number in self._index))
+
+    def atomic_numbers(self, model):
+        return sorted(atomic_number for temp_model, atomic_number in self._index if temp_model == model)
+
+    def is_source_current(self, model, source_path):
+        """
+        Whether the source files of a model have the stamp recorded in the file, checked once per source path.
+
+        A model without a recorded stamp is never current.
+        """
+        key = (model, str(source_path))
+        if key not in self._current_sources:
+            current = model in self._sources and self._sources[model] == get_source_stamp(source_path)
+            if not current:
+                logging.warning("The MAC database %s is out of date for %s, the source files are used: %s",
+                                self.file_path, model, source_path)
+            self._current_sources[key] = current
+
+        return self._current_sources[key]
+
+    def read_data(self, model, atomic_number):
+        """
+        Energies in eV and MACs in cm2/g of a model and atomic number, as read-only views of the file.
+
+        :raise KeyError: if the model or atomic number is not in the database
+        """
+        offset, length = self._index[(model, atomic_number)]
+
+        energies_eV = np.frombuffer(self._buffer, dtype=DATA_DTYPE, count=length, offset=offset)  # noqa
+        macs_cm2_g = np.frombuffer(self._buffer, dtype=DATA_DTYPE, count=length,
+                                   offset=offset + length * DATA_DTYPE.itemsize)
+
+        return energies_eV, macs_cm2_g
+
+
+def get_mac_database(file_path=None):
+    """
+    Database of a file, opened once per process.
+    """
+    if file_path is None:
+        file_path = get_default_file_path()
+
+    key = str(file_path)
+    if key not in _mac_databases:
+        instrumentation.increment("load.mac_database")
+        _mac_databases[key] = MacDatabase(file_path)
+
+    return _mac_databases[key]
+
+
+def read_database_data(model, atomic_number, file_path=None, source_path=None):
+    """
+    Energies in eV and MACs in cm2/g of a model and atomic number from a database file.
+
+    :param file_path: database file, :py:func:`get_default_file_path` if None
+    :param source_path: source file or directory of the model, the entry is used only if its stamp is the one recorded
+        in the file, see :py:meth:`MacDatabase.is_source_current`. Not checked if None.
+    :return: read-only arrays, None if the file does not exist, has no entry for the model and atomic number, or was
+        built from other source files
+    """
+    if file_path is None:
+        file_path = get_default_file_path()
+
+    if str(file_path) not in _mac_databases and not os.path.isfile(file_path):
+        return None
+
+    database = get_mac_database(file_path)
+    if (model, atomic_number) not in database:
+        return None
+    if source_path is not None and not database.is_source_current(model, source_path):
+        return None
+
+    return database.read_data(model, atomic_number)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xray_mac.mac.models.mac_table
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Frozen MAC table of a material for fast lookups.
+
+The table is built once from a MAC model on a uniform logarithmic energy grid. Each absorption edge of the elements of
+the material inside the energy range adds two knots at the edge energy, with the values just below and just above the
+edge, so a lookup never interpolates across an edge. Extra knots are added where the grid is not accurate enough. A
+lookup finds its grid bin by index arithmetic on the logarithm of the energy, then its segment in the bin from the few
+edges and extra knots of the bin, and interpolates linearly.
+"""
+
+###############################################################################
+# Copyright 2021 Hendrix Demers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###############################################################################
+
+# Standard library modules.
+import logging
+import math
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xray_mac.mac.models.ionization_energies import IonizationEnergies
+from xray_mac.mac.models.mass_absorption_coefficient import Material
+
+# Globals and constants variables.
+EDGE_RELATIVE_OFFSET = 1.0e-7
+
+ARRAY_NAMES = ["bin_starts", "bin_breaks_eV", "knot_energies_eV", "knot_macs_cm2_g"]
+VALUE_NAMES = ["minimum_energy_eV", "maximum_energy_eV", "number_points_per_decade", "accuracy"]
+
+
+def get_edge_energies_eV(atomic_numbers, minimum_energy_eV, maximum_energy_eV, ionization_energies=None):  # noqa
+    """
+    Sorted unique absorption edge energies of the elements inside the energy range.
+    """
+    if ionization_energies is None:
+        ionization_energies = IonizationEnergies()
+    if ionization_energies.edge_energies_eV is None:
+        ionization_energies.read_edge_data()
+
+    edge_energies_eV = set()  # noqa
+    for atomic_number in atomic_numbers:
+        for edge_energy_eV in ionization_energies.edge_energies_eV.get(int(atomic_number), {}).values():  # noqa
+            if minimum_energy_eV < edge_energy_eV < maximum_energy_eV:
+                edge_energies_eV.add(edge_energy_eV)
+
+    return np.array(sorted(edge_energies_eV))
+
+
+class MacTable:
+    """
+    Frozen MAC table of a material, see the module documentation.
+
+    The table is a set of plain arrays, it can be pickled or saved with :py:meth:`save`.
+    """
+    def __init__(self, minimum_energy_eV, maximum_energy_eV, number_points_per_decade, bin_starts,  # noqa
+                 bin_breaks_eV, knot_energies_eV, knot_macs_cm2_g, accuracy=np.nan):  # noqa
+        self.minimum_energy_eV = float(minimum_energy_eV)
+        self.maximum_energy_eV = float(maximum_energy_eV)
+        self.number_points_per_decade = int(number_points_per_decade)
+        self.accuracy = float(accuracy)
+
+        self.bin_starts = np.asarray(bin_starts, dtype=int)
+        self.bin_breaks_eV = np.asarray(bin_breaks_eV, dtype=float)  # noqa
+        self.knot_energies_eV = np.asarray(knot_energies_eV, dtype=float)  # noqa
+        self.knot_macs_cm2_g = np.asarray(knot_macs_cm2_g, dtype=float)
+        for array in [self.bin_starts, self.bin_breaks_eV, self.knot_energies_eV, self.knot_macs_cm2_g]:
+            array.setflags(write=False)
+
+        self.log_minimum_energy = math.log(self.minimum_energy_eV)
+        self.inverse_log_step = self.number_points_per_decade / math.log(10.0)
+        self.number_bins = len(self.bin_starts)
+
+    def __reduce__(self):
+        return self.__class__, (self.minimum_energy_eV, self.maximum_energy_eV, self.number_points_per_decade,
+                                self.bin_starts, self.bin_breaks_eV, self.knot_energies_eV, self.knot_macs_cm2_g,
+                                self.accuracy)
+
+    @classmethod
+    def from_model(cls, mac_model, material, minimum_energy_eV=10.0, maximum_energy_eV=1.0e5,  # noqa
+                   accuracy=1.0e-3, minimum_points_per_decade=32, maximum_points_per_decade=512,
+                   maximum_refinements=40, ionization_energies=None):
+        """
+        Build the table of a material from a MAC model.
+
+        The accuracy is the largest relative error at the middle of the segments between knots. The number of grid
+        points per decade starts at the minimum and is doubled until the accuracy is reached or the maximum is reached.
+        The segments still above the accuracy are then split in two by extra knots, at most ``maximum_refinements``
+        times, which resolves the kinks of tabulated models and narrows the discontinuities of a model that are not at
+        an edge. A segment narrower than twice :py:data:`EDGE_RELATIVE_OFFSET` is taken as a discontinuity and is not
+        checked. The error reached is kept in :py:attr:`accuracy`.
+
+        :param mac_model: MAC model with a ``compute_mac_cm2_g(energies_eV, atomic_numbers)`` method
+        :param material: :py:class:`Material` or atomic number of a pure element
+        :param float minimum_energy_eV: lowest energy of the table
+        :param float maximum_energy_eV: highest energy of the table
+        :param float accuracy: largest relative error wanted
+        :param int minimum_points_per_decade: first number of grid points per decade
+        :param int maximum_points_per_decade: largest number of grid points per decade
+        :param int maximum_refinements: largest number of splits of the segments
+        :param ionization_energies: edge energies, the ones of the model if it has an ``ionization_energies``
+            attribute, :py:class:`IonizationEnergies` otherwise
+        """
+        if not isinstance(material, Material):
+            material = Material({int(material): 1.0})
+        if ionization_energies is None:
+            ionization_energies = getattr(mac_model, "ionization_energies", None)
+
+        def compute_macs_cm2_g(energies_eV):  # noqa
+            macs_cm2_g = mac_model.compute_mac_cm2_g(energies_eV[:, np.newaxis], material.atomic_numbers)
+            return np.asarray(macs_cm2_g, dtype=float) @ material.weight_fractions
+
+        breaks_eV = get_edge_energies_eV(material.atomic_numbers, minimum_energy_eV, maximum_energy_eV,  # noqa
+                                         ionization_energies)
+        left_values_cm2_g = compute_macs_cm2_g(breaks_eV * (1.0 - EDGE_RELATIVE_OFFSET))
+        right_values_cm2_g = compute_macs_cm2_g(breaks_eV * (1.0 + EDGE_RELATIVE_OFFSET))
+
+        number_points_per_decade = minimum_points_per_decade
+        number_refinements = 0
+        while True:
+            table = cls._from_breaks(compute_macs_cm2_g, minimum_energy_eV, maximum_energy_eV,
+                                     number_points_per_decade, breaks_eV, left_values_cm2_g, right_values_cm2_g)
+
+            x0 = table.knot_energies_eV[:-1]
+            x1 = table.knot_energies_eV[1:]
+            middles_eV = np.sqrt(x0 * x1)[x1 > x0 * (1.0 + 2.0 * EDGE_RELATIVE_OFFSET)]
+            macs_cm2_g = compute_macs_cm2_g(middles_eV)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                errors = np.abs(table.compute_mac_cm2_g(middles_eV) - macs_cm2_g) / np.abs(macs_cm2_g)
+            errors[~np.isfinite(errors)] = 0.0
+            table.accuracy = float(np.max(errors, initial=0.0))
+
+            if table.accuracy <= accuracy:
+                break
+            elif number_points_per_decade < maximum_points_per_decade:
+                number_points_per_decade *= 2
+            elif number_refinements < maximum_refinements:
+                number_refinements += 1
+                failed = errors > accuracy
+                breaks_eV = np.concatenate([breaks_eV, middles_eV[failed]])
+                left_values_cm2_g = np.concatenate([left_values_cm2_g, macs_cm2_g[failed]])
+                right_values_cm2_g = np.concatenate([right_values_cm2_g, macs_cm2_g[failed]])
+            else:
+                logging.warning("MAC table accuracy of %g not reached, largest error %g", accuracy, table.accuracy)
+                break
+
+        return table
+
+    @classmethod
+    def _from_breaks(cls, compute_macs_cm2_g, minimum_energy_eV, maximum_energy_eV, number_points_per_decade,  # noqa
+                     breaks_eV, left_values_cm2_g, right_values_cm2_g):  # noqa
+        number_bins = max(1, int(math.ceil(math.log10(maximum_energy_eV / minimum_energy_eV) *
+                                           number_points_per_decade)))
+        log_step = math.log(10.0) / number_points_per_decade
+        grid_eV = minimum_energy_eV * np.exp(np.arange(number_bins + 1) * log_step)  # noqa
+        grid_eV[-1] = maximum_energy_eV
+        grid_values_cm2_g = compute_macs_cm2_g(grid_eV)
+
+        indices = np.argsort(breaks_eV, kind='stable')
+        breaks_eV = breaks_eV[indices]  # noqa
+        left_values_cm2_g = left_values_cm2_g[indices]
+        right_values_cm2_g = right_values_cm2_g[indices]
+
+        break_bins = np.clip(np.searchsorted(grid_eV, breaks_eV, side='right') - 1, 0, number_bins - 1)
+        number_breaks = np.bincount(break_bins, minlength=number_bins)
+        maximum_breaks = int(number_breaks.max(initial=0))
+
+        bin_breaks_eV = np.full((number_bins, maximum_breaks), np.inf)  # noqa
+        bin_starts = np.empty(number_bins, dtype=int)
+        knot_energies_eV = []  # noqa
+        knot_macs_cm2_g = []
+        break_index = 0
+        for bin_index in range(number_bins):
+            bin_starts[bin_index] = len(knot_energies_eV)
+            knot_energies_eV.append(grid_eV[bin_index])
+            knot_macs_cm2_g.append(grid_values_cm2_g[bin_index])
+
+            for column in range(number_breaks[bin_index]):
+                bin_breaks_eV[bin_index, column] = breaks_eV[break_index]
+                knot_energies_eV.extend([breaks_eV[break_index], breaks_eV[break_index]])
+                knot_macs_cm2_g.extend([left_values_cm2_g[break_index], right_values_cm2_g[break_index]])
+                break_index += 1
+
+        knot_energies_eV.append(grid_eV[-1])
+        knot_macs_cm2_g.append(grid_values_cm2_g[-1])
+
+        return cls(minimum_energy_eV, maximum_energy_eV, number_points_per_decade, bin_starts, bin_breaks_eV,
+                   knot_energies_eV, knot_macs_cm2_g)
+
+    def compute_mac_cm2_g(self, energies_eV):  # noqa
+        """
+        MAC of the material, the energies outside the table are clamped to its range.
+
+        :param energies_eV: x-ray energy or energies in eV
+        :return: MAC in cm2/g, a float for a scalar energy
+        """
+        if np.ndim(energies_eV) == 0:
+            return self._compute_mac_cm2_g(float(energies_eV))
+
+        energies_eV = np.clip(np.asarray(energies_eV, dtype=float), self.minimum_energy_eV,  # noqa
+                              self.maximum_energy_eV)
+
+        bins = np.clip(((np.log(energies_eV) - self.log_minimum_energy) * self.inverse_log_step).astype(int),
+                       0, self.number_bins - 1)
+        indices = self.bin_starts[bins] + 2 * np.sum(energies_eV[..., np.newaxis] >= self.bin_breaks_eV[bins], axis=-1)
+
+        x0 = self.knot_energies_eV[indices]
+        x1 = self.knot_energies_eV[indices + 1]
+        y0 = self.knot_macs_cm2_g[indices]
+        y1 = self.knot_macs_cm2_g[indices + 1]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            macs_cm2_g = y0 + (y1 - y0) * (energies_eV - x0) / (x1 - x0)
+
+        return np.where(x1 > x0, macs_cm2_g, y0)
+
+    def _compute_mac_cm2_g(self, energy_eV):  # noqa
+        energy_eV = min(max(energy_eV, self.minimum_energy_eV), self.maximum_energy_eV)  # noqa
+
+        bin_index = min(max(int((math.log(energy_eV) - self.log_minimum_energy) * self.inverse_log_step), 0),
+                        self.number_bins - 1)
+        index = int(self.bin_starts[bin_index])
+        for break_energy_eV in self.bin_breaks_eV[bin_index]:  # noqa
+            if energy_eV >= break_energy_eV:
+                index += 2
+
+        x0 = self.knot_energies_eV[index]
+        x1 = self.knot_energies_eV[index + 1]
+        y0 = self.knot_macs_cm2_g[index]
+        if x1 <= x0:
+            return float(y0)
+
+        y1 = self.knot_macs_cm2_g[index + 1]
+        return float(y0 + (y1 - y0) * (energy_eV - x0) / (x1 - x0))
+
+    def save(self, file_path):
+        """
+        Save the table in a numpy ``.npz`` file.
+        """
+        arrays = {name: getattr(self, name) for name in ARRAY_NAMES}
+        values = {name: np.array(getattr(self, name)) for name in VALUE_NAMES}
+        np.savez(file_path, **arrays, **values)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Load a table saved with :py:meth:`save`.
+        """
+        with np.load(file_path) as data:
+            parameters = {name: data[name] for name in ARRAY_NAMES + VALUE_NAMES}
+
+        return cls(**parameters)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xray_mac.mac.models.mass_absorption_coefficient
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+MAC of compounds and mixtures.
+
+The MAC of a material is the sum of the MAC of its elements weighted by their weight fractions. Any MAC model with a
+``compute_mac_cm2_g(energies_eV, atomic_numbers)`` method accepting broadcast arrays can be used: Chantler2005,
+MacHenke1993, MacHeinrich1987, MacHeinrichDTSA, MacCasino or MacPenelope2018.
+"""
+
+###############################################################################
+# Copyright 2021 Hendrix Demers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###############################################################################
+
+# Standard library modules.
+from collections import OrderedDict
+import logging
+import re
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xray_mac.mac.models.element_properties import get_element_table
+
+# Globals and constants variables.
+MAXIMUM_CACHED_COLUMNS = 16
+
+FORMULA_TOKEN = re.compile(r"([A-Z][a-z]?|\(|\)|\d+(?:\.\d*)?|\.\d+)")
+
+
+def get_atomic_number(element):
+    """
+    Atomic number of an element given by its atomic number or symbol.
+    """
+    if isinstance(element, str):
+        try:
+            return get_element_table().symbol_atomic_numbers[element]
+        except KeyError:
+            message = "Unknown element symbol: %s" % element
+            logging.error(message)
+            raise ValueError(message)
+
+    return int(element)
+
+
+def parse_formula(formula):
+    """
+    Number of atoms of each element of a chemical formula, parentheses and decimal subscripts are allowed.
+
+    :param str formula: chemical formula, for example "H2O", "Ca5(PO4)3OH" or "Fe0.95O"
+    :return: number of atoms for each atomic number
+    """
+    message = "Invalid chemical formula: %s" % formula
+
+    tokens = FORMULA_TOKEN.findall(formula)
+    if "".join(tokens) != formula.replace(" ", "") or not tokens:
+        logging.error(message)
+        raise ValueError(message)
+
+    stack = [{}]
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        index += 1
+
+        count = 1.0
+        if index < len(tokens) and tokens[index][0] in "0123456789.":
+            count = float(tokens[index])
+            index += 1
+
+        if token == "(" and count == 1.0:
+            stack.append({})
+        elif token == ")" and len(stack) > 1:
+            group = stack.pop()
+            for atomic_number, number_atoms in group.items():
+                stack[-1][atomic_number] = stack[-1].get(atomic_number, 0.0) + number_atoms * count
+        elif token[0].isalpha():
+            atomic_number = get_atomic_number(token)
+            stack[-1][atomic_number] = stack[-1].get(atomic_number, 0.0) + count
+        else:
+            logging.error(message)
+            raise ValueError(message)
+
+    if len(stack) != 1:
+        logging.error(message)
+        raise ValueError(message)
+
+    return stack[0]
+
+
+def atom_to_weight_fractions(atom_fractions):
+    """
+    Convert atom fractions (or numbers of atoms) into weight fractions.
+    """
+    atomic_numbers = [get_atomic_number(element) for element in atom_fractions]
+    numbers_atoms = np.array(list(atom_fractions.values()), dtype=float)
+    masses_g_mol = get_element_table().atomic_mass_g_mol(atomic_numbers) * numbers_atoms
+
+    weight_fractions = masses_g_mol / np.sum(masses_g_mol)
+
+    return dict(zip(atomic_numbers, weight_fractions.tolist()))
+
+
+class Material:
+    """
+    Composition of a compound or mixture with its optional mass density.
+
+    The per-element MAC columns of the last grids evaluated with each model are kept when the caller names the grid
+    with a ``grid_key``, so a material evaluated repeatedly on the same grid only pays the mixture rule.
+    """
+    def __init__(self, weight_fractions, density_g_cm3=None, name=None):
+        """
+        :param dict weight_fractions: weight fraction of each element, given by its atomic number or symbol. The
+            fractions are used as given, they are not normalized.
+        :param float density_g_cm3: mass density in g/cm3, needed for the linear absorption coefficient
+        :param str name: name of the material
+        """
+        composition = {}
+        for element, weight_fraction in weight_fractions.items():
+            atomic_number = get_atomic_number(element)
+            composition[atomic_number] = composition.get(atomic_number, 0.0) + float(weight_fraction)
+
+        if not composition or any(weight_fraction < 0.0 for weight_fraction in composition.values()):
+            message = "Invalid weight fractions: %s" % weight_fractions
+            logging.error(message)
+            raise ValueError(message)
+
+        atomic_numbers = sorted(composition)
+        self.atomic_numbers = np.array(atomic_numbers, dtype=int)
+        self.weight_fractions = np.array([composition[atomic_number] for atomic_number in atomic_numbers])
+        self.atomic_numbers.setflags(write=False)
+        self.weight_fractions.setflags(write=False)
+
+        self.density_g_cm3 = density_g_cm3
+        self.name = name
+
+        self._columns = OrderedDict()
+
+    @classmethod
+    def from_atom_fractions(cls, atom_fractions, density_g_cm3=None, name=None):
+        """
+        Material from the atom fractions (or numbers of atoms) of its elements.
+        """
+        return cls(atom_to_weight_fractions(atom_fractions), density_g_cm3, name)
+
+    @classmethod
+    def from_formula(cls, formula, density_g_cm3=None, name=None):
+        """
+        Material from a chemical formula, see :py:func:`parse_formula`.
+        """
+        if name is None:
+            name = formula
+        return cls.from_atom_fractions(parse_formula(formula), density_g_cm3, name)
+
+    def __repr__(self):
+        composition = ", ".join("%i: %g" % item for item in zip(self.atomic_numbers, self.weight_fractions))
+        return "Material(%s, density_g_cm3=%s, name=%r)" % (composition, self.density_g_cm3, self.name)
+
+    def compute_element_macs_cm2_g(self, energies_eV, mac_model, grid_key=None):  # noqa
+        """
+        MAC of each element of the material.
+
+        :param energies_eV: x-ray energy or energies in eV
+        :param mac_model: MAC model
+        :param grid_key: hashable name of the energies given by the caller, the columns of a model and grid key are
+            computed once and the energies are not compared. Not cached if None.
+        :return: read-only array with the shape of the energies and a last dimension for the elements
+        """
+        energies_eV = np.asarray(energies_eV, dtype=float)  # noqa
+
+        key = (mac_model, grid_key, energies_eV.shape)
+        if grid_key is not None and key in self._columns:
+            self._columns.move_to_end(key)
+            return self._columns[key]
+
+        macs_cm2_g = np.asarray(mac_model.compute_mac_cm2_g(energies_eV[..., np.newaxis], self.atomic_numbers),
+                                dtype=float)
+        macs_cm2_g = np.array(np.broadcast_to(macs_cm2_g, energies_eV.shape + self.atomic_numbers.shape))
+        macs_cm2_g.setflags(write=False)
+
+        if grid_key is not None:
+            self._columns[key] = macs_cm2_g
+            if len(self._columns) > MAXIMUM_CACHED_COLUMNS:
+                self._columns.popitem(last=False)
+
+        return macs_cm2_g
+
+    def compute_mac_cm2_g(self, energies_eV, mac_model, grid_key=None):  # noqa
+        """
+        MAC of the material, the weight fraction mixture rule of the MAC of its elements.
+
+        :param energies_eV: x-ray energy or energies in eV
+        :param mac_model: MAC model
+        :param grid_key: name of the energies, see :py:meth:`compute_element_macs_cm2_g`
+        :return: MAC in cm2/g, a float for a scalar energy
+        """
+        macs_cm2_g = self.compute_element_macs_cm2_g(energies_eV, mac_model, grid_key) @ self.weight_fractions
+
+        if np.ndim(macs_cm2_g) == 0:
+            return float(macs_cm2_g)
+
+        return macs_cm2_g
+
+    def compute_linear_absorption_coefficient_1_cm(self, energies_eV, mac_model, grid_key=None):  # noqa
+        """
+        Linear absorption coefficient of the material, the MAC times the mass density.
+
+        :raise ValueError: if the material has no mass density
+        """
+        if self.density_g_cm3 is None:
+            message = "No mass density for the material %s" % self.name
+            logging.error(message)
+            raise ValueError(message)
+
+        return self.compute_mac_cm2_g(energies_eV, mac_model, grid_key) * self.density_g_cm3
@@ -40,6 +40,8 @@ factor_cm2_g = 10-24 * 6.02214076e23 / M
 ###############################################################################
 
 # Standard library modules.
+import io
+import re
 import zipfile
 
 # Third party modules.
@@ -47,7 +49,10 @@ import zipfile
 # Local modules.
 
 # Project modules.
+from xray_mac.mac import get_current_module_path
+from xray_mac.mac.models import instrumentation
 from xray_mac.mac.models.elements import ElementProperties
+from xray_mac.mac.models.interpolation import Interpolation1D, LOG_LOG
 
 # Globals and constants variables.
 import numpy as np
@@ -85,6 +90,217 @@ SHELL_NAMES = {
     30: "outer shells",
 }
 
+SHELL_IDS = {shell_name: shell_id for shell_id, shell_name in SHELL_NAMES.items()}
+
+AVOGADRO_NUMBER_1_mol = 6.02214076e23
+BARN_cm2 = 1e-24
+
+NORMALIZED_FILE_PATTERN = re.compile(r"pendbase/pdfiles/pdgph(\d\d)\.p18$")
+PHOTACS_ZIP_FILE_PATH = "pendbase/pdfiles/pdgph-photacs.zip"
+PHOTACS_FILE_PATTERN = re.compile(r"pdgph-photacs/pdgph(\d\d)\.p18$")
+
+_photo_electric_data = {}
+
+
+def get_conversion_factor_cm2_g(molar_mass_g_mol):
+    """
+    Factor converting a cross section in barn/atom into a MAC in cm2/g.
+    """
+    return BARN_cm2 * AVOGADRO_NUMBER_1_mol / molar_mass_g_mol
+
+
+def parse_photo_electric_file(data):
+    """
+    Parse one pdgph??.p18 file.
+
+    :param bytes data: content of the file
+    :return: atomic number, shell ids, ionization energies in eV, energies in eV, totals in barn and partials in barn
+        with one column per shell
+    """
+    atomic_number = 0
+    number_shells = 0
+    number_grid_energies = 0
+    shell_ids = []
+    ionization_energies_eV = []  # noqa
+    values = []
+
+    for line in data.decode("UTF-8").splitlines():
+        if line.startswith("# IZ, NS, NGE:"):
+            items = line.split(":")[-1]
+            z, ns, nge = items.split()
+            atomic_number = int(z)
+            number_shells = int(ns)
+            number_grid_energies = int(nge)
+        elif line.startswith("# Shell:"):
+            items = line.split(":")[-1]
+            shell_ids = [int(shell_id) for shell_id in items.split()]
+        elif line.startswith("# Eion (eV)"):
+            ionization_energies_eV = [float(energy_eV) for energy_eV in line.split()[3:]]
+        elif not line.startswith("#"):
+            items = line.split()
+            if len(items) > 2:
+                values.extend(items)
+
+    values = np.array(values, dtype=float).reshape((number_grid_energies, number_shells + 2))
+
+    return atomic_number, shell_ids, ionization_energies_eV, values[:, 0], values[:, 1], values[:, 2:]
+
+
+def insert_edge_knots(energies_eV, values, ionization_energies_eV):  # noqa
+    """
+    Insert the left and right limits of the values at each ionization energy between two grid energies.
+
+    The log-log interpolation is then a step at these edges instead of a segment across them. A limit is extrapolated
+    from the segment on its side of the edge, in log-log space if the values are positive and linearly otherwise, or is
+    the nearest value if there is no such segment. An ionization energy outside the grid or on a grid energy is
+    already an end or a knot and is skipped.
+
+    :param energies_eV: sorted grid energies in eV
+    :param values: values, the first dimension is the grid energies
+    :param ionization_energies_eV: ionization energies in eV, NaN are ignored
+    :return: energies in eV and values with the edge knots
+    """
+    energies_eV = np.asarray(energies_eV, dtype=float)
+    values = np.asarray(values, dtype=float)
+
+    ionization_energies_eV = np.asarray(ionization_energies_eV, dtype=float)
+    edges_eV = np.unique(ionization_energies_eV[np.isfinite(ionization_energies_eV)])  # noqa
+    edges_eV = edges_eV[(edges_eV > energies_eV[0]) & (edges_eV < energies_eV[-1])]  # noqa
+    edges_eV = edges_eV[~np.isin(edges_eV, energies_eV)]  # noqa
+
+    indices = []
+    edge_values = []
+    for edge_eV in edges_eV:
+        index = np.searchsorted(energies_eV, edge_eV)
+        indices.extend([index, index])
+        edge_values.append(_extrapolate(energies_eV, values, index - 1, index - 2, edge_eV))
+        edge_values.append(_extrapolate(energies_eV, values, index, index + 1, edge_eV))
+
+    if not indices:
+        return energies_eV, values
+
+    return (np.insert(energies_eV, indices, np.repeat(edges_eV, 2)),
+            np.insert(values, indices, np.array(edge_values), axis=0))
+
+
+def _extrapolate(energies_eV, values, index, other_index, energy_eV):
+    if not 0 <= other_index < len(energies_eV) or energies_eV[other_index] == energies_eV[index]:
+        return values[index]
+
+    x0, x1 = energies_eV[index], energies_eV[other_index]
+    y0, y1 = values[index], values[other_index]
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        log_values = y0 * np.power(energy_eV / x0, np.log(y1 / y0) / np.log(x1 / x0))
+    linear_values = np.maximum(y0 + (y1 - y0) * (energy_eV - x0) / (x1 - x0), 0.0)
+
+    return np.where((y0 > 0.0) & (y1 > 0.0), log_values, linear_values)
+
+
+class PhotoElectricData:
+    """
+    Photoelectric cross sections of all the elements of a PENELOPE database file, parsed in one pass.
+
+    The grids of the elements are stacked: the rows of an element are ``offsets[Z]:offsets[Z + 1]`` in
+    :py:attr:`energies_eV`, :py:attr:`totals_barn` and :py:attr:`partials_barn`. The partials, shell ids and ionization
+    energies have one column per shell, padded with 0, -1 and NaN after the last shell of an element. All arrays are
+    read-only.
+    """
+    def __init__(self, elements):
+        """
+        :param elements: parsed files, see :py:func:`parse_photo_electric_file`
+        """
+        elements = sorted(elements, key=lambda element: element[0])
+
+        maximum_atomic_number = max((element[0] for element in elements), default=0)
+        maximum_number_shells = max((len(element[1]) for element in elements), default=0)
+        number_rows = sum(len(element[3]) for element in elements)
+
+        self.offsets = np.zeros(maximum_atomic_number + 2, dtype=int)
+        self.number_shells = np.zeros(maximum_atomic_number + 1, dtype=int)
+        self.shell_ids = np.full((maximum_atomic_number + 1, maximum_number_shells), -1, dtype=int)
+        self.ionization_energies_eV = np.full((maximum_atomic_number + 1, maximum_number_shells), np.nan)  # noqa
+
+        self.energies_eV = np.zeros(number_rows)  # noqa
+        self.totals_barn = np.zeros(number_rows)
+        self.partials_barn = np.zeros((number_rows, maximum_number_shells))
+
+        row = 0
+        for element in elements:
+            atomic_number, shell_ids, ionization_energies_eV, energies_eV, totals_barn, partials_barn = element  # noqa
+            number_shells = len(shell_ids)
+            self.number_shells[atomic_number] = number_shells
+            self.shell_ids[atomic_number, :number_shells] = shell_ids
+            self.ionization_energies_eV[atomic_number, :number_shells] = ionization_energies_eV
+
+            number_energies = len(energies_eV)
+            self.energies_eV[row:row + number_energies] = energies_eV
+            self.totals_barn[row:row + number_energies] = totals_barn
+            self.partials_barn[row:row + number_energies, :number_shells] = partials_barn
+            row += number_energies
+            self.offsets[atomic_number + 1:] = row
+
+        for array in [self.offsets, self.number_shells, self.shell_ids, self.ionization_energies_eV, self.energies_eV,
+                      self.totals_barn, self.partials_barn]:
+            array.setflags(write=False)
+
+    def __contains__(self, atomic_number):
+        return 0 < atomic_number < len(self.number_shells) and self.number_shells[atomic_number] > 0
+
+    @property
+    def atomic_numbers(self):
+        return [int(atomic_number) for atomic_number in np.flatnonzero(self.number_shells)]
+
+    def element(self, atomic_number):
+        """
+        Data of an element as views of the stacked arrays.
+
+        :return: shell ids, ionization energies in eV, energies in eV, totals in barn and partials in barn
+        :raise KeyError: if the element is not in the database
+        """
+        if atomic_number not in self:
+            raise KeyError(atomic_number)
+
+        start, stop = self.offsets[atomic_number], self.offsets[atomic_number + 1]
+        number_shells = self.number_shells[atomic_number]
+
+        return (self.shell_ids[atomic_number, :number_shells],
+                self.ionization_energies_eV[atomic_number, :number_shells],
+                self.energies_eV[start:stop], self.totals_barn[start:stop],
+                self.partials_barn[start:stop, :number_shells])
+
+
+def read_photo_electric_data(data_file_path, with_normalization=True):
+    """
+    Parse the photoelectric files of all elements, the database and the inner photacs archive are opened once.
+    """
+    elements = []
+    with zipfile.ZipFile(data_file_path, "r") as zip_file:
+        if with_normalization:
+            for file_path in zip_file.namelist():
+                if NORMALIZED_FILE_PATTERN.search(file_path):
+                    elements.append(parse_photo_electric_file(zip_file.read(file_path)))
+        else:
+            with zipfile.ZipFile(io.BytesIO(zip_file.read(PHOTACS_ZIP_FILE_PATH)), "r") as zip_file2:
+                for file_path in zip_file2.namelist():
+                    if PHOTACS_FILE_PATTERN.search(file_path):
+                        elements.append(parse_photo_electric_file(zip_file2.read(file_path)))
+
+    return PhotoElectricData(elements)
+
+
+def get_photo_electric_data(data_file_path, with_normalization=True):
+    """
+    Photoelectric data of all elements, parsed once per process for each file and normalization.
+    """
+    key = (str(data_file_path), with_normalization)
+    instrumentation.record_cache("penelope.photo_electric_data", key in _photo_electric_data)
+    if key not in _photo_electric_data:
+        instrumentation.increment("load.penelope")
+        with instrumentation.timer("load.penelope"):
+            _photo_electric_data[key] = read_photo_electric_data(data_file_path, with_normalization)
+
+    return _photo_electric_data[key]
+
 
 class PhotoElectric:
     def __init__(self):
@@ -99,63 +315,174 @@ class PhotoElectric:
         self.partials_barn = []
 
         self.element_properties = ElementProperties()
-        self.element_properties.read_data()
 
     def read_data(self, data_file_path, atomic_number, with_normalization=True):
-        file_path = "pendbase/pdfiles/pdgph{:02d}.p18".format(int(atomic_number))
-        with zipfile.ZipFile(data_file_path, "r") as zip_file:
-            if with_normalization:
-               data = zip_file.read(file_path)
-            else:
-                with zip_file.open("pendbase/pdfiles/pdgph-photacs.zip") as data_zip:
-                    with zipfile.ZipFile(data_zip, "r") as zip_file2:
-                        file_path = "pdgph-photacs/pdgph{:02d}.p18".format(int(atomic_number))
-                        data = zip_file2.read(file_path)
-
-            lines = data.decode("UTF-8")
-            lines = lines.split("\r\n")
-
-            row_id = 0
-            for line in lines:
-                if line.startswith("# IZ, NS, NGE:"):
-                    items = line.split(":")[-1]
-                    z, ns, nge = items.split()
-                    self.atomic_number = int(z)
-                    self.number_shells = int(ns)
-                    self.number_grid_energies = int(nge)
-                    self.energies_eV = np.zeros(self.number_grid_energies)
-                    self.totals_barn = np.zeros(self.number_grid_energies)
-                    self.partials_barn = np.zeros((self.number_grid_energies, self.number_shells))
-                elif line.startswith("# Shell:"):
-                    items = line.split(":")[-1]
-                    shell_ids = [int(shell_id) for shell_id in items.split()]
-                    self.shell_ids = shell_ids
-                elif line.startswith("# Eion (eV)"):
-                    ionization_energies_eV = [float(energy_eV) for energy_eV in line.split()[3:]]
-                    self.ionization_energies_eV = ionization_energies_eV
-                else:
-                    items = line.split()
-                    if len(items) > 2:
-                        self.energies_eV[row_id] = float(items[0])
-                        self.totals_barn[row_id] = float(items[1])
-                        self.partials_barn[row_id] = [float(item) for item in items[2:]]
-                        row_id += 1
+        data = get_photo_electric_data(data_file_path, with_normalization)
+
+        element = data.element(int(atomic_number))
+        shell_ids, ionization_energies_eV, energies_eV, totals_barn, partials_barn = element  # noqa
+
+        self.atomic_number = int(atomic_number)
+        self.number_shells = len(shell_ids)
+        self.number_grid_energies = len(energies_eV)
+        self.shell_ids = [int(shell_id) for shell_id in shell_ids]
+        self.ionization_energies_eV = [float(energy_eV) for energy_eV in ionization_energies_eV]
+
+        self.energies_eV = energies_eV
+        self.totals_barn = totals_barn
+        self.partials_barn = partials_barn
+
+        self._factor_cm2_g = None
+
+    @property
+    def factor_cm2_g(self):
+        if self._factor_cm2_g is None:
+            molar_mass_g_mol = self.element_properties.atomic_mass_g_mol(self.atomic_number)
+            self._factor_cm2_g = get_conversion_factor_cm2_g(molar_mass_g_mol)
+        return self._factor_cm2_g
 
     @property
     def totals_cm2_g(self):
-        molar_mass_g_mol = self.element_properties.atomic_mass_g_mol(self.atomic_number)
-        factor_cm2_g = 1e-24 * 6.02214076e23 / molar_mass_g_mol
-        totals_cm2_g = self.totals_barn * factor_cm2_g
+        totals_cm2_g = self.totals_barn * self.factor_cm2_g
         return totals_cm2_g
 
     @property
     def partials_cm2_g(self):
-        molar_mass_g_mol = self.element_properties.atomic_mass_g_mol(self.atomic_number)
-        factor_cm2_g = 1e-24 * 6.02214076e23 / molar_mass_g_mol
-        partials_cm2_g = self.partials_barn * factor_cm2_g
+        partials_cm2_g = self.partials_barn * self.factor_cm2_g
         return partials_cm2_g
 
 
+class MacPenelope2018:
+    """
+    Total and subshell photoelectric MACs of the PENELOPE 2018 database.
+
+    The tabulated cross sections are interpolated in log-log space with
+    :py:class:`xray_mac.mac.models.interpolation.Interpolation1D`, the discontinuities at the ionization energies are
+    kept with :py:func:`insert_edge_knots`. The interpolations of each element are created once.
+    """
+    def __init__(self, data_file_path=None, with_normalization=True):
+        if data_file_path is None:
+            data_file_path = get_current_module_path(__file__, "../../../data/penelope2018/pendbase.zip")
+
+        self.data_file_path = data_file_path
+        self.with_normalization = with_normalization
+
+        self.element_properties = ElementProperties()
+
+        self._data = None
+        self._factors_cm2_g = None
+        self._interpolations = {}
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = get_photo_electric_data(self.data_file_path, self.with_normalization)
+        return self._data
+
+    def get_interpolations(self, atomic_number):
+        """
+        Log-log interpolations of the total and of the subshell cross sections in barn of an element.
+
+        :raise KeyError: if the element is not in the data
+        """
+        instrumentation.record_cache("penelope.interpolation", atomic_number in self._interpolations)
+        if atomic_number not in self._interpolations:
+            _shell_ids, ionization_energies_eV, grid_eV, totals_barn, partials_barn = self.data.element(atomic_number)
+            totals_grid_eV, totals_barn = insert_edge_knots(grid_eV, totals_barn, ionization_energies_eV)  # noqa
+            partials_grid_eV, partials_barn = insert_edge_knots(grid_eV, partials_barn, ionization_energies_eV)  # noqa
+            self._interpolations[atomic_number] = (
+                Interpolation1D(totals_grid_eV, totals_barn, kind=LOG_LOG, clamp=True),
+                Interpolation1D(partials_grid_eV, partials_barn, kind=LOG_LOG, clamp=True))
+
+        return self._interpolations[atomic_number]
+
+    @property
+    def factors_cm2_g(self):
+        """
+        Conversion factors from barn/atom to cm2/g for each atomic number of the data, NaN for a missing element.
+        """
+        if self._factors_cm2_g is None:
+            factors_cm2_g = np.full(len(self.data.number_shells), np.nan)
+            for atomic_number in self.data.atomic_numbers:
+                molar_mass_g_mol = self.element_properties.atomic_mass_g_mol(atomic_number)
+                factors_cm2_g[atomic_number] = get_conversion_factor_cm2_g(molar_mass_g_mol)
+            factors_cm2_g.setflags(write=False)
+            self._factors_cm2_g = factors_cm2_g
+
+        return self._factors_cm2_g
+
+    def compute_mac_cm2_g(self, energies_eV, atomic_numbers):  # noqa
+        """
+        Compute the total photoelectric MAC.
+
+        :param energies_eV: x-ray energy or energies in eV
+        :param atomic_numbers: atomic number or numbers of the absorber, broadcast with the energies
+        :return: MAC in cm2/g, a float for scalar inputs
+        :raise KeyError: if an absorber is not in the data
+        """
+        energies_eV, atomic_numbers = np.broadcast_arrays(np.asarray(energies_eV, dtype=float),  # noqa
+                                                          np.asarray(atomic_numbers, dtype=int))
+        instrumentation.record_evaluation("model.Penelope2018", energies_eV.size)
+
+        macs_cm2_g = np.empty(energies_eV.shape)
+        for atomic_number in np.unique(atomic_numbers):
+            mask = atomic_numbers == atomic_number
+            atomic_number = int(atomic_number)
+
+            totals_interpolation, _partials_interpolation = self.get_interpolations(atomic_number)
+            macs_cm2_g[mask] = totals_interpolation(energies_eV[mask]) * self.factors_cm2_g[atomic_number]
+
+        if macs_cm2_g.ndim == 0:
+            return float(macs_cm2_g)
+        else:
+            return macs_cm2_g
+
+    def compute_subshell_mac_cm2_g(self, energies_eV, atomic_numbers, shells):  # noqa
+        """
+        Compute the photoelectric MAC of subshells.
+
+        :param energies_eV: x-ray energy or energies in eV
+        :param atomic_numbers: atomic number or numbers of the absorber, broadcast with the energies
+        :param shells: shell name (see :py:data:`SHELL_NAMES`) or id, or a list of them
+        :return: MAC in cm2/g, with a last dimension for each shell if a list is given. The MAC of a shell missing in
+            an element is zero.
+        :raise KeyError: if an absorber is not in the data
+        """
+        single_shell = isinstance(shells, (str, int, np.integer))
+        if single_shell:
+            shells = [shells]
+        shell_ids = [SHELL_IDS[shell] if isinstance(shell, str) else int(shell) for shell in shells]
+
+        energies_eV, atomic_numbers = np.broadcast_arrays(np.asarray(energies_eV, dtype=float),  # noqa
+                                                          np.asarray(atomic_numbers, dtype=int))
+
+        macs_cm2_g = np.zeros(energies_eV.shape + (len(shell_ids),))
+        for atomic_number in np.unique(atomic_numbers):
+            mask = atomic_numbers == atomic_number
+            atomic_number = int(atomic_number)
+
+            element_shell_ids = self.data.element(atomic_number)[0]
+            columns = {int(shell_id): column for column, shell_id in enumerate(element_shell_ids)}
+
+            indices = [index for index, shell_id in enumerate(shell_ids) if shell_id in columns]
+            if indices:
+                _totals_interpolation, partials_interpolation = self.get_interpolations(atomic_number)
+                values_cm2_g = partials_interpolation(energies_eV[mask])[:, [columns[shell_ids[index]]
+                                                                             for index in indices]]
+                values_cm2_g = values_cm2_g * self.factors_cm2_g[atomic_number]
+                element_macs_cm2_g = macs_cm2_g[mask]
+                element_macs_cm2_g[:, indices] = values_cm2_g
+                macs_cm2_g[mask] = element_macs_cm2_g
+
+        if single_shell:
+            macs_cm2_g = macs_cm2_g[..., 0]
+
+        if macs_cm2_g.ndim == 0:
+            return float(macs_cm2_g)
+        else:
+            return macs_cm2_g
+
+
 def list_files(data_file_path):
     with zipfile.ZipFile(data_file_path, "r") as zip_file:
         file_names = zip_file.namelist()
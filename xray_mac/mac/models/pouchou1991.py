@@ -6,6 +6,9 @@
 .. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
 
 Mass absorption coefficients tables from Pouchou and Pichoir (1991).
+
+The table is compiled once into a structured array sorted by (line, emitter, absorber), looked up with a dictionary
+for one value and with ``searchsorted`` for arrays. :py:class:`MacOverride` layers the table over any MAC model.
 """
 
 ###############################################################################
@@ -25,12 +28,16 @@ Mass absorption coefficients tables from Pouchou and Pichoir (1991).
 ###############################################################################
 
 # Standard library modules.
+import functools
+import logging
 
 # Third party modules.
+import numpy as np
 
 # Local modules.
 
 # Project modules.
+from xray_mac.mac.models.xray_lines import get_xray_lines, mac_for_lines
 
 # Globals and constants variables.
 LINE_Ka = 'Ka'
@@ -38,161 +45,235 @@ LINE_Lb = 'Lb'
 LINE_La = 'La'
 LINE_Mb = 'Mb'
 
+TRANSITION_KEYS = sorted([LINE_Ka, LINE_Lb, LINE_La, LINE_Mb])
+
+ATOMIC_NUMBER_RANGE = 128
+
+TABLE_DTYPE = np.dtype([('line', 'U2'), ('atomic_number_emitter', '<i4'), ('atomic_number_absorber', '<i4'),
+                        ('mac_cm2_g', '<f8')])
+
+# (line, atomic number of the emitter, atomic number of the absorber, MAC in cm2/g).
+MACS_cm2_g = [
+    (LINE_Ka, 5, 5, 3500.0),
+    (LINE_Ka, 5, 6, 6750.0),
+    (LINE_Ka, 5, 7, 11000.0),
+    (LINE_Ka, 5, 8, 16500.0),
+    (LINE_Ka, 5, 13, 64000.0),
+    (LINE_Ka, 5, 14, 80000.0),
+    (LINE_Ka, 5, 22, 15000.0),
+    (LINE_Ka, 5, 23, 18000.0),
+    (LINE_Ka, 5, 24, 20700.0),
+    (LINE_Ka, 5, 26, 27800.0),
+    (LINE_Ka, 5, 27, 32000.0),
+    (LINE_Ka, 5, 28, 37000.0),
+    (LINE_Ka, 5, 40, 4400.0),
+    (LINE_Ka, 5, 41, 4500.0),
+    (LINE_Ka, 5, 42, 4600.0),
+    (LINE_Ka, 5, 57, 2500.0),
+    (LINE_Ka, 5, 73, 23000.0),
+    (LINE_Ka, 5, 74, 21000.0),
+    (LINE_Ka, 5, 92, 7400.0),
+    (LINE_Ka, 6, 5, 39000.0),
+    (LINE_Ka, 6, 6, 2170.0),
+    (LINE_Ka, 6, 14, 35000.0),
+    (LINE_Ka, 6, 22, 8100.0),
+    (LINE_Ka, 6, 23, 8850.0),
+    (LINE_Ka, 6, 24, 10700.0),
+    (LINE_Ka, 6, 26, 13500.0),
+    (LINE_Ka, 6, 40, 25000.0),
+    (LINE_Ka, 6, 41, 24000.0),
+    (LINE_Ka, 6, 42, 20500.0),
+    (LINE_Ka, 6, 72, 18000.0),
+    (LINE_Ka, 6, 73, 17000.0),
+    (LINE_Ka, 6, 74, 18000.0),
+    (LINE_Ka, 7, 5, 15800.0),
+    (LINE_Ka, 7, 7, 1640.0),
+    (LINE_Ka, 7, 13, 13800.0),
+    (LINE_Ka, 7, 14, 17000.0),
+    (LINE_Ka, 7, 22, 4270.0),
+    (LINE_Ka, 7, 23, 4950.0),
+    (LINE_Ka, 7, 24, 5650.0),
+    (LINE_Ka, 7, 26, 7190.0),
+    (LINE_Ka, 7, 40, 24000.0),
+    (LINE_Ka, 7, 41, 25000.0),
+    (LINE_Ka, 7, 42, 25800.0),
+    (LINE_Ka, 7, 72, 14000.0),
+    (LINE_Ka, 7, 73, 15500.0),
+    (LINE_Ka, 14, 73, 1490.0),
+    (LINE_Ka, 16, 79, 2200.0),
+    (LINE_Lb, 29, 29, 6750.0),
+    (LINE_La, 33, 31, 7000.0),
+    (LINE_La, 42, 79, 2200.0),
+    (LINE_La, 21, 21, 4750.0),
+    (LINE_La, 22, 22, 4550.0),
+    (LINE_La, 23, 23, 4370.0),
+    (LINE_La, 24, 24, 3850.0),
+    (LINE_La, 25, 25, 3340.0),
+    (LINE_La, 26, 26, 3350.0),
+    (LINE_La, 27, 27, 3260.0),
+    (LINE_La, 28, 28, 3560.0),
+    (LINE_La, 29, 29, 1755.0),
+    (LINE_Mb, 64, 64, 4700.0),
+    (LINE_Mb, 72, 72, 3000.0),
+    (LINE_Mb, 73, 73, 2500.0),
+    (LINE_Mb, 74, 74, 2080.0),
+    (LINE_Mb, 79, 78, 2550.0),
+    (LINE_Mb, 80, 79, 2170.0),
+]
+
+_table = None
+
+
+def get_table():
+    """
+    Compiled table sorted by line, emitter and absorber, built once per process.
+    """
+    global _table
+
+    if _table is None:
+        table = np.sort(np.array(MACS_cm2_g, dtype=TABLE_DTYPE),
+                        order=['line', 'atomic_number_emitter', 'atomic_number_absorber'])
+        table.setflags(write=False)
+        _table = table
+
+    return _table
+
+
+def get_codes(transition_indices, atomic_numbers_emitter, atomic_numbers_absorber):
+    """
+    Integer key of (transition, emitter, absorber), increasing in the order of :py:func:`get_table`.
+    """
+    return (np.asarray(transition_indices, dtype=np.int64) * ATOMIC_NUMBER_RANGE +
+            atomic_numbers_emitter) * ATOMIC_NUMBER_RANGE + atomic_numbers_absorber
+
+
+@functools.lru_cache(maxsize=None)
+def extract_transition_key(line_emitter):
+    """
+    Transition key of the table for a line, the line itself if no key matches.
+    """
+    for xray_transition_key in TRANSITION_KEYS:
+        if line_emitter in xray_transition_key:
+            return xray_transition_key
+
+        if len(line_emitter) > len(xray_transition_key):
+            if line_emitter[:len(xray_transition_key)] in xray_transition_key:
+                return xray_transition_key
 
-class MacPouchou1991:
-    def __init__(self):
-        self.data_mac_cm2_g = {}
+    return line_emitter
 
-        self.data_mac_cm2_g[LINE_Ka] = {}
-
-        atomic_number_emitter = 5
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter] = {}
-
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][5] = 3500.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][6] = 6750.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][7] = 11000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][8] = 16500.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][13] = 64000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][14] = 80000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][22] = 15000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][23] = 18000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][24] = 20700.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][26] = 27800.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][27] = 32000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][28] = 37000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][40] = 4400.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][41] = 4500.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][42] = 4600.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][57] = 2500.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][73] = 23000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][74] = 21000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][92] = 7400.0
-
-        atomic_number_emitter = 6
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter] = {}
-
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][5] = 39000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][6] = 2170.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][14] = 35000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][22] = 8100.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][23] = 8850.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][24] = 10700.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][26] = 13500.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][40] = 25000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][41] = 24000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][42] = 20500.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][72] = 18000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][73] = 17000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][74] = 18000.0
-
-        atomic_number_emitter = 7
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter] = {}
-
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][5] = 15800.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][7] = 1640.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][13] = 13800.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][14] = 17000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][22] = 4270.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][23] = 4950.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][24] = 5650.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][26] = 7190.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][40] = 24000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][41] = 25000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][42] = 25800.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][72] = 14000.0
-        self.data_mac_cm2_g[LINE_Ka][atomic_number_emitter][73] = 15500.0
-
-        self.data_mac_cm2_g[LINE_Ka][14] = {}
-        self.data_mac_cm2_g[LINE_Ka][14][73] = 1490.0
-
-        self.data_mac_cm2_g[LINE_Ka][16] = {}
-        self.data_mac_cm2_g[LINE_Ka][16][79] = 2200.0
-
-        self.data_mac_cm2_g[LINE_Lb] = {}
-
-        self.data_mac_cm2_g[LINE_Lb][29] = {}
-        self.data_mac_cm2_g[LINE_Lb][29][29] = 6750.0
-
-        self.data_mac_cm2_g[LINE_La] = {}
-        self.data_mac_cm2_g[LINE_La][33] = {}
-        self.data_mac_cm2_g[LINE_La][33][31] = 7000.0
-
-        self.data_mac_cm2_g[LINE_La][42] = {}
-        self.data_mac_cm2_g[LINE_La][42][79] = 2200.0
-
-        self.data_mac_cm2_g[LINE_Mb] = {}
-
-        self.data_mac_cm2_g[LINE_Mb][64] = {}
-        self.data_mac_cm2_g[LINE_Mb][64][64] = 4700.0
-
-        self.data_mac_cm2_g[LINE_Mb][72] = {}
-        self.data_mac_cm2_g[LINE_Mb][72][72] = 3000.0
-
-        self.data_mac_cm2_g[LINE_Mb][73] = {}
-        self.data_mac_cm2_g[LINE_Mb][73][73] = 2500.0
-
-        self.data_mac_cm2_g[LINE_Mb][74] = {}
-        self.data_mac_cm2_g[LINE_Mb][74][74] = 2080.0
-
-        self.data_mac_cm2_g[LINE_Mb][79] = {}
-        self.data_mac_cm2_g[LINE_Mb][79][78] = 2550.0
-
-        self.data_mac_cm2_g[LINE_Mb][80] = {}
-        self.data_mac_cm2_g[LINE_Mb][80][79] = 2170.0
-
-        self.data_mac_cm2_g[LINE_La][21] = {}
-        self.data_mac_cm2_g[LINE_La][21][21] = 4750.0
-
-        self.data_mac_cm2_g[LINE_La][22] = {}
-        self.data_mac_cm2_g[LINE_La][22][22] = 4550.0
-
-        self.data_mac_cm2_g[LINE_La][23] = {}
-        self.data_mac_cm2_g[LINE_La][23][23] = 4370.0
-
-        self.data_mac_cm2_g[LINE_La][24] = {}
-        self.data_mac_cm2_g[LINE_La][24][24] = 3850.0
-
-        self.data_mac_cm2_g[LINE_La][25] = {}
-        self.data_mac_cm2_g[LINE_La][25][25] = 3340.0
-
-        self.data_mac_cm2_g[LINE_La][26] = {}
-        self.data_mac_cm2_g[LINE_La][26][26] = 3350.0
 
-        self.data_mac_cm2_g[LINE_La][27] = {}
-        self.data_mac_cm2_g[LINE_La][27][27] = 3260.0
+@functools.lru_cache(maxsize=None)
+def get_transition_index(line_emitter):
+    """
+    Index of the transition key of a line in :py:data:`TRANSITION_KEYS`, -1 if the line has no key.
+    """
+    xray_transition_key = extract_transition_key(line_emitter)
+    if xray_transition_key in TRANSITION_KEYS:
+        return TRANSITION_KEYS.index(xray_transition_key)
 
-        self.data_mac_cm2_g[LINE_La][28] = {}
-        self.data_mac_cm2_g[LINE_La][28][28] = 3560.0
+    return -1
 
-        self.data_mac_cm2_g[LINE_La][29] = {}
-        self.data_mac_cm2_g[LINE_La][29][29] = 1755.0
 
-    def is_available(self, atomic_number_absorber, atomic_number_emitter, line_emitter):
-        xray_transition_key = self.extract_transition_key(line_emitter)
+class MacPouchou1991:
+    def __init__(self):
+        self.table = get_table()
+        self.codes = get_codes([TRANSITION_KEYS.index(line) for line in self.table['line'].tolist()],
+                               self.table['atomic_number_emitter'], self.table['atomic_number_absorber'])
+        self.codes.setflags(write=False)
 
-        if xray_transition_key in self.data_mac_cm2_g:
-            if atomic_number_emitter in self.data_mac_cm2_g[xray_transition_key]:
-                if atomic_number_absorber in self.data_mac_cm2_g[xray_transition_key][atomic_number_emitter]:
-                    return True
+        self.data_mac_cm2_g = {}
+        for line, atomic_number_emitter, atomic_number_absorber, mac_cm2_g in self.table.tolist():
+            self.data_mac_cm2_g.setdefault(line, {}).setdefault(atomic_number_emitter, {})
+            self.data_mac_cm2_g[line][atomic_number_emitter][atomic_number_absorber] = mac_cm2_g
 
-        return False
+        self._macs_cm2_g = {(line, atomic_number_emitter, atomic_number_absorber): mac_cm2_g
+                            for line, atomic_number_emitter, atomic_number_absorber, mac_cm2_g in self.table.tolist()}
 
-    def mac_cm2_g(self, atomic_number_absorber, atomic_number_emitter, line_emitter):
-        if self.is_available(atomic_number_absorber, atomic_number_emitter, line_emitter):
-            xray_transition_key = self.extract_transition_key(line_emitter)
+    def is_available(self, atomic_number_absorber, atomic_number_emitter, line_emitter):
+        key = (extract_transition_key(line_emitter), atomic_number_emitter, atomic_number_absorber)
+        return key in self._macs_cm2_g
 
-            return self.data_mac_cm2_g[xray_transition_key][atomic_number_emitter][atomic_number_absorber]
+    def mac_cm2_g(self, atomic_number_absorber, atomic_number_emitter, line_emitter):
+        key = (extract_transition_key(line_emitter), atomic_number_emitter, atomic_number_absorber)
+        return self._macs_cm2_g.get(key)
 
     def extract_transition_key(self, line_emitter):
-        xray_transition_keys = list(self.data_mac_cm2_g.keys())
-        xray_transition_keys.sort()
-
-        for xray_transition_key in xray_transition_keys:
-            if line_emitter in xray_transition_key:
-                return xray_transition_key
-
-            if len(line_emitter) > len(xray_transition_key):
-                if line_emitter[:len(xray_transition_key)] in xray_transition_key:
-                    return xray_transition_key
-
-        return line_emitter
+        return extract_transition_key(line_emitter)
+
+    def compute_macs_cm2_g(self, atomic_numbers_absorber, atomic_numbers_emitter, lines_emitter):
+        """
+        MACs of the table for arrays of absorbers, emitters and lines.
+
+        :param atomic_numbers_absorber: atomic number or numbers of the absorber
+        :param atomic_numbers_emitter: atomic number or numbers of the emitter
+        :param lines_emitter: line name or names, broadcast with the atomic numbers
+        :return: MAC in cm2/g with the broadcast shape of the inputs, NaN if not in the table
+        """
+        atomic_numbers_absorber, atomic_numbers_emitter, lines_emitter = np.broadcast_arrays(
+            np.asarray(atomic_numbers_absorber, dtype=int), np.asarray(atomic_numbers_emitter, dtype=int),
+            np.asarray(lines_emitter))
+
+        unique_lines, line_indices = np.unique(lines_emitter, return_inverse=True)
+        transition_indices = np.array([get_transition_index(line) for line in unique_lines.tolist()], dtype=int)
+        transition_indices = transition_indices[line_indices].reshape(lines_emitter.shape)
+
+        valid = (transition_indices >= 0) & \
+            (atomic_numbers_emitter >= 0) & (atomic_numbers_emitter < ATOMIC_NUMBER_RANGE) & \
+            (atomic_numbers_absorber >= 0) & (atomic_numbers_absorber < ATOMIC_NUMBER_RANGE)
+        codes = get_codes(transition_indices, atomic_numbers_emitter, atomic_numbers_absorber)
+
+        positions = np.minimum(np.searchsorted(self.codes, codes), len(self.codes) - 1)
+        found = valid & (self.codes[positions] == codes)
+
+        return np.where(found, self.table['mac_cm2_g'][positions], np.nan)
+
+
+class MacOverride:
+    """
+    MAC of x-ray lines computed with a model, replaced by the MAC of the Pouchou and Pichoir table when available.
+
+    The line energies come from the line table, see :py:func:`xray_mac.mac.models.xray_lines.mac_for_lines`. The
+    model is evaluated only for the (emitter, line, absorber) not in the table.
+    """
+    def __init__(self, mac_model, overrides=None, xray_lines=None):
+        """
+        :param mac_model: MAC model with a ``compute_mac_cm2_g(energies_eV, atomic_numbers)`` method
+        :param overrides: table with the ``compute_macs_cm2_g`` method of :py:class:`MacPouchou1991`,
+            :py:class:`MacPouchou1991` if None
+        :param xray_lines: line table, :py:func:`xray_mac.mac.models.xray_lines.get_xray_lines` if None
+        """
+        if overrides is None:
+            overrides = MacPouchou1991()
+        if xray_lines is None:
+            xray_lines = get_xray_lines()
+
+        self.mac_model = mac_model
+        self.overrides = overrides
+        self.xray_lines = xray_lines
+
+    def compute_mac_cm2_g(self, atomic_numbers_emitter, lines_emitter, atomic_numbers_absorber):
+        """
+        MAC of x-ray lines in absorbers.
+
+        :param atomic_numbers_emitter: atomic number or numbers of the emitter
+        :param lines_emitter: line name or names, for example "Ka1" or the family "Ka"
+        :param atomic_numbers_absorber: atomic number or numbers of the absorber
+        :return: MAC in cm2/g with the broadcast shape of the inputs, a float for scalar inputs
+        :raise KeyError: if a line not in the override table is not in the line table
+        """
+        atomic_numbers_emitter, lines_emitter, atomic_numbers_absorber = np.broadcast_arrays(
+            np.asarray(atomic_numbers_emitter, dtype=int), np.asarray(lines_emitter),
+            np.asarray(atomic_numbers_absorber, dtype=int))
+
+        macs_cm2_g = self.overrides.compute_macs_cm2_g(atomic_numbers_absorber, atomic_numbers_emitter, lines_emitter)
+
+        mask = np.isnan(macs_cm2_g)
+        if np.any(mask):
+            logging.debug("%i of %i MACs computed with the model", np.count_nonzero(mask), mask.size)
+            macs_cm2_g[mask] = mac_for_lines(atomic_numbers_emitter[mask], lines_emitter[mask],
+                                             atomic_numbers_absorber[mask], self.mac_model, self.xray_lines)
+
+        if macs_cm2_g.ndim == 0:
+            return float(macs_cm2_g)
+        return macs_cm2_g
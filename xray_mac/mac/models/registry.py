@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xray_mac.mac.models.registry
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Registry of the MAC models with one entry point for all of them.
+
+Each model is registered by name with a factory, the model module is imported and the model is created on first use
+with its options, then kept for the process. :py:func:`compute_mac` converts the x-ray energies to eV and passes the
+whole arrays to the ``compute_mac_cm2_g(energies_eV, atomic_numbers)`` method of the model.
+"""
+
+###############################################################################
+# Copyright 2021 Hendrix Demers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###############################################################################
+
+# Standard library modules.
+import logging
+import threading
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xray_mac.mac import get_current_module_path
+from xray_mac.mac.models import instrumentation
+from xray_mac.mac.models.casino import HC_eV_A  # noqa
+
+# Globals and constants variables.
+MODEL_CHANTLER2005 = "Chantler2005"
+MODEL_HENKE1993 = "Henke1993"
+MODEL_HENKE_WINXRAY = "HenkeWinxray"
+MODEL_HEINRICH1987 = "Heinrich1987"
+MODEL_HEINRICH_DTSA = "HeinrichDTSA"
+MODEL_CASINO = "Casino"
+MODEL_PENELOPE2018 = "Penelope2018"
+
+ENERGY_UNIT_eV = "eV"
+ENERGY_UNIT_keV = "keV"
+WAVELENGTH_UNIT_A = "A"
+
+_factories = {}
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def create_chantler2005(**options):
+    from xray_mac.mac.models.chantler2005 import Chantler2005
+    return Chantler2005(**options)
+
+
+def create_henke1993(data_path=None, **options):
+    from xray_mac.mac.models.henke1993 import MacHenke1993
+
+    if data_path is None:
+        data_path = get_current_module_path(__file__, "../../../data/henke1993/data")
+    return MacHenke1993(data_path, **options)
+
+
+def create_henke_winxray(data_path=None, **options):
+    from xray_mac.mac.models.henke1993 import MacHenke1993
+
+    if data_path is None:
+        data_path = get_current_module_path(__file__, "../../../data/henke1993/winxray")
+    return MacHenke1993(data_path, model='HenkeWinxray', **options)
+
+
+def create_heinrich1987(**options):
+    from xray_mac.mac.models.heinrich1987 import MacHeinrich1987
+    return MacHeinrich1987(**options)
+
+
+def create_heinrich_dtsa(**options):
+    from xray_mac.mac.models.heinrich_dtsa import MacHeinrichDTSA
+    return MacHeinrichDTSA(**options)
+
+
+def create_casino(**options):
+    from xray_mac.mac.models.casino import MacCasino
+    return MacCasino(**options)
+
+
+def create_penelope2018(**options):
+    from xray_mac.mac.models.penelope import MacPenelope2018
+    return MacPenelope2018(**options)
+
+
+def register_model(model_name, factory):
+    """
+    Register or replace a model.
+
+    :param str model_name: name of the model
+    :param factory: function returning a new model for the options given to :py:func:`get_engine`
+    """
+    with _engines_lock:
+        _factories[model_name] = factory
+        for key in [key for key in _engines if key[0] == model_name]:
+            del _engines[key]
+
+
+def get_model_names():
+    return sorted(_factories)
+
+
+def get_engine(model_name, **options):
+    """
+    Model of a name and options, created once per process.
+
+    Options that are not hashable, for example a list, create a new model at each call.
+
+    :param str model_name: one of :py:func:`get_model_names`
+    :param options: options of the model factory, for example ``data_path`` or ``warning_mode``
+    :raise KeyError: if the model is not registered
+    """
+    key = (model_name, tuple(sorted(options.items())))
+
+    try:
+        engine = _engines.get(key)
+    except TypeError:
+        return _create_engine(model_name, options)
+
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(key)
+            if engine is None:
+                engine = _create_engine(model_name, options)
+                _engines[key] = engine
+
+    return engine
+
+
+def _create_engine(model_name, options):
+    if model_name not in _factories:
+        message = "Unknown MAC model: %s" % model_name
+        logging.error(message)
+        raise KeyError(message)
+
+    return _factories[model_name](**options)
+
+
+def clear_engines():
+    """
+    Remove the models created, the next :py:func:`get_engine` creates them again.
+    """
+    with _engines_lock:
+        _engines.clear()
+
+
+def convert_to_eV(energies, energy_unit=ENERGY_UNIT_eV):  # noqa
+    """
+    Convert x-ray energies in keV or wavelengths in angstrom into energies in eV.
+
+    :param energies: energy, wavelength, or array of them
+    :param str energy_unit: :py:data:`ENERGY_UNIT_eV`, :py:data:`ENERGY_UNIT_keV` or :py:data:`WAVELENGTH_UNIT_A`
+    :raise ValueError: if the unit is unknown
+    """
+    energies = np.asarray(energies, dtype=float)
+
+    if energy_unit == ENERGY_UNIT_eV:
+        return energies
+    elif energy_unit == ENERGY_UNIT_keV:
+        return energies * 1.0e3
+    elif energy_unit == WAVELENGTH_UNIT_A:
+        return HC_eV_A / energies
+
+    message = "Unknown energy unit: %s" % energy_unit
+    logging.error(message)
+    raise ValueError(message)
+
+
+def compute_mac(model_name, energies_eV, atomic_numbers, energy_unit=ENERGY_UNIT_eV, **options):  # noqa
+    """
+    MAC of x-ray energies in absorbers with a registered model.
+
+    :param str model_name: one of :py:func:`get_model_names`
+    :param energies_eV: x-ray energy or energies, in eV unless ``energy_unit`` is given
+    :param atomic_numbers: atomic number or numbers of the absorber, broadcast with the energies
+    :param str energy_unit: unit of the energies, see :py:func:`convert_to_eV`
+    :param options: options of the model, see :py:func:`get_engine`
+    :return: MAC in cm2/g, a float for scalar inputs
+    """
+    engine = get_engine(model_name, **options)
+
+    energies_eV = convert_to_eV(energies_eV, energy_unit)  # noqa
+    atomic_numbers = np.asarray(atomic_numbers, dtype=int)
+
+    with instrumentation.timer("model." + model_name):
+        if energies_eV.ndim == 0 and atomic_numbers.ndim == 0:
+            return float(engine.compute_mac_cm2_g(float(energies_eV), int(atomic_numbers)))
+
+        return np.asarray(engine.compute_mac_cm2_g(energies_eV, atomic_numbers), dtype=float)
+
+
+register_model(MODEL_CHANTLER2005, create_chantler2005)
+register_model(MODEL_HENKE1993, create_henke1993)
+register_model(MODEL_HENKE_WINXRAY, create_henke_winxray)
+register_model(MODEL_HEINRICH1987, create_heinrich1987)
+register_model(MODEL_HEINRICH_DTSA, create_heinrich_dtsa)
+register_model(MODEL_CASINO, create_casino)
+register_model(MODEL_PENELOPE2018, create_penelope2018)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xray_mac.mac.models.xray_lines
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+X-ray line energies and relative fractions of DTSA.
+
+The lines of ``data/dtsa/XrayDataLine.csv`` are read once per process into arrays sorted by atomic number, with an
+index from (atomic number, line name) to the row. A line family that is not a line of the file, for example "Ka" for
+"Ka1" and "Ka2", is resolved into the lines named by the family followed by a number, weighted by their fractions.
+"""
+
+###############################################################################
+# Copyright 2021 Hendrix Demers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###############################################################################
+
+# Standard library modules.
+import csv
+import logging
+import re
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xray_mac.mac import get_current_module_path
+
+# Globals and constants variables.
+FAMILY_MEMBER_PATTERN = "^%s[0-9]+$"
+
+_xray_lines = {}
+
+
+def get_default_file_path():
+    return get_current_module_path(__file__, "../../../data/dtsa/XrayDataLine.csv")
+
+
+def read_xray_lines(file_path):
+    """
+    Lines of a DTSA line file, the first row of a duplicated (atomic number, line name) is used.
+
+    :return: list of (atomic number, energy in eV, fraction, line name) sorted by atomic number
+    """
+    lines = {}
+    with open(file_path, newline='') as input_file:
+        reader = csv.reader(input_file)
+
+        # Skip the header.
+        next(reader)
+
+        for row in reader:
+            try:
+                atomic_number = int(row[0])
+                energy_eV = float(row[1])  # noqa
+                fraction = float(row[2])
+                name = row[3]
+            except (ValueError, IndexError):
+                logging.warning("Invalid line row in %s: %s", file_path, row)
+                continue
+
+            lines.setdefault((atomic_number, name), (atomic_number, energy_eV, fraction, name))
+
+    return sorted(lines.values(), key=lambda line: line[0])
+
+
+class XrayLines:
+    """
+    Read-only table of the x-ray lines, see the module documentation.
+    """
+    def __init__(self, lines):
+        """
+        :param lines: (atomic number, energy in eV, fraction, line name) of each line, sorted by atomic number
+        """
+        self.atomic_numbers = np.array([line[0] for line in lines], dtype=int)
+        self.energies_eV = np.array([line[1] for line in lines], dtype=float)  # noqa
+        self.fractions = np.array([line[2] for line in lines], dtype=float)
+        self.names = np.array([line[3] for line in lines], dtype=str)
+
+        maximum_atomic_number = int(self.atomic_numbers.max(initial=0))
+        self.offsets = np.searchsorted(self.atomic_numbers, np.arange(maximum_atomic_number + 2))
+
+        for array in [self.atomic_numbers, self.energies_eV, self.fractions, self.names, self.offsets]:
+            array.setflags(write=False)
+
+        self._index = {(atomic_number, name): row
+                       for row, (atomic_number, name) in enumerate(zip(self.atomic_numbers.tolist(),
+                                                                       self.names.tolist()))}
+        self._resolved_lines = {}
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self.atomic_numbers)
+
+    def lines(self, atomic_number):
+        """
+        Line names of an atomic number.
+        """
+        start, end = self._get_range(atomic_number)
+        return self.names[start:end].tolist()
+
+    def resolve_line(self, atomic_number, line):
+        """
+        Rows and normalized weights of a line or of the lines of a family.
+
+        :raise KeyError: if the atomic number has no such line or family
+        """
+        key = (int(atomic_number), line)
+        if key not in self._resolved_lines:
+            if key in self._index:
+                rows = np.array([self._index[key]])
+            else:
+                start, end = self._get_range(key[0])
+                pattern = re.compile(FAMILY_MEMBER_PATTERN % re.escape(line))
+                rows = np.array([row for row in range(start, end) if pattern.match(self.names[row])], dtype=int)
+
+            if len(rows) == 0:
+                message = "No x-ray line %s for atomic number %i" % (line, key[0])
+                logging.error(message)
+                raise KeyError(message)
+
+            weights = self.fractions[rows]
+            if np.sum(weights) > 0.0:
+                weights = weights / np.sum(weights)
+            else:
+                weights = np.full(len(rows), 1.0 / len(rows))
+
+            rows.setflags(write=False)
+            weights.setflags(write=False)
+            self._resolved_lines[key] = (rows, weights)
+
+        return self._resolved_lines[key]
+
+    def line_energy_eV(self, atomic_numbers, lines):  # noqa
+        """
+        Energy of lines, the energy of the most intense line for a family.
+
+        :param atomic_numbers: atomic number or numbers of the emitter
+        :param lines: line name or names, broadcast with the atomic numbers
+        :return: energy in eV, a float for scalar inputs
+        """
+        atomic_numbers, lines = np.broadcast_arrays(np.asarray(atomic_numbers, dtype=int), np.asarray(lines))
+
+        energies_eV = np.empty(atomic_numbers.shape)  # noqa
+        for index in np.ndindex(atomic_numbers.shape):
+            rows, weights = self.resolve_line(atomic_numbers[index], str(lines[index]))
+            energies_eV[index] = self.energies_eV[rows[np.argmax(weights)]]
+
+        if energies_eV.ndim == 0:
+            return float(energies_eV)
+        return energies_eV
+
+    def resolve_rows(self, atomic_numbers, lines):
+        """
+        Rows and weights of lines, with a last dimension for the lines of the families.
+
+        A line gives one row with a weight of one. The padding of the last dimension repeats the first row of the
+        family with a zero weight.
+
+        :param atomic_numbers: atomic number or numbers of the emitter
+        :param lines: line name or names, broadcast with the atomic numbers
+        :return: rows and weights
+        """
+        atomic_numbers, lines = np.broadcast_arrays(np.asarray(atomic_numbers, dtype=int), np.asarray(lines))
+
+        if atomic_numbers.ndim == 0:
+            rows, weights = self.resolve_line(atomic_numbers, str(lines))
+            return rows, weights
+
+        unique_atomic_numbers, atomic_number_indices = np.unique(atomic_numbers, return_inverse=True)
+        unique_lines, line_indices = np.unique(lines, return_inverse=True)
+        pairs, pair_indices = np.unique(atomic_number_indices.ravel() * len(unique_lines) + line_indices.ravel(),
+                                        return_inverse=True)
+
+        resolved_lines = [self.resolve_line(unique_atomic_numbers[pair // len(unique_lines)],
+                                            str(unique_lines[pair % len(unique_lines)])) for pair in pairs.tolist()]
+        number_members = max((len(line_rows) for line_rows, _weights in resolved_lines), default=1)
+
+        pair_rows = np.empty((len(resolved_lines), number_members), dtype=int)
+        pair_weights = np.zeros((len(resolved_lines), number_members))
+        for pair, (line_rows, line_weights) in enumerate(resolved_lines):
+            pair_rows[pair] = line_rows[0]
+            pair_rows[pair, :len(line_rows)] = line_rows
+            pair_weights[pair, :len(line_rows)] = line_weights
+
+        rows = pair_rows[pair_indices].reshape(atomic_numbers.shape + (number_members,))
+        weights = pair_weights[pair_indices].reshape(atomic_numbers.shape + (number_members,))
+
+        return rows, weights
+
+    def resolve_lines(self, atomic_numbers, lines):
+        """
+        Energies and weights of lines, see :py:meth:`resolve_rows`.
+
+        :return: energies in eV and weights
+        """
+        rows, weights = self.resolve_rows(atomic_numbers, lines)
+        return self.energies_eV[rows], weights
+
+    def _get_range(self, atomic_number):
+        if 0 <= atomic_number < len(self.offsets) - 1:
+            return int(self.offsets[atomic_number]), int(self.offsets[atomic_number + 1])
+        return 0, 0
+
+
+def get_xray_lines(file_path=None):
+    """
+    Line table of a file, read once per process.
+    """
+    if file_path is None:
+        file_path = get_default_file_path()
+
+    key = str(file_path)
+    if key not in _xray_lines:
+        _xray_lines[key] = XrayLines(read_xray_lines(file_path))
+
+    return _xray_lines[key]
+
+
+def mac_for_lines(emitter_atomic_numbers, lines, absorber_atomic_numbers, mac_model, xray_lines=None):
+    """
+    MAC of x-ray lines in absorbers.
+
+    The line energies are resolved in bulk and the model is called once. The MAC of a family is the fraction weighted
+    mean of the MAC of its lines.
+
+    :param emitter_atomic_numbers: atomic number or numbers of the emitter
+    :param lines: line name or names, for example "Ka1" or the family "Ka"
+    :param absorber_atomic_numbers: atomic number or numbers of the absorber
+    :param mac_model: MAC model with a ``compute_mac_cm2_g(energies_eV, atomic_numbers)`` method
+    :param xray_lines: line table, :py:func:`get_xray_lines` if None
+    :return: MAC in cm2/g with the broadcast shape of the inputs, a float for scalar inputs
+    :raise KeyError: if a line is not in the table
+    """
+    if xray_lines is None:
+        xray_lines = get_xray_lines()
+
+    emitter_atomic_numbers, lines, absorber_atomic_numbers = np.broadcast_arrays(
+        np.asarray(emitter_atomic_numbers, dtype=int), np.asarray(lines),
+        np.asarray(absorber_atomic_numbers, dtype=int))
+
+    energies_eV, weights = xray_lines.resolve_lines(emitter_atomic_numbers, lines)  # noqa
+    macs_cm2_g = np.asarray(mac_model.compute_mac_cm2_g(energies_eV, absorber_atomic_numbers[..., np.newaxis]),
+                            dtype=float)
+    macs_cm2_g = np.sum(macs_cm2_g * weights, axis=-1)
+
+    if macs_cm2_g.ndim == 0:
+        return float(macs_cm2_g)
+    return macs_cm2_g